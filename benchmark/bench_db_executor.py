@@ -0,0 +1,122 @@
+"""
+db_server 基準測試：大量 grading 寫入進行中，量測 games/get_version 的延遲分佈。
+
+比較兩種模式：
+  inline   - 舊做法，db_fun 直接在 event loop 裡執行
+  executor - db_server 的 LocalStorage：StorageExecutor 1 條寫入執行緒 + N 條讀取執行緒
+
+用法（在專案根目錄）：
+    python -m benchmark.bench_db_executor --writers 8 --seconds 5
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmark.stats import summarize
+from common.network import RpcClient
+from database import db_fun as db
+from database import db_server
+from database.storage import LocalStorage, dispatch
+
+ORIGINAL_HANDLE_REQUEST = db_server.handle_request
+
+
+async def inline_handle_request(req):
+    """舊版行為：同步呼叫直接卡在 event loop 上"""
+    return dispatch(req)
+
+
+async def writer_loop(port, game_id, stop, counter):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    rpc = RpcClient(reader, writer)
+    i = 0
+    while not stop.is_set():
+        i += 1
+        await rpc.request({
+            "collection": "games",
+            "action": "grading",
+            "data": {"user_id": i, "game_id": game_id, "score": i % 5 + 1, "comment": "bench"},
+        })
+        counter[0] += 1
+    await rpc.close()
+
+
+async def probe_loop(port, game_id, stop, samples):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    rpc = RpcClient(reader, writer)
+    req = {"collection": "games", "action": "get_version", "data": {"game_id": game_id}}
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await rpc.request(req)
+        samples.append(time.perf_counter() - t0)
+        await asyncio.sleep(0.002)
+    await rpc.close()
+
+
+async def run_mode(mode, args):
+    workdir = tempfile.mkdtemp(prefix="bench_db_")
+    db.DB_PATH = os.path.join(workdir, "data.db")
+    db.init_db()
+    game_id = db.dev_create_game({"game_name": "bench", "user_id": 1, "config": "{}"})["game_id"]
+
+    storage = None
+    if mode == "executor":
+        storage = LocalStorage(readers=args.readers, cache_entries=db_server.CACHE_MAX_ENTRIES)
+        await storage.start()
+        db_server.storage = storage
+        db_server.handle_request = ORIGINAL_HANDLE_REQUEST
+    else:
+        db_server.handle_request = inline_handle_request
+
+    server = await asyncio.start_server(db_server.handle_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    stop = asyncio.Event()
+    samples, writes = [], [0]
+    tasks = [asyncio.create_task(writer_loop(port, game_id, stop, writes)) for _ in range(args.writers)]
+    tasks.append(asyncio.create_task(probe_loop(port, game_id, stop, samples)))
+
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    server.close()
+    await server.wait_closed()
+    if storage:
+        await storage.close()
+
+    return {
+        "mode": mode,
+        "writes_per_sec": round(writes[0] / args.seconds, 1),
+        "get_version": summarize(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8, help="同時送 grading 的連線數")
+    parser.add_argument("--readers", type=int, default=4, help="executor 模式的讀取執行緒數")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--modes", default="inline,executor")
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes.split(","):
+        # db_server 每個請求都會 print，量測期間先丟掉
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results.append(asyncio.run(run_mode(mode, args)))
+
+    for r in results:
+        g = r["get_version"]
+        print(f"{r['mode']:>8}: grading {r['writes_per_sec']}/s | get_version "
+              f"p50={g.get('p50_ms')}ms p99={g.get('p99_ms')}ms max={g.get('max_ms')}ms (n={g['count']})",
+              file=sys.stderr)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
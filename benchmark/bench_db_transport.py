@@ -0,0 +1,149 @@
+"""
+Lobby ↔ db_server 的傳輸層比較：TCP loopback vs Unix domain socket。
+
+另開一個行程跑 echo 伺服器（同時監聽兩種 socket），client 用 common.network 的 send_msg / recv_msg：
+  latency    - 單一連線一問一答，量每次往返的延遲
+  throughput - --conns 條連線、每條同時 --window 個在途訊息，量每秒訊息數
+--sizes 指定訊息裡附帶的資料大小（bytes），大致對應 get_version（小）與 game_list（數 KB）。
+
+用法（在專案根目錄，僅限 Unix）：
+    python -m benchmark.bench_db_transport --round-trips 20000 --seconds 3 --sizes 64,4096
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+
+from benchmark.stats import summarize
+from common.network import recv_msg, send_msg
+
+
+# -------------------------------
+# echo 伺服器（子行程）
+# -------------------------------
+async def _echo(reader, writer):
+    try:
+        while True:
+            await send_msg(writer, await recv_msg(reader))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve_echo(unix_path, conn):
+    async def main():
+        tcp = await asyncio.start_server(_echo, "127.0.0.1", 0)
+        unix = await asyncio.start_unix_server(_echo, unix_path)
+        conn.send(tcp.sockets[0].getsockname()[1])
+        async with tcp, unix:
+            await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+# -------------------------------
+# client
+# -------------------------------
+async def connect(transport, target):
+    if transport == "unix":
+        return await asyncio.open_unix_connection(target)
+    return await asyncio.open_connection("127.0.0.1", target)
+
+
+def make_msg(size, i=0):
+    return {"collection": "games", "action": "get_version", "data": {"game_id": 4, "pad": "x" * size}, "rid": i}
+
+
+async def run_latency(transport, target, size, round_trips):
+    reader, writer = await connect(transport, target)
+    samples = []
+    for i in range(round_trips):
+        msg = make_msg(size, i)
+        t0 = time.perf_counter()
+        await send_msg(writer, msg)
+        await recv_msg(reader)
+        samples.append(time.perf_counter() - t0)
+    writer.close()
+    return summarize(samples)
+
+
+async def run_throughput(transport, target, size, conns, window, seconds):
+    stop = asyncio.Event()
+    counts = []
+
+    async def pump():
+        reader, writer = await connect(transport, target)
+        msg = make_msg(size)
+        n = 0
+        for _ in range(window):
+            await send_msg(writer, msg)
+        while not stop.is_set():
+            await recv_msg(reader)
+            n += 1
+            await send_msg(writer, msg)
+        for _ in range(window):
+            await recv_msg(reader)
+        writer.close()
+        counts.append(n)
+
+    tasks = [asyncio.create_task(pump()) for _ in range(conns)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {"msgs_per_sec": round(sum(counts) / seconds), "mb_per_sec": round(sum(counts) * size / seconds / 1e6, 2)}
+
+
+async def run_all(args, targets):
+    results = []
+    for size in args.sizes:
+        for transport, target in targets.items():
+            results.append({
+                "transport": transport,
+                "size": size,
+                "latency": await run_latency(transport, target, size, args.round_trips),
+                "throughput": await run_throughput(transport, target, size, args.conns, args.window, args.seconds),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--round-trips", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=3.0, help="throughput 每組的量測秒數")
+    parser.add_argument("--conns", type=int, default=4, help="throughput 的連線數（對應 DB_POOL_SIZE）")
+    parser.add_argument("--window", type=int, default=32, help="每條連線的在途訊息數（對應 DB_MAX_INFLIGHT）")
+    parser.add_argument("--sizes", default="64,4096", help="訊息附帶的資料大小（bytes），逗號分隔")
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",")]
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("這個平台不支援 Unix domain socket")
+
+    unix_path = os.path.join(tempfile.mkdtemp(prefix="bench_transport_"), "echo.sock")
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve_echo, args=(unix_path, child), daemon=True)
+    server.start()
+    try:
+        port = parent.recv()
+        results = asyncio.run(run_all(args, {"tcp": port, "unix": unix_path}))
+    finally:
+        server.terminate()
+        server.join()
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+
+    for r in results:
+        lat = r["latency"]
+        print(f"{r['transport']:4s} {r['size']:6d} B: 往返 p50 {lat['p50_ms']} ms / p99 {lat['p99_ms']} ms，"
+              f"{r['throughput']['msgs_per_sec']} msgs/s", file=sys.stderr)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
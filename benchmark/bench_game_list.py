@@ -0,0 +1,107 @@
+"""
+games/game_list 基準測試：大量評論下，舊的 LEFT JOIN + GROUP BY 與
+games.rating_sum / review_count 彙總欄位的查詢成本比較。
+
+用法（在專案根目錄）：
+    python -m benchmark.bench_game_list --reviews 1000000 --games 50
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmark.stats import summarize
+from database import db_fun as db
+from database.migrations import backfill_rating_aggregates
+
+# 改版前 get_game_list 使用的查詢
+OLD_QUERY = """
+    SELECT
+        g.id, g.name, g.game_type, g.max_players, g.current_version, g.short_desc,
+        IFNULL(AVG(r.rating), 0) AS avg_rating,
+        COUNT(r.id) AS review_count
+    FROM games g
+    LEFT JOIN game_reviews r ON g.id = r.game_id
+    WHERE g.visible = 1
+    GROUP BY g.id
+    ORDER BY g.id
+"""
+
+
+def seed(n_games, n_reviews):
+    with db.get_conn() as conn:
+        conn.executemany(
+            """INSERT INTO games (dev_user_id, name, game_type, max_players, current_version, visible)
+               VALUES (1, ?, 'cli', 2, '1.0', 1)""",
+            [(f"game_{i}",) for i in range(n_games)],
+        )
+        rng = random.Random(0)
+        batch = 100000
+        for start in range(0, n_reviews, batch):
+            rows = [(rng.randint(1, n_games), rng.randint(1, 10000), rng.randint(1, 5), "")
+                    for _ in range(min(batch, n_reviews - start))]
+            conn.executemany(
+                "INSERT INTO game_reviews (game_id, user_id, rating, comment) VALUES (?, ?, ?, ?)", rows
+            )
+
+
+def time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=1000000)
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_game_list_")
+    db.DB_PATH = os.path.join(workdir, "data.db")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        db.init_db()
+        t0 = time.perf_counter()
+        seed(args.games, args.reviews)
+        seed_sec = time.perf_counter() - t0
+
+        # 模擬舊資料庫升級：清空彙總欄位後重跑回填
+        with db.get_conn() as conn:
+            conn.execute("UPDATE games SET rating_sum = 0, review_count = 0")
+        t0 = time.perf_counter()
+        with db.get_conn() as conn:
+            backfill_rating_aggregates(conn)
+        backfill_sec = time.perf_counter() - t0
+
+        def old_list():
+            with db.get_conn() as conn:
+                return conn.execute(OLD_QUERY).fetchall()
+
+        old = time_calls(old_list, args.iterations)
+        new = time_calls(db.get_game_list, args.iterations)
+        assert [round(r[6], 2) for r in old_list()] == [g["avg_rating"] for g in db.get_game_list()["games"]]
+
+    result = {
+        "reviews": args.reviews,
+        "games": args.games,
+        "seed_sec": round(seed_sec, 2),
+        "backfill_sec": round(backfill_sec, 2),
+        "join_group_by": old,
+        "aggregate_columns": new,
+    }
+    print(f"JOIN + GROUP BY : p50={old['p50_ms']}ms p99={old['p99_ms']}ms", file=sys.stderr)
+    print(f"彙總欄位         : p50={new['p50_ms']}ms p99={new['p99_ms']}ms", file=sys.stderr)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
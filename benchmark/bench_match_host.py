@@ -0,0 +1,103 @@
+"""
+單場模式 vs 多場模式的資源比較：同時開 N 個房間，每房連上兩個玩家（Battleship），
+從 worker 的 heartbeat 讀 RSS，比較每場對戰平均佔多少記憶體、開房要多久。
+
+  process - 每場一個 game worker 行程（GamePool 預設）
+  multi   - 每款遊戲一個 host 行程，開房只是在裡面多一個 Match
+
+用法（在專案根目錄）：
+    python -m benchmark.bench_match_host --rooms 50
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from benchmark.stats import summarize
+from lobby.game_pool import GamePool
+from lobby.supervisor import Supervisor
+
+GAME = Path(__file__).resolve().parent.parent / "games" / "4_Battleship_5x5_Network" / "game_server.py"
+HEARTBEAT = 0.5
+
+
+async def connect(port, room_id, multi):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if multi:
+        writer.write(f"HELLO {room_id}\n".encode())
+    await reader.readuntil(b"|")        # ID:n
+    return writer
+
+
+async def run(mode, rooms, port_base):
+    multi = mode == "multi"
+    supervisor = Supervisor(heartbeat=HEARTBEAT, check_interval=60, idle_seconds=None)
+    pool = GamePool(warm_per_game=2, listen_timeout=10, port_range=(port_base, port_base + rooms + 10),
+                    supervisor=supervisor)
+    supervisor.start()
+    pool.prewarm([GAME])
+    await asyncio.sleep(1.0)
+
+    start_sec = []
+    writers = []
+    for room_id in range(1, rooms + 1):
+        t0 = time.perf_counter()
+        port = await pool.start(GAME, room_id=room_id, multi=multi)
+        start_sec.append(time.perf_counter() - t0)
+        for _ in range(2):
+            writers.append(await connect(port, room_id, multi))
+
+    # 等每個行程都送過至少一次 heartbeat
+    await asyncio.sleep(HEARTBEAT * 3)
+    if multi:
+        total_kb = sum(host.rss_kb or 0 for host in pool.hosts.values())
+        processes = len(pool.hosts)
+    else:
+        total_kb = supervisor.stats()["total_rss_kb"]
+        processes = len(pool.busy)
+    conns = sum(m.conns for m in supervisor.matches)
+
+    for writer in writers:
+        writer.close()
+    supervisor.stop()
+    pool.shutdown()
+    for match in supervisor.matches:
+        supervisor.kill(match, "benchmark")
+    await asyncio.sleep(0.5)
+
+    return {
+        "rooms": rooms,
+        "processes": processes,
+        "conns": conns,
+        "total_rss_kb": total_kb,
+        "kb_per_room": round(total_kb / rooms, 1),
+        "start": summarize(start_sec),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--port", type=int, default=22000, help="兩種模式各自使用的 port 範圍起點")
+    args = parser.parse_args()
+
+    result = {}
+    for i, mode in enumerate(("process", "multi")):
+        # Supervisor / GamePool 的 log 印在 stdout，會混進 JSON 結果
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result[mode] = asyncio.run(run(mode, args.rooms, args.port + i * (args.rooms + 20)))
+        r = result[mode]
+        print(
+            f"{mode:8s}: {r['rooms']} 房 / {r['processes']} 個行程，共 {r['total_rss_kb']} KB，"
+            f"每房 {r['kb_per_room']} KB，開房 p50 {r['start'].get('p50_ms')} ms",
+            file=sys.stderr,
+        )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+抽鬼牌桌數放大的測試：不走網路，直接用 game_server.py 裡的 OldMaidTable 把整局打完，
+比較每一輪（換人 + 抽牌 + 去對 + 淘汰）的成本會不會隨人數變大。
+
+  ring   - 目前的做法：還有牌的玩家串成雙向環，換人與淘汰都是 O(1)
+  linear - 舊版 next_turn 的做法：沿著 turn_order 用 while 跳過已脫手的玩家
+
+人數越多、局越後面，已脫手的人越多，linear 每輪要跳過的人也越多。
+
+用法（在專案根目錄）：
+    python -m benchmark.bench_old_maid --players 3,6,12,20,50,100,200 --games 200
+"""
+import argparse
+import importlib.util
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+GAME_SERVER = Path(__file__).resolve().parent.parent / "games" / "5_多人抽鬼牌 (Old Maid Multiplayer)" / "game_server.py"
+
+
+def load_game_server():
+    spec = importlib.util.spec_from_file_location("old_maid_server", GAME_SERVER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LinearTurns:
+    """舊版的換人方式：turn_order 上的 index 往後找，跳過手牌為 0 的玩家"""
+
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+        self.idx = len(order) - 1
+
+    def _skip_empty(self, idx):
+        hands = self.table.hands
+        while hands[self.order[idx]].size == 0:
+            idx = (idx + 1) % len(self.order)
+        return idx
+
+    def advance(self):
+        n = len(self.order)
+        self.idx = self._skip_empty((self.idx + 1) % n)
+        target_idx = self._skip_empty((self.idx + 1) % n)
+        if target_idx == self.idx:
+            return None
+        self.table.picker = self.order[self.idx]
+        self.table.target = self.order[target_idx]
+        return self.table.picker, self.table.target
+
+
+def play(server, players, seed, mode):
+    """打完一局，回傳 (輪數, 花費秒數)"""
+    rng = random.Random(seed)
+    order = list(range(1, players + 1))
+    table = server.OldMaidTable(order, rng)
+    advance = LinearTurns(table, order).advance if mode == "linear" else table.advance
+
+    turns = 0
+    t0 = time.perf_counter()
+    while advance() is not None:
+        table.draw()
+        turns += 1
+    return turns, time.perf_counter() - t0
+
+
+def run(server, players, games, mode):
+    turns = 0
+    sec = 0.0
+    for seed in range(games):
+        t, s = play(server, players, seed, mode)
+        turns += t
+        sec += s
+    return {
+        "turns_per_game": round(turns / games, 1),
+        "us_per_turn": round(sec / max(turns, 1) * 1e6, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", default="3,6,12,20,50,100,200", help="逗號分隔的每桌人數")
+    parser.add_argument("--games", type=int, default=200, help="每種人數打幾局")
+    args = parser.parse_args()
+
+    server = load_game_server()
+    result = {}
+    for players in map(int, args.players.split(",")):
+        result[players] = {mode: run(server, players, args.games, mode) for mode in ("ring", "linear")}
+        r, l = result[players]["ring"], result[players]["linear"]
+        print(
+            f"{players:4d} 人：每局 {r['turns_per_game']} 輪，ring {r['us_per_turn']}µs/輪，linear {l['us_per_turn']}µs/輪",
+            file=sys.stderr,
+        )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
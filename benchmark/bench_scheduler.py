@@ -0,0 +1,141 @@
+"""
+計時器排程的比較：loop.call_later vs common.scheduler 的 TimerWheel。
+
+模擬同一個行程裡有大量對戰，每場都有一個回合延遲（一次性，多數會在到期前被取消重排，
+例如玩家提早出牌）和一個週期計時器（例如心跳 / 逾時檢查）。量測：
+  schedule - 排程 N 個一次性計時器的平均成本（µs/個）
+  cancel   - 取消它們的平均成本，以及取消後 event loop 裡還留著多少 handle
+  fire     - 實際觸發時間相對預定時間的延遲分佈（ms）
+  periodic - 每場一個週期計時器跑 --seconds 秒，實際觸發次數與延遲
+
+用法（在專案根目錄）：
+    python -m benchmark.bench_scheduler --matches 5000 --seconds 3
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmark.stats import summarize
+from common.scheduler import TimerWheel
+
+
+class LoopTimers:
+    """把 loop.call_later 包成與 TimerWheel 相同的介面，方便對照"""
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def call_later(self, delay, fn, *args):
+        return self.loop.call_later(delay, fn, *args)
+
+    def call_every(self, interval, fn, *args):
+        state = {}
+
+        def tick():
+            state["handle"] = self.loop.call_later(interval, tick)
+            fn(*args)
+
+        state["handle"] = self.loop.call_later(interval, tick)
+        return state
+
+
+def loop_handles(loop):
+    """event loop heap 裡的 handle 數（CPython 的實作細節，量不到就回傳 None）"""
+    scheduled = getattr(loop, "_scheduled", None)
+    return None if scheduled is None else len(scheduled)
+
+
+async def run_oneshot(kind, matches, delay):
+    loop = asyncio.get_running_loop()
+    timers = TimerWheel(loop=loop) if kind == "wheel" else LoopTimers(loop)
+    lags = []
+
+    def fired(due):
+        lags.append(loop.time() - due)
+
+    # 排程後全部取消，再重排一次（回合延遲被提早結束後重開的情況）
+    t0 = time.perf_counter()
+    handles = [timers.call_later(delay, fired, loop.time() + delay) for _ in range(matches)]
+    schedule_us = (time.perf_counter() - t0) / matches * 1e6
+
+    t0 = time.perf_counter()
+    for h in handles:
+        h.cancel()
+    cancel_us = (time.perf_counter() - t0) / matches * 1e6
+    left_after_cancel = loop_handles(loop)
+
+    for _ in range(matches):
+        timers.call_later(delay, fired, loop.time() + delay)
+    while len(lags) < matches:
+        await asyncio.sleep(delay / 4)
+
+    return {
+        "schedule_us": round(schedule_us, 3),
+        "cancel_us": round(cancel_us, 3),
+        "loop_handles_after_cancel": left_after_cancel,
+        "fire_lag": summarize(lags),
+    }
+
+
+async def run_periodic(kind, matches, interval, seconds):
+    loop = asyncio.get_running_loop()
+    timers = TimerWheel(loop=loop) if kind == "wheel" else LoopTimers(loop)
+    fired = [0]
+    last = {}
+    lags = []
+
+    def tick(i):
+        now = loop.time()
+        if i in last:
+            lags.append(now - last[i] - interval)
+        last[i] = now
+        fired[0] += 1
+
+    handles = [timers.call_every(interval, tick, i) for i in range(matches)]
+    peak_handles = loop_handles(loop)
+    cpu0 = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu0
+    for h in handles:
+        if isinstance(h, dict):
+            h["handle"].cancel()
+        else:
+            h.cancel()
+
+    return {
+        "fired": fired[0],
+        "expected": int(matches * seconds / interval),
+        "loop_handles": peak_handles,
+        "cpu_sec": round(cpu, 3),
+        "interval_lag": summarize(lags),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=5000)
+    parser.add_argument("--delay", type=float, default=0.5, help="一次性計時器的延遲（秒）")
+    parser.add_argument("--interval", type=float, default=0.25, help="週期計時器的間隔（秒）")
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    result = {}
+    for kind in ("call_later", "wheel"):
+        result[kind] = {
+            "oneshot": asyncio.run(run_oneshot(kind, args.matches, args.delay)),
+            "periodic": asyncio.run(run_periodic(kind, args.matches, args.interval, args.seconds)),
+        }
+        o, p = result[kind]["oneshot"], result[kind]["periodic"]
+        print(
+            f"{kind:10s}: 排程 {o['schedule_us']}µs，取消 {o['cancel_us']}µs（取消後 loop 仍有 "
+            f"{o['loop_handles_after_cancel']} 個 handle），觸發延遲 p99 {o['fire_lag'].get('p99_ms')}ms，"
+            f"週期 {p['fired']}/{p['expected']} 次、CPU {p['cpu_sec']}s",
+            file=sys.stderr,
+        )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
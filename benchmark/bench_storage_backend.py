@@ -0,0 +1,174 @@
+"""
+資料存取後端比較：同樣的請求組合分別送給
+  remote   - DBClient → TCP loopback → db_server 子行程（JSON 編解碼兩次 + socket 來回）
+  embedded - LocalStorage，在本行程用執行緒池直接呼叫 db_fun
+量測每種請求的延遲與總吞吐量。兩種模式各用一份新的暫存資料庫。
+
+請求組合（大致照 Lobby 的比例）：game_list、get_version、logout + login、list_online、grading。
+db_server 預設開著目錄快取；embedded 預設不快取（見 LocalStorage），可用 --embedded-cache 打開。
+
+用法（在專案根目錄）：
+    python -m benchmark.bench_storage_backend --concurrency 32 --seconds 5
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark.stats import summarize
+from database import db_fun as db
+from database.storage import make_backend
+
+ROOT = Path(__file__).resolve().parent.parent
+USERS = 200
+MIX = (
+    ("game_list", 40),
+    ("get_version", 20),
+    ("login", 20),
+    ("list_online", 10),
+    ("grading", 10),
+)
+
+
+def make_requests(op, rng, game_id, users):
+    """一個操作對應的請求：[(統計名稱, 請求), ...]"""
+    if op == "game_list":
+        return [("game_list", {"collection": "games", "action": "game_list", "data": {"user_id": 1}})]
+    if op == "get_version":
+        return [("get_version", {"collection": "games", "action": "get_version", "data": {"game_id": game_id}})]
+    if op == "login":
+        # 已登入的帳號不能重複登入，先登出再登入
+        name, uid = rng.choice(users)
+        return [
+            ("logout", {"collection": "User", "action": "logout", "data": {"id": uid}}),
+            ("login", {"collection": "User", "action": "login", "data": {"name": name, "password": "pw"}}),
+        ]
+    if op == "list_online":
+        return [("list_online", {"collection": "User", "action": "list_online", "data": {}})]
+    name, uid = rng.choice(users)
+    return [("grading", {"collection": "games", "action": "grading",
+                         "data": {"user_id": uid, "game_id": game_id, "score": rng.randint(1, 5), "comment": "bench"}})]
+
+
+def start_db_server(workdir, port):
+    """
+    在暫存目錄啟動 db_server 子行程（DB_PATH 是相對路徑，資料庫會建在 workdir）。
+    只開 TCP：不碰正式的 UNIX_PATH，以免跟正在跑的 db_server 衝突或留下 socket 檔
+    """
+    code = (
+        "import asyncio\n"
+        "from database import db_server\n"
+        f"db_server.PORT = {port}\n"
+        "db_server.UNIX_PATH = None\n"
+        "asyncio.run(db_server.main())\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.Popen([sys.executable, "-c", code], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def start_backend(kind, args):
+    workdir = tempfile.mkdtemp(prefix=f"bench_{kind}_")
+    proc = None
+    if kind == "remote":
+        proc = start_db_server(workdir, args.port)
+        backend = make_backend("remote", "127.0.0.1", args.port, size=args.pool_size)
+        for _ in range(100):
+            try:
+                await backend.start()
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        else:
+            proc.kill()
+            raise RuntimeError("db_server 沒有啟動")
+    else:
+        db.DB_PATH = os.path.join(workdir, "data.db")
+        backend = make_backend("embedded", readers=args.readers, cache_entries=args.embedded_cache)
+        await backend.start()
+    return backend, proc
+
+
+async def run_mode(kind, args):
+    backend, proc = await start_backend(kind, args)
+    try:
+        resp = await backend.request({"collection": "Dev_game", "action": "create_game",
+                                      "data": {"game_name": "bench", "user_id": 1, "config": "{}"}})
+        game_id = resp["game_id"]
+        created = await asyncio.gather(*(
+            backend.request({"collection": "User", "action": "create", "data": {"name": f"u{i}", "password": "pw"}})
+            for i in range(USERS)
+        ))
+        # 每個帳號同時只給一個 client 用，登出 / 登入不會互相打架
+        users = [(f"u{i}", resp["id"]) for i, resp in enumerate(created)]
+
+        ops = [op for op, weight in MIX for _ in range(weight)]
+        samples = {}
+        errors = [0]
+        stop = asyncio.Event()
+
+        async def client(seed):
+            rng = random.Random(seed)
+            mine = users[seed::args.concurrency]
+            while not stop.is_set():
+                for name, req in make_requests(rng.choice(ops), rng, game_id, mine):
+                    t0 = time.perf_counter()
+                    resp = await backend.request(req)
+                    samples.setdefault(name, []).append(time.perf_counter() - t0)
+                    if not resp.get("ok"):
+                        errors[0] += 1
+
+        tasks = [asyncio.create_task(client(i)) for i in range(args.concurrency)]
+        await asyncio.sleep(args.seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+    finally:
+        await backend.close()
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    total = sum(len(s) for s in samples.values())
+    return {
+        "backend": kind,
+        "requests_per_sec": round(total / args.seconds, 1),
+        "errors": errors[0],
+        "all": summarize([x for s in samples.values() for x in s]),
+        "ops": {op: summarize(s) for op, s in samples.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help=f"同時在途的請求數（最多 {USERS}）")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--pool-size", type=int, default=4, help="remote：DBClient 連線數")
+    parser.add_argument("--readers", type=int, default=4, help="embedded：讀取執行緒數")
+    parser.add_argument("--embedded-cache", type=int, default=0, help="embedded：目錄快取筆數，0 = 不快取")
+    parser.add_argument("--port", type=int, default=24411, help="remote：暫時的 db_server 監聽埠")
+    parser.add_argument("--backends", default="remote,embedded")
+    args = parser.parse_args()
+    args.concurrency = min(args.concurrency, USERS)
+
+    results = []
+    for kind in args.backends.split(","):
+        # init_db / db_fun 會 print，量測期間先丟掉
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results.append(asyncio.run(run_mode(kind, args)))
+
+    for r in results:
+        a = r["all"]
+        print(f"{r['backend']:8s}: {r['requests_per_sec']} req/s，p50 {a.get('p50_ms')} ms，"
+              f"p99 {a.get('p99_ms')} ms，錯誤 {r['errors']}", file=sys.stderr)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
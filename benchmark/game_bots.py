@@ -0,0 +1,170 @@
+"""
+不開視窗的協定 bot：照各款遊戲 game_client.py 的訊息格式連線，自動下合法的棋步打完整局。
+給 benchmark.load_games 壓測用，也可以拿來手動對 game_server.py 跑一局。
+
+每個 bot 記錄「送出動作 → 收到伺服器對這個動作的回應」的延遲：
+  Rock Paper Scissors - 出牌 → 下一則訊息（最後出牌的一方會直接收到結算）
+  Battleship          - ATTACK → RESULT
+  Old Maid            - DRAW_REQ → GOT
+等待對手、伺服器刻意排程的停頓（抽鬼牌換人的 1.5 秒）不算在內。
+
+    bot = BOTS["battleship"](rng)
+    await bot.play("127.0.0.1", port, room_id=None)
+    bot.latencies, bot.finished
+"""
+import asyncio
+import random
+import re
+import time
+
+from common.battleship import SIZE, encode_fleet, random_fleet
+from common.framing import FrameDecoder
+from common.game_sdk import HELLO
+
+READ_SIZE = 4096
+
+
+class Bot:
+    sep = "|"
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.latencies = []     # 秒
+        self.sent = 0
+        self.received = 0
+        self.finished = False   # 正常打到遊戲結束（不是斷線或逾時）
+        self.writer = None
+        self._waiting = None    # (送出時間, 回應的前綴)
+
+    async def play(self, host, port, room_id=None):
+        reader, self.writer = await asyncio.open_connection(host, port)
+        if room_id is not None:
+            self.writer.write(f"{HELLO} {room_id}\n".encode())
+        decoder = FrameDecoder(self.sep)
+        try:
+            self.on_connect()
+            while not self.writer.is_closing():
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                for msg in decoder.feed(data):
+                    self.received += 1
+                    if self._waiting and msg.startswith(self._waiting[1]):
+                        self.latencies.append(time.perf_counter() - self._waiting[0])
+                        self._waiting = None
+                    self.on_message(msg)
+        finally:
+            self.writer.close()
+
+    def send(self, msg, expect=None):
+        """送出一則訊息；expect 是回應的前綴，收到時記一筆延遲（"" 表示下一則訊息）"""
+        self.writer.write(msg.encode("utf-8") + self.sep.encode("utf-8"))
+        self.sent += 1
+        if expect is not None:
+            self._waiting = (time.perf_counter(), expect)
+
+    def done(self):
+        self.finished = True
+        self.writer.close()
+
+    def on_connect(self):
+        pass
+
+    def on_message(self, msg):
+        raise NotImplementedError
+
+
+# -------------------------------
+# Rock Paper Scissors（一行一則）
+# -------------------------------
+class RockPaperScissorsBot(Bot):
+    sep = "\n"
+    HAND = re.compile(r"\[([\d, ]*)\]")
+
+    def __init__(self, rng=random):
+        super().__init__(rng)
+        self.hand = []
+
+    def on_connect(self):
+        self.send(f"USER bot{self.rng.randrange(1 << 30)}")
+
+    def on_message(self, msg):
+        if msg.startswith(("Your cards:", "Remaining cards:")):
+            m = self.HAND.search(msg)
+            self.hand = [int(x) for x in m.group(1).split(",") if x.strip()] if m else []
+        elif msg.startswith("Choose a card"):
+            self.send(str(self.rng.choice(self.hand)), expect="")
+        elif msg == "=== Game Over ===":
+            self.finished = True
+
+
+# -------------------------------
+# Battleship 5x5
+# -------------------------------
+class BattleshipBot(Bot):
+    def __init__(self, rng=random):
+        super().__init__(rng)
+        self.player_id = None
+        self.targets = [(r, c) for r in range(SIZE) for c in range(SIZE)]
+
+    def on_message(self, msg):
+        if msg.startswith("ID:"):
+            self.player_id = int(msg.split(":")[1])
+            self.send(f"READY:{encode_fleet(random_fleet(self.rng))}")
+        elif msg == "START":
+            # 跟 game_client 一樣由玩家 1 先攻
+            if self.player_id == 1:
+                self.attack()
+        elif msg.startswith("RESULT:"):
+            defender = int(msg.split(":")[1].split(",")[0])
+            if defender == self.player_id:
+                self.attack()
+        elif msg.startswith("OVER:"):
+            self.done()
+
+    def attack(self):
+        # 對方的棋盤每格只打一次
+        r, c = self.targets.pop(self.rng.randrange(len(self.targets)))
+        self.send(f"ATTACK:{self.player_id},{r},{c}", expect="RESULT:")
+
+
+# -------------------------------
+# 多人抽鬼牌
+# -------------------------------
+class OldMaidBot(Bot):
+    def __init__(self, rng=random):
+        super().__init__(rng)
+        self.player_id = None
+        self.drawing = False    # 已送 DRAW_REQ，等 GOT / PAIRS 後回 DRAW_DONE
+
+    def on_message(self, msg):
+        tag, _, data = msg.partition(":")
+        if tag == "ID":
+            self.player_id = int(data)
+        elif tag == "TURN":
+            picker, target = map(int, data.split(","))
+            if picker == self.player_id:
+                self.drawing = True
+                self.send(f"DRAW_REQ:{picker},{target},0", expect="GOT:")
+        elif tag == "PAIRS" and self.drawing:
+            # 抽到的牌處理完（client 這時會播完去對動畫）
+            self.drawing = False
+            self.send(f"DRAW_DONE:{self.player_id}")
+        elif tag == "OVER":
+            self.done()
+
+
+BOTS = {
+    "rock paper scissors": RockPaperScissorsBot,
+    "battleship": BattleshipBot,
+    "old maid": OldMaidBot,
+}
+
+
+def bot_for(game_dir):
+    """依遊戲資料夾名稱找對應的 bot 類別，找不到回傳 None"""
+    name = game_dir.lower()
+    for key, cls in BOTS.items():
+        if key in name:
+            return cls
+    return None
@@ -0,0 +1,235 @@
+"""
+遊戲伺服器壓測：用 benchmark.game_bots 的 bot 同時打 N 場，對戰照 Lobby 的方式由 GamePool 開在本機。
+
+  --mode process - 每場一個 game worker 行程（GamePool 預設）
+  --mode multi   - 每款遊戲一個 host 行程，開房只是在裡面多一個 Match
+
+回報：
+  matches_per_sec   - 完成的場數 / 總時間
+  match             - 每場從開房到打完的時間
+  message           - bot 送出動作到收到回應的延遲（定義見 game_bots）
+  cpu_ms_per_match  - 伺服器端行程的 CPU 時間 / 完成場數
+                      （process：已結束子行程的 RUSAGE_CHILDREN，含每場啟動直譯器的成本；
+                        multi：host 行程 /proc 的 utime + stime，僅限 Linux）
+  rss_kb_per_match  - process：單場行程的峰值 RSS；multi：host 的峰值 RSS / 同時場數
+
+抽鬼牌的伺服器每回合會刻意停頓（發牌、換人、結算），一場要數十秒，場數/秒主要反映這些停頓；
+比較伺服器本身的成本看 message 與 cpu_ms_per_match。
+
+結果以 JSON 印在 stdout，--out 另存成檔案，方便跟之前的報告比較。
+
+用法（在專案根目錄）：
+    python -m benchmark.load_games --game battleship --matches 200 --concurrency 20 --mode multi --out report.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+
+from benchmark.game_bots import bot_for
+from benchmark.stats import summarize
+from lobby.game_pool import GamePool
+from lobby.supervisor import Supervisor
+
+GAMES_DIR = Path(__file__).resolve().parent.parent / "games"
+HEARTBEAT = 0.5
+SAMPLE_INTERVAL = 0.2       # 多場模式取樣 host RSS 的間隔
+
+
+def find_game(name):
+    """依名稱（不分大小寫的子字串）找遊戲資料夾，回傳 (game_server.py, max_players, Bot)"""
+    for game_dir in sorted(GAMES_DIR.iterdir()):
+        if name.lower() not in game_dir.name.lower():
+            continue
+        bot = bot_for(game_dir.name)
+        if bot is None:
+            continue
+        config = json.loads((game_dir / "config.json").read_text(encoding="utf-8"))
+        return game_dir / "game_server.py", int(config.get("max_players", 2)), bot
+    raise SystemExit(f"找不到有 bot 的遊戲: {name}")
+
+
+def children_cpu_sec():
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def children_peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def proc_cpu_sec(pid):
+    """Linux：/proc/<pid>/stat 的 utime + stime"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def proc_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+async def play_match(pool, script, players, bot_cls, room_id, multi, rng, timeout):
+    t0 = time.perf_counter()
+    port = await pool.start(script, room_id=room_id, multi=multi)
+    bots = [bot_cls(random.Random(rng.random())) for _ in range(players)]
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(b.play("127.0.0.1", port, room_id if multi else None) for b in bots)),
+            timeout,
+        )
+    except (asyncio.TimeoutError, OSError):
+        pass
+    return {
+        "sec": time.perf_counter() - t0,
+        "finished": all(b.finished for b in bots),
+        "latencies": [x for b in bots for x in b.latencies],
+        "messages": sum(b.sent + b.received for b in bots),
+    }
+
+
+async def run(args):
+    script, players, bot_cls = find_game(args.game)
+    multi = args.mode == "multi"
+    rng = random.Random(args.seed)
+
+    supervisor = Supervisor(heartbeat=HEARTBEAT, idle_seconds=None)
+    pool = GamePool(
+        warm_per_game=args.concurrency,
+        listen_timeout=10,
+        port_range=(args.port, args.port + args.concurrency * 2 + 10),
+        supervisor=supervisor,
+    )
+    supervisor.start()
+    pool.prewarm([script])
+    await asyncio.sleep(args.warmup)
+
+    # 先打一場不計分的暖身：多場模式順便把 host 開好，CPU 從這裡開始算（不含 host 啟動）
+    await play_match(pool, script, players, bot_cls, 0, multi, rng, args.timeout)
+    host_pid = None
+    host_rss_peak = 0
+    host_cpu_start = None
+    if multi:
+        host_pid = pool.hosts[script.resolve()].proc.pid
+        host_cpu_start = proc_cpu_sec(host_pid)
+    cpu_start = children_cpu_sec()
+
+    results = []
+    sem = asyncio.Semaphore(args.concurrency)
+    next_room = iter(range(1, args.matches + 1))
+
+    async def worker():
+        for room_id in next_room:
+            async with sem:
+                results.append(await play_match(pool, script, players, bot_cls, room_id, multi, rng, args.timeout))
+
+    async def sample_host():
+        nonlocal host_rss_peak
+        while True:
+            host_rss_peak = max(host_rss_peak, proc_rss_kb(host_pid) or 0)
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+    sampler = asyncio.ensure_future(sample_host()) if multi else None
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    total_sec = time.perf_counter() - t0
+
+    if multi:
+        sampler.cancel()
+        host_cpu_end = proc_cpu_sec(host_pid)
+        cpu_sec = None if host_cpu_start is None or host_cpu_end is None else host_cpu_end - host_cpu_start
+        rss_kb = host_rss_peak // args.concurrency if host_rss_peak else None
+    else:
+        # 等打完的 worker 都被回收，RUSAGE_CHILDREN 才會算進去
+        deadline = time.perf_counter() + 5
+        while pool.busy and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        cpu_end = children_cpu_sec()
+        cpu_sec = None if cpu_start is None else cpu_end - cpu_start
+        rss_kb = children_peak_rss_kb()
+
+    supervisor.stop()
+    pool.shutdown()
+    await asyncio.sleep(0.5)
+
+    done = [r for r in results if r["finished"]]
+    return {
+        "game": script.parent.name,
+        "mode": args.mode,
+        "players": players,
+        "matches": args.matches,
+        "concurrency": args.concurrency,
+        "finished": len(done),
+        "failed": len(results) - len(done),
+        "total_sec": round(total_sec, 3),
+        "matches_per_sec": round(len(done) / total_sec, 2),
+        "messages": sum(r["messages"] for r in results),
+        "match": summarize([r["sec"] for r in done]),
+        "message": summarize([x for r in results for x in r["latencies"]]),
+        "cpu_ms_per_match": round(cpu_sec * 1000 / len(done), 3) if cpu_sec is not None and done else None,
+        "rss_kb_per_match": rss_kb,
+        "host_rss_kb": host_rss_peak or None,
+        "env": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--game", default="battleship", help="遊戲資料夾名稱的一部分，例如 battleship / rock / old maid")
+    parser.add_argument("--mode", choices=["process", "multi"], default="multi")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=120, help="單場的時間上限（秒）")
+    parser.add_argument("--warmup", type=float, default=1.0, help="開始前等 worker 預熱的秒數")
+    parser.add_argument("--port", type=int, default=23000, help="GamePool 使用的 port 範圍起點")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="另存 JSON 報告的路徑")
+    args = parser.parse_args()
+
+    # Supervisor / GamePool 的 log 印在 stdout，會混進 JSON 結果
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        report = asyncio.run(run(args))
+
+    m = report["message"]
+    print(
+        f"{report['game']} ({report['mode']}): {report['finished']}/{report['matches']} 場完成，"
+        f"{report['matches_per_sec']} 場/秒，訊息延遲 p50 {m.get('p50_ms')} ms / p99 {m.get('p99_ms')} ms，"
+        f"每場 CPU {report['cpu_ms_per_match']} ms、RSS {report['rss_kb_per_match']} KB",
+        file=sys.stderr,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+Lobby 端對端壓測：用 client_net.LobbyClient 模擬大量玩家，量 lobby_server + db_server 撐得住多少人。
+
+每位虛擬玩家（session）依 --rate 的 Poisson 到達，每 --players 人湊成一間房：
+  房主：register/login → list_games → create_room → 訂閱或輪詢房間 → 人齊後 ready
+        → 全員準備好後 start_game → 用 game_bots 打完這局 → grading → close_room → logout
+  房客：register/login → list_games → list_rooms → join_room → 訂閱或輪詢房間
+        → guest_ready → 遊戲開始後用 game_bots 打完這局 → grading → logout
+--poll 比例的 session 用舊的每隔 --poll-interval 秒查 Room/status，其餘用 Room/subscribe 推播。
+動作之間隨機停頓（平均 --think 秒）模擬玩家操作。
+
+回報每個動作的延遲統計與直方圖、錯誤率、session 結果，以及 lobby / db_server 行程的 CPU 與 RSS
+（Linux 從 /proc 取樣，行程用命令列自動找，或以 --lobby-pid / --db-pid 指定），
+最後附上 Lobby 的 Stats（DB 連線池、遊戲行程池）。
+
+註冊的帳號與評分會寫進 DB，請讓 db_server 使用測試用的資料庫（例如在另一個目錄放一份 data.db 啟動）。
+
+用法（在專案根目錄，lobby_server 與 db_server 已啟動）：
+    python -m benchmark.load_lobby --sessions 1000 --rate 50 --game battleship --out lobby_report.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+
+from benchmark.game_bots import bot_for
+from benchmark.load_games import proc_cpu_sec, proc_rss_kb
+from benchmark.stats import histogram, summarize
+from client.client_net import LobbyClient
+from lobby.lobby_server import LOBBY_HOST, LOBBY_PORT
+
+SAMPLE_INTERVAL = 0.5       # 取樣伺服器 CPU / RSS 的間隔（秒）
+
+
+class ActionFailed(Exception):
+    def __init__(self, action, error):
+        super().__init__(f"{action}: {error}")
+        self.action = action
+
+
+class Recorder:
+    """各動作的延遲樣本與錯誤數"""
+
+    def __init__(self):
+        self.calls = {}
+        self.samples = {}
+        self.errors = {}
+
+    def add(self, action, sec, ok=True):
+        self.calls[action] = self.calls.get(action, 0) + 1
+        if sec is not None:
+            self.samples.setdefault(action, []).append(sec)
+        if not ok:
+            self.errors[action] = self.errors.get(action, 0) + 1
+
+    async def call(self, action, coro):
+        """等待一個 LobbyClient 請求並記錄延遲；連線錯誤或回應 ok=False 時丟 ActionFailed"""
+        t0 = time.perf_counter()
+        try:
+            resp = await coro
+        except Exception as e:
+            self.add(action, None, ok=False)
+            raise ActionFailed(action, repr(e)) from e
+        ok = not isinstance(resp, dict) or resp.get("ok")
+        self.add(action, time.perf_counter() - t0, ok)
+        if not ok:
+            raise ActionFailed(action, resp.get("error"))
+        return resp
+
+    def report(self):
+        out = {}
+        for action in sorted(self.calls):
+            samples = self.samples.get(action, [])
+            errors = self.errors.get(action, 0)
+            calls = self.calls[action]
+            out[action] = {
+                "calls": calls,
+                "errors": errors,
+                "error_rate": round(errors / calls, 4) if calls else 0,
+                "latency": summarize(samples),
+                "histogram": histogram(samples),
+            }
+        return out
+
+
+class Group:
+    """湊成同一間房的 session：房主開好房後把 room_id 交給房客"""
+
+    def __init__(self, size):
+        self.size = size
+        self.members = []
+        self.room = asyncio.get_running_loop().create_future()
+
+
+class Session:
+    def __init__(self, index, args, rec, rng, group, is_host):
+        self.name = f"{args.prefix}_{index}"
+        self.args = args
+        self.rec = rec
+        self.rng = rng
+        self.group = group
+        self.is_host = is_host
+        self.poll = rng.random() < args.poll
+        self.client = LobbyClient(hosts=[args.host], port=args.port)
+        self.events = None      # 訂閱模式的房間事件佇列
+
+    async def think(self):
+        if self.args.think > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.args.think))
+
+    async def run(self):
+        try:
+            if not await self.client.connect():
+                raise ActionFailed("connect", "無法連線")
+            await self.login()
+            game = await self.pick_game()
+            if self.is_host:
+                await self.host(game)
+            else:
+                await self.guest(game)
+            await self.think()
+            await self.rec.call("logout", self.client.logout())
+        except BaseException:
+            if self.is_host and not self.group.room.done():
+                self.group.room.set_exception(ActionFailed("host", "房主沒有開成房間"))
+            raise
+        finally:
+            await self.client.close()
+
+    async def login(self):
+        c = self.client
+        try:
+            await self.rec.call("register", c.register(self.name, self.args.password))
+        except ActionFailed:
+            # 同名帳號已存在（例如重跑同一個 --prefix）就改登入
+            await self.rec.call("login", c.login(self.name, self.args.password))
+
+    async def pick_game(self):
+        await self.think()
+        resp = await self.rec.call("list_games", self.client.list_games())
+        for game in resp.get("games", []):
+            if self.args.game.lower() in game["name"].lower() and bot_for(game["name"]):
+                return game
+        raise ActionFailed("list_games", f"找不到遊戲 {self.args.game}")
+
+    # ---------- 房間狀態：訂閱或輪詢 ----------
+    async def watch(self, rid):
+        """開始關注房間並回傳目前狀態：訂閱模式用 subscribe 回傳的那份，輪詢模式查一次 status"""
+        if self.poll:
+            return await self.status(rid)
+        resp, self.events = await self.rec.call("subscribe", self._subscribe(rid))
+        return resp["snapshot"]
+
+    async def status(self, rid):
+        return await self.rec.call("status", self.client._req("Room", "status", {"room_id": rid}))
+
+    async def _subscribe(self, rid):
+        resp, queue = await self.client.subscribe_room(rid)
+        if not resp.get("ok"):
+            return resp
+        return {"ok": True, "snapshot": resp}, queue
+
+    async def wait_room(self, rid, cond):
+        """等到房間狀態符合 cond(snapshot)，回傳該 snapshot"""
+        if self.poll:
+            while True:
+                snap = await self.status(rid)
+                if cond(snap):
+                    return snap
+                await asyncio.sleep(self.args.poll_interval)
+        while True:
+            evt = await self.events.get()
+            snap = evt["status"]
+            if not snap.get("ok"):
+                raise ActionFailed("room_event", snap.get("error"))
+            if cond(snap):
+                return snap
+
+    async def play(self, game, host, port, match):
+        if not self.args.play:
+            return
+        bot = bot_for(game["name"])(self.rng)
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(bot.play(host, port, match), self.args.game_timeout)
+        except (asyncio.TimeoutError, OSError) as e:
+            self.rec.add("play", None, ok=False)
+            raise ActionFailed("play", repr(e))
+        self.rec.add("play", time.perf_counter() - t0, bot.finished)
+        if not bot.finished:
+            raise ActionFailed("play", "遊戲沒有正常結束")
+
+    async def grade(self, game):
+        await self.think()
+        await self.rec.call("grading", self.client.grading({
+            "game_id": game["id"],
+            "user_id": self.client.user_id,
+            "score": self.rng.randint(1, 5),
+            "comment": "load test",
+        }))
+
+    # ---------- 兩種角色 ----------
+    async def host(self, game):
+        c = self.client
+        await self.think()
+        resp = await self.rec.call("create_room", c.create_room(f"{self.name}_room", game["id"]))
+        rid = resp["room_id"]
+        snap = await self.watch(rid)
+        self.group.room.set_result(rid)
+
+        if len(snap["guest_id"]) < self.group.size - 1:
+            await self.wait_room(rid, lambda s: len(s["guest_id"]) >= self.group.size - 1)
+        await self.think()
+        await self.rec.call("ready", c._req("Room", "ready", {"room_id": rid}))
+        await self.wait_room(rid, lambda s: s["all_ready"])
+        await self.think()
+        resp = await self.rec.call("start_game", c._req("Room", "start_game", {
+            "room_id": rid, "game_id": game["id"], "game_name": game["name"],
+        }))
+        data = resp["data"]
+        await self.play(game, data["host"], data["port"], data["match"])
+        await self.grade(game)
+        await self.rec.call("close_room", c.close_room(rid))
+        if not self.poll:
+            await self.rec.call("unsubscribe", c.unsubscribe_room(rid))
+
+    async def guest(self, game):
+        c = self.client
+        await self.think()
+        await self.rec.call("list_rooms", c.list_rooms())
+        rid = await self.group.room
+        await self.rec.call("join_room", c.join_room(rid))
+        snap = await self.watch(rid)
+
+        if snap["status"] != "ready":
+            await self.wait_room(rid, lambda s: s["status"] == "ready")
+        await self.think()
+        await self.rec.call("guest_ready", c.guest_ready(rid))
+        snap = await self.wait_room(rid, lambda s: s["status"] == "play" and s["game_port"])
+        await self.play(game, snap["game_host"], snap["game_port"], snap["game_match"])
+        await self.grade(game)
+
+
+def find_pid(module):
+    """Linux：從 /proc 找命令列裡有 `-m module` 的行程"""
+    for entry in Path("/proc").glob("[0-9]*"):
+        try:
+            cmdline = (entry / "cmdline").read_bytes().split(b"\0")
+        except OSError:
+            continue
+        if module.encode() in cmdline and b"-m" in cmdline:
+            return int(entry.name)
+    return None
+
+
+async def sample_servers(pids, usage):
+    """定期記錄各伺服器行程的 CPU 時間與 RSS 峰值"""
+    start = {name: proc_cpu_sec(pid) for name, pid in pids.items()}
+    while True:
+        for name, pid in pids.items():
+            u = usage.setdefault(name, {"pid": pid, "cpu_sec": None, "peak_rss_kb": 0})
+            cpu, rss = proc_cpu_sec(pid), proc_rss_kb(pid)
+            if cpu is not None and start[name] is not None:
+                u["cpu_sec"] = round(cpu - start[name], 3)
+            u["peak_rss_kb"] = max(u["peak_rss_kb"], rss or 0)
+        await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+async def lobby_stats(args):
+    client = LobbyClient(hosts=[args.host], port=args.port)
+    if not await client.connect():
+        return None
+    try:
+        out = {}
+        for action in ("db_pool", "game_pool"):
+            resp = await client._req("Stats", action)
+            out[action] = resp.get("stats")
+        return out
+    finally:
+        await client.close()
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    rec = Recorder()
+    pids = {"lobby": args.lobby_pid or find_pid("lobby.lobby_server"),
+            "db_server": args.db_pid or find_pid("database.db_server")}
+    pids = {name: pid for name, pid in pids.items() if pid}
+    usage = {}
+    sampler = asyncio.ensure_future(sample_servers(pids, usage))
+
+    outcomes = {}
+    active = 0
+    peak_active = 0
+    session_sec = []
+
+    async def one(session):
+        nonlocal active, peak_active
+        active += 1
+        peak_active = max(peak_active, active)
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(session.run(), args.session_timeout)
+            result = "ok"
+            session_sec.append(time.perf_counter() - t0)
+        except asyncio.TimeoutError:
+            result = "timeout"
+        except ActionFailed as e:
+            result = f"failed:{e.action}"
+        except Exception as e:
+            result = f"failed:{type(e).__name__}"
+        finally:
+            active -= 1
+        outcomes[result] = outcomes.get(result, 0) + 1
+
+    tasks = []
+    group = None
+    t0 = time.perf_counter()
+    for i in range(args.sessions):
+        if group is None or len(group.members) == group.size:
+            group = Group(args.players)
+        session = Session(i, args, rec, random.Random(rng.random()), group, is_host=not group.members)
+        group.members.append(session)
+        tasks.append(asyncio.ensure_future(one(session)))
+        await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    total_sec = time.perf_counter() - t0
+    sampler.cancel()
+
+    for u in usage.values():
+        if u["cpu_sec"] is not None:
+            u["cpu_percent"] = round(u["cpu_sec"] / total_sec * 100, 1)
+
+    actions = rec.report()
+    calls = sum(a["calls"] for a in actions.values())
+    errors = sum(a["errors"] for a in actions.values())
+    return {
+        "sessions": args.sessions,
+        "rate": args.rate,
+        "players_per_room": args.players,
+        "poll_ratio": args.poll,
+        "play": args.play,
+        "total_sec": round(total_sec, 3),
+        "peak_sessions": peak_active,
+        "outcomes": outcomes,
+        "session": summarize(session_sec),
+        "requests": calls,
+        "requests_per_sec": round(calls / total_sec, 1),
+        "error_rate": round(errors / calls, 4) if calls else 0,
+        "actions": actions,
+        "servers": usage,
+        "lobby_stats": await lobby_stats(args),
+        "env": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=LOBBY_HOST, help="Lobby 位址（預設與 lobby_server 的 LOBBY_HOST 相同）")
+    parser.add_argument("--port", type=int, default=LOBBY_PORT)
+    parser.add_argument("--sessions", type=int, default=200, help="總共要模擬的玩家數")
+    parser.add_argument("--rate", type=float, default=20, help="每秒平均到達的玩家數（Poisson）")
+    parser.add_argument("--game", default="battleship", help="遊戲名稱的一部分（需有對應的 game_bots）")
+    parser.add_argument("--players", type=int, default=2, help="每間房的人數（含房主）")
+    parser.add_argument("--poll", type=float, default=0.0, help="改用輪詢 Room/status 的 session 比例 0~1")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--think", type=float, default=0.2, help="動作之間的平均停頓（秒），0 = 不停頓")
+    parser.add_argument("--no-play", dest="play", action="store_false",
+                        help="開局後不連遊戲伺服器（對戰會留到 Supervisor 閒置回收）")
+    parser.add_argument("--game-timeout", type=float, default=120)
+    parser.add_argument("--session-timeout", type=float, default=300)
+    parser.add_argument("--prefix", default=f"load{os.getpid()}", help="帳號名稱前綴")
+    parser.add_argument("--password", default="load")
+    parser.add_argument("--lobby-pid", type=int)
+    parser.add_argument("--db-pid", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="另存 JSON 報告的路徑")
+    args = parser.parse_args()
+
+    # LobbyClient 連線時的 log 印在 stdout，會混進 JSON 結果
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        report = asyncio.run(run(args))
+
+    print(
+        f"{report['sessions']} 位玩家、{report['total_sec']} 秒：同時最多 {report['peak_sessions']} 人，"
+        f"{report['requests_per_sec']} req/s，錯誤率 {report['error_rate']}，結果 {report['outcomes']}",
+        file=sys.stderr,
+    )
+    for action, a in report["actions"].items():
+        lat = a["latency"]
+        print(f"  {action:12s} {a['calls']:6d} 次  p50 {lat.get('p50_ms')} ms  p99 {lat.get('p99_ms')} ms"
+              f"  錯誤 {a['errors']}", file=sys.stderr)
+    for name, u in report["servers"].items():
+        print(f"  {name}: CPU {u.get('cpu_percent')}%  RSS 峰值 {u['peak_rss_kb']} KB", file=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import bisect
+import math
+
+
+def percentile(samples, p):
+    """回傳第 p 百分位（nearest-rank），samples 不需事先排序"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+def summarize(samples):
+    """把延遲樣本（秒）整理成毫秒統計"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    ms = lambda x: round(x * 1000, 3)
+    return {
+        "count": len(ordered),
+        "avg_ms": ms(sum(ordered) / len(ordered)),
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p90_ms": ms(percentile(ordered, 90)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]),
+    }
+
+
+HIST_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def histogram(samples, bounds_ms=HIST_BOUNDS_MS):
+    """把延遲樣本（秒）依毫秒上界分桶：{"<=1ms": n, ..., ">5000ms": n}"""
+    counts = [0] * (len(bounds_ms) + 1)
+    for x in samples:
+        counts[bisect.bisect_left(bounds_ms, x * 1000)] += 1
+    out = {f"<={b}ms": n for b, n in zip(bounds_ms, counts)}
+    out[f">{bounds_ms[-1]}ms"] = counts[-1]
+    return out
@@ -0,0 +1,190 @@
+"""
+FrameDecoder 壓力測試：大量極小、被任意切碎的 | 分隔訊息（含中文與 emoji）。
+
+兩個部分：
+  decoder - 同一串 bytes 以隨機位置切碎（最小 1 byte）後逐段 feed，驗證內容完全一致並量測吞吐量
+  socket  - 本機起一個 game_sdk 的 echo 對戰，多個執行緒版 client 把訊息切碎後逐段 send
+            （TCP_NODELAY），收端用 iter_frames 讀回來逐則比對，量測每秒訊息數與往返延遲
+
+用法（在專案根目錄）：
+    python -m benchmark.stress_framing --messages 200000 --clients 8 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import threading
+import time
+
+from benchmark.stats import summarize
+from common.framing import FrameDecoder, iter_frames
+from common.game_sdk import Match
+
+WORDS = ["ATTACK:1,2,3", "READY", "COUNT:2,7", "抽鬼牌", "DRAW_REQ:1,3,0", "🎮", "TURN:1,2", "é"]
+
+
+def make_messages(rng, n):
+    return [f"{rng.choice(WORDS)}#{i}" for i in range(n)]
+
+
+def fragment(rng, data, max_piece=7):
+    """把 bytes 切成隨機長度 1..max_piece 的碎片"""
+    pieces = []
+    pos = 0
+    while pos < len(data):
+        step = rng.randint(1, max_piece)
+        pieces.append(data[pos:pos + step])
+        pos += step
+    return pieces
+
+
+def run_decoder(n):
+    rng = random.Random(0)
+    messages = make_messages(rng, n)
+    data = b"".join(m.encode("utf-8") + b"|" for m in messages)
+    pieces = fragment(rng, data)
+
+    decoder = FrameDecoder("|")
+    out = []
+    t0 = time.perf_counter()
+    for piece in pieces:
+        out.extend(decoder.feed(piece))
+    sec = time.perf_counter() - t0
+
+    assert out == messages, "decoder 輸出與原始訊息不一致"
+    assert decoder.pending == 0
+    return {
+        "messages": n,
+        "pieces": len(pieces),
+        "bytes": len(data),
+        "msgs_per_sec": round(n / sec),
+        "mb_per_sec": round(len(data) / sec / 1e6, 2),
+    }
+
+
+class Echo(Match):
+    """把每則訊息原封不動送回給發送者"""
+
+    max_players = 1024
+    sep = "|"
+    send_queue_max = 1 << 20    # client 不等回音就一直送，這裡量的是切割正確性，不做慢速斷線
+
+    async def on_message(self, player, msg):
+        player.send(msg)
+
+
+def start_echo_server():
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        async def main():
+            match = Echo()
+            state["match"] = match
+            state["loop"] = asyncio.get_running_loop()
+            server = await match.start(0, "127.0.0.1")
+            state["port"] = server.sockets[0].getsockname()[1]
+            ready.set()
+            await match.ended.wait()
+            match.server.close()
+
+        asyncio.run(main())
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return state
+
+
+def client_loop(port, seed, seconds, result):
+    rng = random.Random(seed)
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sent_msgs = []
+    sent_at = {}
+    received = []
+    latencies = []
+    errors = []
+
+    def receiver():
+        expect = 0
+        for msg in iter_frames(sock, "|"):
+            if msg != sent_msgs[expect]:
+                errors.append((expect, msg))
+            latencies.append(time.perf_counter() - sent_at[expect])
+            expect += 1
+            received.append(msg)
+
+    t = threading.Thread(target=receiver, daemon=True)
+    t.start()
+
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        batch = make_messages(rng, 50)
+        for msg in batch:
+            sent_msgs.append(msg)
+            sent_at[i] = time.perf_counter()
+            i += 1
+            for piece in fragment(rng, msg.encode("utf-8") + b"|"):
+                sock.sendall(piece)
+
+    # 等最後的回音收完
+    wait_until = time.perf_counter() + 5
+    while len(received) < i and time.perf_counter() < wait_until:
+        time.sleep(0.01)
+    sock.shutdown(socket.SHUT_RDWR)
+    sock.close()
+    t.join(timeout=1)
+    result.append({"sent": i, "received": len(received), "errors": len(errors), "latencies": latencies})
+
+
+def run_socket(clients, seconds):
+    server = start_echo_server()
+    results = []
+    threads = [
+        threading.Thread(target=client_loop, args=(server["port"], seed, seconds, results))
+        for seed in range(clients)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sec = time.perf_counter() - t0
+    server["loop"].call_soon_threadsafe(server["match"].end)
+
+    sent = sum(r["sent"] for r in results)
+    latencies = [x for r in results for x in r["latencies"]]
+    return {
+        "clients": clients,
+        "sent": sent,
+        "received": sum(r["received"] for r in results),
+        "errors": sum(r["errors"] for r in results),
+        "msgs_per_sec": round(sent / sec),
+        "round_trip": summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    result = {
+        "decoder": run_decoder(args.messages),
+        "socket": run_socket(args.clients, args.seconds),
+    }
+    d, s = result["decoder"], result["socket"]
+    print(f"decoder: {d['msgs_per_sec']} msgs/s（{d['pieces']} 段碎片）", file=sys.stderr)
+    print(f"socket : {s['msgs_per_sec']} msgs/s，收到 {s['received']}/{s['sent']}，錯誤 {s['errors']}", file=sys.stderr)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if s["errors"] or s["received"] != s["sent"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import asyncio
-from common.network import send_msg, recv_msg
+from common.network import RpcClient
 from pathlib import Path
 import json
 
@@ -39,7 +39,8 @@ class LobbyClient:
         self.writer = None
         self.user_id = None
         self.username = None
-        self.lock = asyncio.Lock()
+        self.rpc = None
+        self.room_events = {}   # room_id -> asyncio.Queue，Lobby 推播的房間事件
 
     async def connect(self):
         """嘗試多個 IP，直到成功連線到 Lobby"""
@@ -47,6 +48,7 @@ class LobbyClient:
             try:
                 print(f"🔍 嘗試連線 Lobby：{host}:{self.port} ...")
                 self.reader, self.writer = await asyncio.open_connection(host, self.port)
+                self.rpc = RpcClient(self.reader, self.writer, on_event=self._on_event)
                 self.host = host
                 print(f"✅ 已連線到 Lobby Server：{host}:{self.port}")
                 return True
@@ -57,18 +59,23 @@ class LobbyClient:
 
 
     async def close(self):
-        if self.writer:
-            self.writer.close()
-            await self.writer.wait_closed()
+        if self.rpc:
+            await self.rpc.close()
 
     # -------------------------------
     # 封裝請求/回應機制
     # -------------------------------
     async def _req(self, collection, action, data=None):
         req = {"collection": collection, "action": action, "data": data or {}}
-        async with self.lock:  # ✅ 同步鎖
-            await send_msg(self.writer, req)
-            return await recv_msg(self.reader)
+        # ✅ 以 rid 多工，背景輪詢不再排在使用者操作後面
+        return await self.rpc.request(req)
+
+    def _on_event(self, msg):
+        """Lobby 主動推播的封包（沒有 rid），依房間分送到對應的佇列"""
+        if msg.get("event") == "room":
+            queue = self.room_events.get(msg.get("room_id"))
+            if queue:
+                queue.put_nowait(msg)
 
     # -------------------------------
     # 使用者相關
@@ -145,6 +152,23 @@ class LobbyClient:
 
         data = {"room_id": room_id, "user_id": self.user_id}
         return await self._req("Room", "leave", data)
+
+    async def subscribe_room(self, room_id):
+        """訂閱房間事件，回傳 (目前房間狀態, 事件佇列)；之後每個事件都附完整的房間狀態"""
+        queue = asyncio.Queue()
+        self.room_events[room_id] = queue
+        resp = await self._req("Room", "subscribe", {"room_id": room_id, "user_id": self.user_id})
+        if not resp.get("ok"):
+            self.room_events.pop(room_id, None)
+        return resp, queue
+
+    async def unsubscribe_room(self, room_id):
+        """取消訂閱房間事件"""
+        self.room_events.pop(room_id, None)
+        try:
+            return await self._req("Room", "unsubscribe", {"room_id": room_id, "user_id": self.user_id})
+        except ConnectionError as e:
+            return {"ok": False, "error": str(e)}
     # -------------------------------
     # 邀請相關
     # -------------------------------
@@ -317,27 +317,34 @@ async def room_wait_phase(client, room_id, room_name, game_id):
     
 
     async def check_guest_join():
-        #todo
-        
-        """背景任務：每秒檢查房間狀態"""
+        """背景任務：訂閱房間事件，狀態有變化時由 Lobby 主動推播"""
         nonlocal guest_joined, guest_name, stop_flag, respout
+        try:
+            resp, events = await client.subscribe_room(room_id)
+        except Exception as e:
+            print(f"⚠️ 無法訂閱房間狀態：{e}")
+            return
+
         while not stop_flag:
-            try:
-                # 向伺服器查詢房間狀態
-                resp = await client._req("Room", "status", {"room_id": room_id})
-                respout.clear()
-                respout.update(resp)
-                #print(f"房間狀態回應：{resp}")
-                if resp and resp.get("ok") and resp.get("guest_joined") :
-                    guest_joined = resp.get("guest_joined", False)
-                    guest_name = resp.get("guest_name", None)
-                else:
-                    guest_joined = False
-                    guest_name = None
-            except Exception as e:
-                # 不中斷 loop，只印出錯誤
-                print(f"⚠️ 無法檢查房間狀態：{e}")
-            await asyncio.sleep(1)
+            respout.clear()
+            respout.update(resp)
+            #print(f"房間狀態：{resp}")
+            if not resp or not resp.get("ok"):
+                # 房間已關閉（或訂閱失敗），不會再有事件進來
+                print("\n❌ 房間已不存在，返回大廳。")
+                await asyncio.sleep(1)
+                stop_flag = True
+                return
+            if resp.get("guest_joined"):
+                guest_joined = resp.get("guest_joined", False)
+                guest_name = resp.get("guest_name", None)
+            else:
+                guest_joined = False
+                guest_name = None
+
+            # 等下一個事件（每個事件都附完整的房間狀態）
+            evt = await events.get()
+            resp = evt.get("status") or {}
 
     # 啟動背景檢查任務
     listener = asyncio.create_task(check_guest_join())
@@ -405,7 +412,7 @@ async def room_wait_phase(client, room_id, room_name, game_id):
                         print("⏳ 等待所有玩家準備中...")
                         while status.get("all_ready") != True:
                             #print(f"status:{status}")
-                            await asyncio.sleep(1)
+                            await asyncio.sleep(0.1)
                         
                         while True:
                             print("✅ 所有玩家已準備好，輸入1開始遊戲！")
@@ -422,16 +429,21 @@ async def room_wait_phase(client, room_id, room_name, game_id):
                             "game_id": game_id,
                             "game_name": game_name
                         }
-                        data = await client._req("Room", "start_game", data)
-                        await asyncio.sleep(2)
-                        host = status.get("game_host")
-                        port = status.get("game_port")
+                        # Lobby 等遊戲伺服器開始監聽才回應，拿到的 host/port 可以直接連
+                        resp = await client._req("Room", "start_game", data)
+                        if not resp.get("ok"):
+                            print(f"❌ 開始遊戲失敗：{resp.get('error', '未知錯誤')}")
+                            time.sleep(1.5)
+                            continue
+                        game = resp["data"]
+                        host = game.get("host")
+                        port = game.get("port")
                         
                         
-                        print(f"🎮 連線到遊戲伺服器 {host}:{port} ...")
+                        print(f"🎮 連線到遊戲伺服器 {host}:{port}（{game.get('start_ms')} ms 就緒）...")
                         
                         client_path = Path("client") / f"user_{client.user_id}_{client.username}" / f"{game_id}_{game_name}" / "game_client.py"
-                        subprocess.run(["python", str(client_path), str(host), str(port), str(client.user_id)])
+                        run_game_client(client_path, host, port, client.user_id, game.get("match"))
                         
                         
                         print("\n遊戲結束，輸入1進行評分！")
@@ -474,9 +486,13 @@ async def room_wait_phase(client, room_id, room_name, game_id):
 
             await asyncio.sleep(0.05)  # 稍微讓出 CPU
 
+            if stop_flag:
+                break
+
     finally:
         stop_flag = True
         listener.cancel()
+        await client.unsubscribe_room(room_id)
 
 
 async def guest_wait_phase(client, room_id, room_name, game_id):
@@ -485,16 +501,19 @@ async def guest_wait_phase(client, room_id, room_name, game_id):
     respout = {}
 
     async def check_room_status():
-        """背景任務：定期檢查房間狀態"""
+        """背景任務：訂閱房間事件，等 Lobby 推播狀態變化"""
         nonlocal stop_flag, respout
+        try:
+            resp, events = await client.subscribe_room(room_id)
+        except Exception as e:
+            print(f"⚠️ 無法取得房間狀態：{e}")
+            stop_flag = True
+            return
+
         while not stop_flag:
             try:
-                try:
-                    resp = await client._req("Room", "status", {"room_id": room_id})
-                    respout = resp
-                except Exception as e:
-                    print(f"⚠️ 無法取得房間狀態：{e}")
-                #print(f"房間狀態回應：{resp}")
+                respout = resp
+                #print(f"房間狀態：{resp}")
                 if not resp or not resp.get("ok"):
                     print("\n❌ 房間已被解散。")
                     await asyncio.sleep(1)
@@ -503,18 +522,20 @@ async def guest_wait_phase(client, room_id, room_name, game_id):
 
                 status = resp.get("status")
 
+                if status == "starting":
+                    print("\n⏳ 房主已開始遊戲，等待遊戲伺服器啟動...")
+
+                # Lobby 只有在遊戲伺服器開始監聽後才會推播 play，可以直接連線
                 if status == "play":
                     clear_screen()
                     print("🚀 房主已開始遊戲！")
-                    await asyncio.sleep(2)
                     game_host = resp.get("game_host")
                     game_port = resp.get("game_port")
                     
                     if game_host and game_port:
                         print(f"🎮 連線到遊戲伺服器 {game_host}:{game_port} ...")
-                        await asyncio.sleep(1)
                         client_path = Path("client") / f"user_{client.user_id}_{client.username}" / f"{game_id}_{await client.game_id_to_name(game_id)}" / "game_client.py"
-                        subprocess.run(["python", str(client_path), game_host, str(game_port), str(client.user_id)])
+                        run_game_client(client_path, game_host, game_port, client.user_id, resp.get("game_match"))
                         
                         
                         
@@ -540,7 +561,9 @@ async def guest_wait_phase(client, room_id, room_name, game_id):
                 stop_flag = True
                 break
 
-            await asyncio.sleep(1)
+            # 等下一個事件（每個事件都附完整的房間狀態）
+            evt = await events.get()
+            resp = evt.get("status") or {}
 
     listener = asyncio.create_task(check_room_status())
     resp = respout
@@ -621,8 +644,18 @@ async def guest_wait_phase(client, room_id, room_name, game_id):
         await asyncio.sleep(1)
         stop_flag = True
         listener.cancel()
+        await client.unsubscribe_room(room_id)
         
         
+def run_game_client(client_path, host, port, user_id, match=None):
+    """執行下載的 game_client.py；match 不為 None 表示遊戲跑在多場模式，透過 GAME_ROOM_ID 讓 client 連線後送握手"""
+    env = dict(os.environ)
+    env.pop("GAME_ROOM_ID", None)
+    if match:
+        env["GAME_ROOM_ID"] = str(match)
+    subprocess.run(["python", str(client_path), str(host), str(port), str(user_id)], env=env)
+
+
 async def grading_phase(client,game_id):
     
     """評分階段"""
@@ -1 +0,0 @@
-123
\ No newline at end of file
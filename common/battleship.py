@@ -0,0 +1,160 @@
+"""
+5x5 海戰棋的佈署規則（bitboard），給 game_server 與 benchmark 的 bot 使用。
+game_client.py 是單獨下載給玩家的，裡面帶了一份同樣的規則（只含佈署要用的部分），改規則時兩邊一起改。
+
+棋盤第 r 列第 c 行是第 r*5+c 個 bit。船隻依 FLEET 的順序（3-2-1-1）放置，
+每艘船必須是相連的直線，放好後周圍 9 格（含斜角）成為禁區，之後的船不能碰到。
+
+模組載入時就把「目前放到第幾艘、哪些格子不能用」的所有可能狀態列舉一遍，
+建成 FEASIBLE 表：{(第幾艘, blocked mask): 剩下的船是否還放得完}。
+5x5 加上 3-2-1-1 的狀態只有幾千個，之後每次點擊的判定都是查表：
+
+    blocked = 0
+    for k, ship in enumerate(ships):
+        blocked |= around(ship)
+        if not can_complete(k + 1, blocked):
+            ...   # 死路，剩下的船放不下
+
+random_fleet() 只在「還放得完」的位置中隨機挑，一次就能產生合法的船隊（給 bot 用）。
+"""
+import random
+
+SIZE = 5
+FLEET = (3, 2, 1, 1)                    # 3-2-1-1 船隻配置
+FULL = (1 << SIZE * SIZE) - 1
+COL_LEFT = sum(1 << (r * SIZE) for r in range(SIZE))
+COL_RIGHT = COL_LEFT << (SIZE - 1)
+
+
+def bit(r, c):
+    return 1 << (r * SIZE + c)
+
+
+def cells(mask):
+    """bitboard → [(r, c), ...]"""
+    return [divmod(i, SIZE) for i in range(SIZE * SIZE) if mask >> i & 1]
+
+
+def around(mask):
+    """mask 每一格的 9 格範圍（含自己與斜角）"""
+    row = mask | ((mask & ~COL_RIGHT) << 1) | ((mask & ~COL_LEFT) >> 1)
+    return (row | (row << SIZE) | (row >> SIZE)) & FULL
+
+
+def _lines(length):
+    out = []
+    for r in range(SIZE):
+        for c in range(SIZE):
+            if c + length <= SIZE:
+                out.append(sum(bit(r, c + i) for i in range(length)))
+            if length > 1 and r + length <= SIZE:
+                out.append(sum(bit(r + i, c) for i in range(length)))
+    return out
+
+
+# 各長度所有合法的直線位置
+LINES = {length: _lines(length) for length in set(FLEET)}
+
+
+# -------------------------------
+# 可行性表
+# -------------------------------
+def _build_feasible():
+    table = {}
+
+    def solve(k, blocked):
+        key = (k, blocked)
+        if key in table:
+            return table[key]
+        if k == len(FLEET):
+            table[key] = True
+            return True
+        ok = False
+        for line in LINES[FLEET[k]]:
+            if not line & blocked:
+                # 不提早 break：把每個可到達的狀態都填進表裡
+                ok = solve(k + 1, blocked | around(line)) or ok
+        table[key] = ok
+        return ok
+
+    solve(0, 0)
+    return table
+
+
+FEASIBLE = _build_feasible()
+
+
+def can_complete(k, blocked):
+    """已放好前 k 艘船、blocked 格子不能用時，剩下的船是否還放得完"""
+    ok = FEASIBLE.get((k, blocked))
+    if ok is None:
+        # 表裡沒有的狀態不是照規則放出來的（例如船互相碰到），視為死路
+        return False
+    return ok
+
+
+def options(k, blocked, partial=0, complete=True):
+    """
+    第 k 艘船還能放的位置：避開 blocked、包含 partial 已點的格子；
+    complete=True 時再排除放下後剩下的船就放不完的位置
+    """
+    return [
+        line for line in LINES[FLEET[k]]
+        if not line & blocked and line & partial == partial
+        and (not complete or can_complete(k + 1, blocked | around(line)))
+    ]
+
+
+def playable_cells(k, blocked, partial=0, complete=True):
+    """正在放第 k 艘船、已點了 partial 時，下一格可以點哪些格子（mask）"""
+    mask = 0
+    for line in options(k, blocked, partial, complete):
+        mask |= line
+    return mask & ~partial
+
+
+# -------------------------------
+# 整組船隊的驗證 / 產生
+# -------------------------------
+def validate_fleet(ships):
+    """ships 為依放置順序的 mask list；回傳錯誤訊息，合法則回傳 None"""
+    if [bin(s).count("1") for s in ships] != list(FLEET):
+        return "船隻數量或長度不符 3-2-1-1"
+    blocked = 0
+    for ship in ships:
+        if ship not in LINES[bin(ship).count("1")]:
+            return "船隻必須是相連的直線"
+        if ship & blocked:
+            return "船隻不可重疊或相鄰（9 格禁區）"
+        blocked |= around(ship)
+    return None
+
+
+def random_fleet(rng=random):
+    """隨機產生一組合法的船隊（依放置順序的 mask list）"""
+    ships = []
+    blocked = 0
+    for k in range(len(FLEET)):
+        ship = rng.choice(options(k, blocked))
+        ships.append(ship)
+        blocked |= around(ship)
+    return ships
+
+
+def encode_fleet(ships):
+    """[ship_mask, ...] → '0 0,0 1,0 2;2 0,3 0;4 4;2 4'（READY: 訊息的內容）"""
+    return ";".join(",".join(f"{r} {c}" for r, c in cells(ship)) for ship in ships)
+
+
+def parse_fleet(text):
+    """encode_fleet 的反向；格式錯誤丟 ValueError"""
+    ships = []
+    for part in text.split(";"):
+        mask = 0
+        for coord in part.split(","):
+            r, c = map(int, coord.split())
+            if not (0 <= r < SIZE and 0 <= c < SIZE) or mask & bit(r, c):
+                raise ValueError(f"座標不合法: {coord}")
+            mask |= bit(r, c)
+        ships.append(mask)
+    return ships
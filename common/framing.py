@@ -0,0 +1,71 @@
+"""
+分隔符號協定（例如 "ATTACK:1,2,3|"、一行一則訊息）的增量解碼器。
+
+TCP 是位元組串流，一次 recv 可能只收到半則訊息、也可能一次收到好幾則，
+多位元組的 UTF-8 字元也可能剛好被切在兩次 recv 之間。FrameDecoder 以 bytes 保留
+還沒收完的尾巴，湊齊分隔符號後才解碼，給 asyncio 的 game_sdk 與 benchmark 的 bot 使用。
+
+    decoder = FrameDecoder("|")
+    for cmd in decoder.feed(sock.recv(4096)):
+        handle_cmd(cmd)
+
+或直接用 iter_frames(sock, "|") 逐則讀取，連線關閉時結束。
+
+遊戲的 game_client.py 是單獨下載給玩家的，不能 import 這裡，各自帶一份精簡的切分與握手。
+"""
+
+MAX_FRAME = 65536
+
+
+class FrameTooLarge(ValueError):
+    pass
+
+
+class FrameDecoder:
+    def __init__(self, sep="|", max_frame=MAX_FRAME, skip_empty=True):
+        self.sep = sep.encode("utf-8") if isinstance(sep, str) else sep
+        self.max_frame = max_frame
+        self.skip_empty = skip_empty
+        self.buf = bytearray()
+        self.scanned = 0        # buf 前段已確認沒有分隔符號的長度，下次從這裡繼續找
+
+    def feed(self, data):
+        """餵入新收到的 bytes，回傳這次湊齊的完整訊息（str list，不含分隔符號）"""
+        buf = self.buf
+        buf += data
+        frames = []
+        start = 0
+        pos = max(0, self.scanned - len(self.sep) + 1)
+        while True:
+            idx = buf.find(self.sep, pos)
+            if idx < 0:
+                break
+            if idx > start or not self.skip_empty:
+                frames.append(buf[start:idx].decode("utf-8", errors="replace"))
+            start = pos = idx + len(self.sep)
+
+        if start:
+            del buf[:start]
+        self.scanned = len(buf)
+        if len(buf) > self.max_frame:
+            raise FrameTooLarge(f"訊息超過 {self.max_frame} bytes 仍沒有分隔符號")
+        return frames
+
+    def encode(self, msg):
+        return msg.encode("utf-8") + self.sep
+
+    @property
+    def pending(self):
+        """還沒湊齊的 bytes 數"""
+        return len(self.buf)
+
+
+def iter_frames(sock, sep="|", bufsize=4096):
+    """阻塞式 socket 的逐則讀取；對方關閉連線時結束"""
+    decoder = FrameDecoder(sep)
+    while True:
+        data = sock.recv(bufsize)
+        if not data:
+            return
+        yield from decoder.feed(data)
+
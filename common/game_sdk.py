@@ -0,0 +1,398 @@
+"""
+遊戲伺服器 SDK（asyncio 版）：一場對戰一個 event loop，不再每個玩家開一條執行緒。
+
+    from common.game_sdk import Match, serve
+
+    class MyGame(Match):
+        max_players = 2
+        sep = "|"                   # 訊息分隔符號（換行協定就用 "\\n"）
+
+        async def on_join(self, player): ...
+        async def on_message(self, player, msg): ...
+        async def on_leave(self, player): ...
+
+    if __name__ == "__main__":
+        serve(MyGame, int(sys.argv[1]))
+
+- Player.send(msg) 自動補上分隔符號，放進該玩家的送出佇列，由各自的 writer task 寫出；
+  佇列有上限，慢到塞滿的 client 會被斷線，不會拖住其他玩家
+- Match.broadcast(msg) 只編碼一次，再分送到每位玩家的佇列
+- Match.call_later(秒數, 函式, *參數) / Match.call_every(間隔, 函式, *參數) 排程延遲與週期事件，
+  取代在 handler 裡 time.sleep；走 common.scheduler 的 timer wheel，回傳的 Timer 可以 cancel()
+- Match.end() 結束對戰：取消這場的所有計時器、關閉所有連線並停止監聽，serve() 返回後行程就結束
+
+多場模式：Lobby 的 game_pool 對 config.json 標了 "host_mode": "multi" 的遊戲，
+每款遊戲只開一個常駐行程、一個 port，由 MatchHost 同時服務很多場對戰。
+玩家連線後先送一行 "HELLO <room_id>\n"（內建遊戲的 game_client.py 依 GAME_ROOM_ID 自動送），
+再依 room_id 交給該房的 Match；遊戲程式碼本身不用改，serve() 會自動切換。
+"""
+import asyncio
+import json
+import threading
+import weakref
+from collections import deque
+
+from common.framing import FrameDecoder
+from common.scheduler import get_wheel
+
+HOST = "0.0.0.0"
+READ_SIZE = 4096
+SEND_QUEUE_MAX = 256        # 每位玩家最多排隊的訊息數，塞滿就當成慢速 client 斷線；到 1/4 先標記警告
+HELLO = "HELLO"             # 多場模式的握手：連線後第一行 "HELLO <room_id>"
+HELLO_TIMEOUT = 5.0         # 連線後多久內沒送握手就斷線
+
+_matches = weakref.WeakSet()
+_control = None             # game_worker 以多場模式啟動時設定，見 host_control()
+
+
+class Player:
+    """
+    房內的一位玩家（一條 TCP 連線）。
+    送出走 queue + writer task：send() 只把 bytes 放進佇列，writer task 把佇列裡累積的
+    訊息合併成一次 write 並等 drain，慢的連線只會卡住自己的 task。
+    """
+
+    def __init__(self, match, pid, reader, writer):
+        self.match = match
+        self.id = pid
+        self.reader = reader
+        self.writer = writer
+        self.addr = writer.get_extra_info("peername")
+        self.closed = False
+
+        self.queue = deque()
+        self.wakeup = asyncio.Event()
+        self.peak_depth = 0
+        self.sent = 0
+        self.slow = False
+        self.writer_task = asyncio.ensure_future(self._drain())
+        match.writer_tasks.add(self.writer_task)
+        self.writer_task.add_done_callback(match.writer_tasks.discard)
+
+    def send(self, msg):
+        self.send_bytes((msg + self.match.sep).encode("utf-8"))
+
+    def send_bytes(self, data):
+        if self.closed:
+            return
+        depth = len(self.queue)
+        if depth >= self.match.send_queue_max:
+            self.match.slow_dropped += 1
+            print(f"⚠️ 玩家 {self.id} 送出佇列已滿（{depth}），視為慢速連線並斷線")
+            self.close(abort=True)
+            return
+        if depth >= self.match.send_queue_max // 4 and not self.slow:
+            self.slow = True
+            self.match.slow_flagged += 1
+            print(f"⚠️ 玩家 {self.id} 送出佇列累積到 {depth} 則")
+        self.queue.append(data)
+        self.peak_depth = max(self.peak_depth, depth + 1)
+        self.wakeup.set()
+
+    async def _drain(self):
+        try:
+            while True:
+                if self.queue:
+                    chunk = b"".join(self.queue)
+                    self.sent += len(self.queue)
+                    self.queue.clear()
+                    self.writer.write(chunk)
+                    await self.writer.drain()
+                    continue
+                if self.closed:
+                    break
+                self.wakeup.clear()
+                await self.wakeup.wait()
+        except (ConnectionError, RuntimeError):
+            self.closed = True
+            self.queue.clear()
+        finally:
+            try:
+                self.writer.close()
+            except (ConnectionError, RuntimeError):
+                pass
+
+    def close(self, abort=False):
+        """關閉連線；預設先把佇列裡的訊息送完，abort=True 直接丟掉"""
+        if self.closed:
+            return
+        self.closed = True
+        if abort:
+            self.queue.clear()
+            self.writer.transport.abort()
+        self.wakeup.set()
+
+    def stats(self):
+        return {"depth": len(self.queue), "peak": self.peak_depth, "sent": self.sent, "slow": self.slow}
+
+    def __repr__(self):
+        return f"<Player {self.id} {self.addr}>"
+
+
+class Match:
+    """
+    一場對戰。子類別覆寫 on_join / on_message / on_leave（可以是 async def）。
+    players = {player_id: Player}，player_id 從 1 開始、取最小的空號。
+    """
+
+    max_players = 2
+    sep = "\n"
+    send_queue_max = SEND_QUEUE_MAX
+
+    def __init__(self):
+        self.players = {}
+        self.writer_tasks = set()
+        self.timers = set()
+        self.slow_flagged = 0
+        self.slow_dropped = 0
+        _matches.add(self)
+        self.started = False        # 由遊戲自行設定；開局後沒人留在房內就自動結束
+        self.ended = asyncio.Event()
+        self.server = None
+        self.room_id = None         # 多場模式下由 MatchHost 設定
+        self.host = None
+
+    # ---------- 給遊戲覆寫 ----------
+    async def on_join(self, player):
+        pass
+
+    async def on_message(self, player, msg):
+        pass
+
+    async def on_leave(self, player):
+        pass
+
+    # ---------- 給遊戲呼叫 ----------
+    def broadcast(self, msg, exclude=None):
+        data = (msg + self.sep).encode("utf-8")
+        for player in list(self.players.values()):
+            if player is not exclude:
+                player.send_bytes(data)
+
+    def call_later(self, delay, fn, *args):
+        """delay 秒後呼叫 fn(*args)；fn 可以是 coroutine function。回傳可 cancel() 的 Timer"""
+        return self._track(get_wheel().call_later(delay, fn, *args))
+
+    def call_every(self, interval, fn, *args, first=None):
+        """每 interval 秒呼叫一次 fn(*args)，直到 cancel() 或對戰結束"""
+        return self._track(get_wheel().call_every(interval, fn, *args, first=first))
+
+    def _track(self, timer):
+        self.timers.add(timer)
+        timer.on_done = self.timers.discard
+        return timer
+
+    def end(self):
+        if self.ended.is_set():
+            return
+        self.ended.set()
+        for timer in list(self.timers):
+            timer.cancel()
+        for player in list(self.players.values()):
+            player.close()
+        if self.server:
+            self.server.close()
+        if self.host:
+            self.host._ended(self)
+
+    def stats(self):
+        return {
+            "room_id": self.room_id,
+            "players": {pid: p.stats() for pid, p in list(self.players.items())},
+            "slow_flagged": self.slow_flagged,
+            "slow_dropped": self.slow_dropped,
+            "timers": len(self.timers),
+        }
+
+    # ---------- 內部 ----------
+    def _next_id(self):
+        pid = 1
+        while pid in self.players:
+            pid += 1
+        return pid
+
+    async def _handle(self, reader, writer):
+        if self.ended.is_set() or len(self.players) >= self.max_players:
+            writer.close()
+            return
+
+        player = Player(self, self._next_id(), reader, writer)
+        self.players[player.id] = player
+        decoder = FrameDecoder(self.sep)
+        try:
+            await self.on_join(player)
+            while not player.closed:
+                # 一次讀進一整段，可能含多則或半則訊息，由 FrameDecoder 切好
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                for msg in decoder.feed(data):
+                    await self.on_message(player, msg)
+                    if player.closed:
+                        break
+        except Exception as e:
+            # 連線錯誤或遊戲邏輯出錯都只影響這位玩家
+            print(f"玩家 {player.id} 通訊異常: {e!r}")
+        finally:
+            player.close()
+            if self.players.get(player.id) is player:
+                del self.players[player.id]
+                if not self.ended.is_set():
+                    await self.on_leave(player)
+            if self.started and not self.players:
+                self.end()
+
+    async def start(self, port, host=HOST):
+        """開始監聽（port 為 0 時由系統分配，可從 self.server.sockets 查）"""
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def run(self, port, host=HOST):
+        await self.start(port, host)
+        try:
+            await self.ended.wait()
+            # 等各玩家佇列裡最後的訊息（例如遊戲結算）送完
+            if self.writer_tasks:
+                await asyncio.wait(list(self.writer_tasks), timeout=5)
+        finally:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class MatchHost:
+    """
+    一個行程、一個 port 同時服務多場對戰（多場模式）。
+    房間由 open(room_id) 建立；玩家連線先送 "HELLO <room_id>"，之後整條連線交給該房的 Match。
+    每場對戰只是一個 Match 物件加上玩家的連線與 task，不再是一整個直譯器。
+    """
+
+    def __init__(self, match_cls, on_event=None):
+        self.match_cls = match_cls
+        self.on_event = on_event    # on_event(dict)：對戰結束等事件，回報給 Lobby
+        self.matches = {}           # room_id -> Match
+        self.server = None
+        self.tasks = set()          # 每條連線的 handler，行程結束前等它們收尾
+        self.opened = 0
+        self.rejected = 0
+
+    def open(self, room_id):
+        room_id = str(room_id)
+        old = self.matches.get(room_id)
+        if old:
+            # 同一個房間重新開局，上一場直接結束
+            old.end()
+        match = self.match_cls()
+        match.room_id = room_id
+        match.host = self
+        self.matches[room_id] = match
+        self.opened += 1
+        return match
+
+    def close(self, room_id):
+        match = self.matches.get(str(room_id))
+        if match:
+            match.end()
+
+    def _ended(self, match):
+        if self.matches.get(match.room_id) is match:
+            del self.matches[match.room_id]
+            if self.on_event:
+                self.on_event({"event": "match_end", "room_id": match.room_id})
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        try:
+            line = await asyncio.wait_for(reader.readuntil(b"\n"), HELLO_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            line = b""
+        word, _, room_id = line.decode("utf-8", errors="replace").strip().partition(" ")
+        match = self.matches.get(room_id) if word == HELLO else None
+        if match is None:
+            self.rejected += 1
+            writer.close()
+            return
+        # 握手之後還沒讀的資料留在 reader 裡，Match 照常讀
+        await match._handle(reader, writer)
+
+    async def start(self, port, host=HOST):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    def stats(self):
+        return {
+            "matches": len(self.matches),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+def host_control(send, commands):
+    """
+    由 lobby/game_worker.py 呼叫：之後的 serve() 改以多場模式執行。
+    send(dict) 把事件寫回 Lobby；commands 是逐行 JSON 指令的檔案（worker 的 stdin）：
+        {"cmd": "open", "room_id": ...}   開一場，回報 {"event": "opened", "room_id": ...}
+        {"cmd": "close", "room_id": ...}  結束一場（Supervisor 回收閒置 / 超時的對戰）
+    對戰結束時回報 {"event": "match_end", "room_id": ...}；commands 關閉（Lobby 結束）時整個行程結束。
+    """
+    global _control
+    _control = (send, commands)
+
+
+async def _host_main(match_cls, port, host, send, commands):
+    loop = asyncio.get_running_loop()
+    match_host = MatchHost(match_cls, on_event=send)
+    await match_host.start(port, host)
+    closed = asyncio.Event()
+
+    def on_command(cmd):
+        room_id = str(cmd.get("room_id"))
+        if cmd.get("cmd") == "open":
+            match_host.open(room_id)
+            send({"event": "opened", "room_id": room_id})
+        elif cmd.get("cmd") == "close":
+            match_host.close(room_id)
+
+    def read_commands():
+        # Lobby 在 Windows 上也要能用，指令用執行緒讀再丟回 event loop
+        for line in commands:
+            try:
+                cmd = json.loads(line)
+            except ValueError:
+                continue
+            loop.call_soon_threadsafe(on_command, cmd)
+        loop.call_soon_threadsafe(closed.set)
+
+    threading.Thread(target=read_commands, daemon=True).start()
+    try:
+        await closed.wait()
+    finally:
+        matches = list(match_host.matches.values())
+        for match in matches:
+            match.end()
+        # 跟 Match.run 一樣等最後的訊息送完，再等各連線讀到 EOF，不讓 asyncio.run 硬取消
+        writers = [t for m in matches for t in m.writer_tasks]
+        if writers:
+            await asyncio.wait(writers, timeout=5)
+        if match_host.tasks:
+            await asyncio.wait(list(match_host.tasks), timeout=1)
+        match_host.server.close()
+        await match_host.server.wait_closed()
+
+
+def stats():
+    """目前這個行程裡所有對戰的送出佇列狀態（game_worker 的 heartbeat 會帶上）"""
+    return [m.stats() for m in list(_matches)]
+
+
+def serve(match_cls, port, host=HOST):
+    """啟動一場對戰，直到 Match.end() 才返回；由 game_worker 以多場模式啟動時改跑 MatchHost"""
+
+    async def main():
+        if _control:
+            await _host_main(match_cls, int(port), host, *_control)
+        else:
+            await match_cls().run(int(port), host)
+
+    asyncio.run(main())
@@ -1,6 +1,7 @@
 import struct
 import json
 import asyncio
+import itertools
 
 MAX_LEN = 65536
 
@@ -21,3 +22,124 @@ async def recv_msg(reader: asyncio.StreamReader):
         raise ValueError(f"封包長度無效: {n}")
     body = await reader.readexactly(n)
     return json.loads(body.decode('utf-8'))
+
+
+# -------------------------------
+# RPC 多工層：每個封包帶 rid，回應依 rid 對應回等待中的 Future
+# -------------------------------
+class FrameWriter:
+    """同一條連線的寫入端，序列化多個 task 的封包輸出"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.lock = asyncio.Lock()
+
+    async def send(self, obj: dict):
+        async with self.lock:
+            await send_msg(self.writer, obj)
+
+
+class RpcClient:
+    """在單一連線上同時送出多個請求，回應可以亂序抵達"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, on_event=None):
+        self.reader = reader
+        self.writer = writer
+        self.out = FrameWriter(writer)
+        self.on_event = on_event      # 不帶 rid 的封包（伺服器主動推播）交給這裡
+        self.pending = {}             # rid -> asyncio.Future
+        self.ids = itertools.count(1)
+        self.closed = False
+        self.reader_task = None
+
+    def start(self):
+        if self.reader_task is None:
+            self.reader_task = asyncio.create_task(self._read_loop())
+
+    async def request(self, req: dict, timeout=None):
+        """送出請求並等待同一個 rid 的回應"""
+        if self.closed:
+            raise ConnectionError("連線已關閉")
+        self.start()
+
+        rid = next(self.ids)
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[rid] = fut
+        try:
+            await self.out.send({**req, "rid": rid})
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self.pending.pop(rid, None)
+
+    async def _read_loop(self):
+        error = ConnectionError("連線已中斷")
+        try:
+            while True:
+                msg = await recv_msg(self.reader)
+                rid = msg.pop("rid", None) if isinstance(msg, dict) else None
+                if rid is None:
+                    if self.on_event:
+                        self.on_event(msg)
+                    continue
+                fut = self.pending.get(rid)
+                if fut and not fut.done():
+                    fut.set_result(msg)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = ConnectionError(f"連線已中斷: {e}")
+        finally:
+            self.closed = True
+            for fut in self.pending.values():
+                if not fut.done():
+                    fut.set_exception(error)
+
+    async def close(self):
+        self.closed = True
+        if self.reader_task:
+            self.reader_task.cancel()
+        try:
+            self.writer.close()
+            await self.writer.wait_closed()
+        except (ConnectionResetError, OSError):
+            pass
+
+
+async def serve_requests(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, handler, out=None):
+    """
+    伺服器端的請求迴圈：帶 rid 的請求各自開 task 並行處理、亂序回覆；
+    沒有 rid 的舊版請求維持一問一答依序處理。
+    連線中斷時會等待處理中的請求結束後才返回，讓呼叫端的清理邏輯看到最終狀態。
+    """
+    out = out or FrameWriter(writer)
+    tasks = set()
+
+    async def run_one(req, rid):
+        try:
+            resp = await handler(req)
+        except Exception as e:
+            resp = {"ok": False, "error": str(e)}
+        if resp is None:
+            resp = {"ok": False, "error": f"未知請求: {req.get('collection')}/{req.get('action')}"}
+        if rid is not None:
+            resp = {**resp, "rid": rid}
+        try:
+            await out.send(resp)
+        except (ConnectionError, OSError):
+            pass
+
+    try:
+        while True:
+            req = await recv_msg(reader)
+            if not req:
+                break
+            rid = req.pop("rid", None)
+            if rid is None:
+                await run_one(req, None)
+                continue
+            task = asyncio.create_task(run_one(req, rid))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
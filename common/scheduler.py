@@ -0,0 +1,183 @@
+"""
+遊戲伺服器用的計時器：asyncio 上的 hashed timer wheel。
+
+大量對戰各自有回合延遲、觀察時間、逾時判定時，每個計時器都丟給 loop.call_later
+會讓 event loop 的 heap 變得很大，取消的計時器也要等到期才清掉。TimerWheel 把計時器
+依到期的 tick 放進環狀的格子，一個 tick 只處理一格，排程 / 取消都是 O(1)，
+沒有計時器時完全不喚醒 event loop。
+
+    wheel = get_wheel()
+    t = wheel.call_later(1.5, next_turn)          # 延遲事件
+    p = wheel.call_every(5, send_ping, player)    # 週期事件
+    t.cancel()
+
+精度是一個 tick（預設 50ms），回合延遲與逾時這類用途足夠。
+"""
+import asyncio
+import inspect
+import math
+import weakref
+
+TICK = 0.05         # 每格的時間長度（秒）
+SLOTS = 512         # 環狀格數；超過一圈才到期的計時器留在格子裡，等轉到那一圈才觸發
+
+
+class Timer:
+    __slots__ = ("wheel", "fn", "args", "interval", "target", "active", "on_done")
+
+    def __init__(self, wheel, fn, args, interval=None):
+        self.wheel = wheel
+        self.fn = fn
+        self.args = args
+        self.interval = interval
+        self.target = 0
+        self.active = True      # 還沒觸發完（一次性）或還沒被取消
+        self.on_done = None     # 計時器結束（觸發完最後一次或被取消）時呼叫，給 Match 清自己的清單
+
+    def cancel(self):
+        if not self.active:
+            return
+        self.active = False
+        self.wheel.pending -= 1
+        self.wheel.cancelled += 1
+        self._done()
+
+    def _done(self):
+        if self.on_done:
+            self.on_done(self)
+            self.on_done = None
+
+
+class TimerWheel:
+    def __init__(self, tick=TICK, slots=SLOTS, loop=None):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.loop = loop or asyncio.get_running_loop()
+        self.origin = self.loop.time()
+        self.current = 0            # 已處理到第幾個 tick
+        self.handle = None          # 下一次喚醒；沒有計時器時為 None
+        self.advancing = False
+
+        self.pending = 0
+        self.fired = 0
+        self.cancelled = 0
+        self.max_lag = 0.0
+        self.tasks = set()          # async 回呼開出的 task；留著參考，避免還沒跑完就被回收
+
+    # ---------- 排程 ----------
+    def call_later(self, delay, fn, *args):
+        timer = Timer(self, fn, args)
+        self._schedule(timer, delay)
+        return timer
+
+    def call_every(self, interval, fn, *args, first=None):
+        """每 interval 秒呼叫一次，第一次在 first 秒後（預設同 interval）"""
+        timer = Timer(self, fn, args, interval)
+        self._schedule(timer, interval if first is None else first)
+        return timer
+
+    def _now_tick(self):
+        return int((self.loop.time() - self.origin) / self.tick)
+
+    def _schedule(self, timer, delay):
+        self.pending += 1
+        self._place(timer, delay)
+
+    def _place(self, timer, delay):
+        idle = self.handle is None and not self.advancing
+        if idle:
+            # 閒置後重新啟動：格子裡只剩已取消的計時器，直接跳到現在
+            self.current = self._now_tick()
+        # 以實際到期時間換算 tick 並無條件進位：寧可晚不到一個 tick，也不提早觸發
+        due = math.ceil((self.loop.time() + delay - self.origin) / self.tick)
+        timer.target = max(self.current + 1, due)
+        self.slots[timer.target % len(self.slots)].append(timer)
+        if idle:
+            self._arm()
+
+    def _arm(self):
+        self.handle = self.loop.call_at(self.origin + (self.current + 1) * self.tick, self._advance)
+
+    # ---------- 推進 ----------
+    def _advance(self):
+        self.handle = None
+        now_tick = self._now_tick()
+        lag = self.loop.time() - (self.origin + (self.current + 1) * self.tick)
+        self.max_lag = max(self.max_lag, lag)
+
+        self.advancing = True
+        try:
+            while self.current < now_tick:
+                self.current += 1
+                idx = self.current % len(self.slots)
+                slot = self.slots[idx]
+                if not slot:
+                    continue
+                due = []
+                keep = []
+                for timer in slot:
+                    if not timer.active:
+                        continue
+                    (due if timer.target <= self.current else keep).append(timer)
+                self.slots[idx] = keep
+                for timer in due:
+                    self._fire(timer)
+        finally:
+            self.advancing = False
+
+        if self.pending > 0:
+            self._arm()
+
+    def _fire(self, timer):
+        self.fired += 1
+        try:
+            result = timer.fn(*timer.args)
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self.tasks.add(task)
+                task.add_done_callback(lambda t, fn=timer.fn: self._task_done(t, fn))
+        except Exception as e:
+            self._report(timer.fn, e)
+
+        if not timer.active:
+            # 回呼裡自己取消了
+            return
+        if timer.interval is not None:
+            # 週期事件從上一次的預定 tick 往後排，不累積每次觸發的延遲
+            ticks = max(1, round(timer.interval / self.tick))
+            timer.target = max(self.current + 1, timer.target + ticks)
+            self.slots[timer.target % len(self.slots)].append(timer)
+        else:
+            timer.active = False
+            self.pending -= 1
+            timer._done()
+
+    def _task_done(self, task, fn):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._report(fn, task.exception())
+
+    @staticmethod
+    def _report(fn, e):
+        print(f"⚠️ 計時事件 {getattr(fn, '__name__', fn)} 發生錯誤: {e!r}")
+
+    def stats(self):
+        return {
+            "tick_ms": round(self.tick * 1000, 1),
+            "pending": self.pending,
+            "fired": self.fired,
+            "cancelled": self.cancelled,
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
+
+
+_wheels = weakref.WeakKeyDictionary()
+
+
+def get_wheel():
+    """目前 event loop 共用的 TimerWheel（同一個行程裡的所有對戰共用一個）"""
+    loop = asyncio.get_running_loop()
+    wheel = _wheels.get(loop)
+    if wheel is None:
+        wheel = _wheels[loop] = TimerWheel(loop=loop)
+    return wheel
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+
+class CatalogCache:
+    """
+    遊戲目錄查詢的 read-through 快取（只在 db_server 的 event loop 中使用，不需要鎖）：
+    - key = (action, 參數, 目錄版本)，LRU 淘汰，最多 max_entries 筆
+    - 任何會改動目錄的寫入完成後呼叫 bump()，版本 +1，舊資料全部失效
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.version = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, action, args):
+        """在查詢開始前取 key，查詢途中若版本被 bump，結果只會存到舊版本底下"""
+        return (action, args, self.version)
+
+    def get(self, key):
+        resp = self.entries.get(key)
+        if resp is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return resp
+
+    def put(self, key, resp):
+        if key[2] != self.version:
+            return
+        self.entries[key] = resp
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def bump(self):
+        self.version += 1
+        self.invalidations += 1
+        self.entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "version": self.version,
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
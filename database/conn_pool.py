@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# 每條新連線開啟時套用的 pragma
+PRAGMAS = (
+    ("journal_mode", "WAL"),        # 讀寫可同時進行
+    ("synchronous", "NORMAL"),      # WAL 下安全且少一次 fsync
+    ("mmap_size", 268435456),       # 256MB 記憶體映射讀取
+    ("cache_size", -16000),         # 每條連線約 16MB page cache（負數代表 KB）
+    ("temp_store", "MEMORY"),       # 排序 / GROUP BY 的暫存放記憶體
+)
+
+STATEMENT_CACHE_SIZE = 256          # sqlite3 內建的 prepared statement LRU（以 SQL 字串為 key）
+
+
+class ConnectionPool:
+    """
+    SQLite 暖連線池（thread-safe）：
+    - acquire/release 借還連線，閒置連線留著給下一次用，省掉 connect 與 schema 解析
+    - pin() 給長駐執行緒綁定一條專用連線（db_server 的 StorageExecutor）
+    - 每條連線都有 prepared statement 快取，同樣的 SQL 不會重新編譯
+    """
+
+    def __init__(self, path, max_idle=8):
+        self.path = path
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle = []
+        self.all_conns = []
+
+        self.hits = 0           # 拿到現成的暖連線
+        self.misses = 0         # 必須新開連線
+        self.opened = 0
+        self.closed = 0
+        self.pinned = 0
+        self.pinned_reuses = 0  # 綁定連線的執行緒重用自己的連線（不算進 hits / misses）
+
+    def _open(self, readonly=False):
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        for name, value in PRAGMAS:
+            conn.execute(f"PRAGMA {name}={value}")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        with self.lock:
+            self.opened += 1
+            self.all_conns.append(conn)
+        return conn
+
+    def acquire(self):
+        with self.lock:
+            if self.idle:
+                self.hits += 1
+                return self.idle.pop()
+            self.misses += 1
+        return self._open()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(conn)
+                return
+            self.closed += 1
+            self.all_conns.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """借一條連線；區塊正常結束就 commit，發生例外就 rollback，最後歸還"""
+        conn = self.acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.release(conn)
+
+    def pin(self, readonly=False):
+        """開一條專屬連線給呼叫的執行緒長期使用（不會回到池中）"""
+        conn = self._open(readonly)
+        with self.lock:
+            self.pinned += 1
+        return conn
+
+    def record_pinned_reuse(self):
+        """已綁定連線的執行緒重用自己的連線；另外計數，不影響池的命中率"""
+        with self.lock:
+            self.pinned_reuses += 1
+
+    def close_all(self):
+        with self.lock:
+            conns, self.all_conns, self.idle = self.all_conns, [], []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "path": self.path,
+                "idle": len(self.idle),
+                "open": len(self.all_conns),
+                "pinned": self.pinned,
+                "pinned_reuses": self.pinned_reuses,
+                "opened": self.opened,
+                "closed": self.closed,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0,
+                "statement_cache_size": STATEMENT_CACHE_SIZE,
+            }
@@ -0,0 +1,158 @@
+import asyncio
+import socket
+import time
+from collections import deque
+from common.network import RpcClient
+
+
+class DBClient:
+    """
+    Lobby / Dev Lobby 共用的 DB Server 連線池：
+    - size 條常駐連線，每條都用 rid 多工（RpcClient）
+    - 全池最多 size * max_inflight 個在途請求，超過的請求依 FIFO 排隊
+    - 連線斷掉時，下一個用到它的請求會自動重連
+    - 設了 unix_path（與 DB Server 在同一台機器）時優先走 Unix domain socket，連不上才退回 TCP
+    """
+
+    def __init__(self, host, port, size=4, max_inflight=32, timeout=10.0, unix_path=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path if hasattr(socket, "AF_UNIX") else None
+        self.size = size
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+
+        self.conns = [None] * size             # RpcClient | None
+        self.transports = [None] * size        # 每條連線實際走的 "unix" / "tcp"
+        self.inflight = [0] * size
+        self.conn_locks = [asyncio.Lock() for _ in range(size)]
+
+        # 公平排隊：額度用完時請求依到達順序等待，釋放時直接交棒給隊首
+        self.capacity = size * max_inflight
+        self.free = self.capacity
+        self.waiters = deque()
+
+        # 統計
+        self.total_requests = 0
+        self.total_errors = 0
+        self.reconnects = 0
+        self.peak_inflight = 0
+        self.peak_waiting = 0
+        self.total_wait = 0.0
+
+    # -------------------------------
+    # 連線管理
+    # -------------------------------
+    async def start(self):
+        """啟動時先把所有連線建好（失敗會直接拋出）"""
+        for idx in range(self.size):
+            await self._get_conn(idx)
+
+    async def _get_conn(self, idx):
+        conn = self.conns[idx]
+        if conn and not conn.closed:
+            return conn
+        async with self.conn_locks[idx]:
+            conn = self.conns[idx]
+            if conn and not conn.closed:
+                return conn
+            if conn is not None:
+                self.reconnects += 1
+                print(f"🔁 DB 連線 #{idx} 已中斷，重新連線中...")
+                # 舊連線的 writer 與讀取 task 先收掉，不然每次重連都漏一個 transport
+                await conn.close()
+            reader, writer, self.transports[idx] = await self._open()
+            conn = RpcClient(reader, writer)
+            conn.start()
+            self.conns[idx] = conn
+            return conn
+
+    async def _open(self):
+        if self.unix_path:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.unix_path)
+                return reader, writer, "unix"
+            except OSError as e:
+                print(f"⚠️ 無法連線 Unix socket {self.unix_path}（{e}），改用 TCP")
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return reader, writer, "tcp"
+
+    def _pick(self):
+        """挑在途請求最少的連線"""
+        return min(range(self.size), key=lambda i: self.inflight[i])
+
+    async def close(self):
+        for conn in self.conns:
+            if conn:
+                await conn.close()
+        self.conns = [None] * self.size
+
+    # -------------------------------
+    # 公平排隊
+    # -------------------------------
+    async def _acquire(self):
+        if self.free > 0 and not self.waiters:
+            self.free -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.append(fut)
+        self.peak_waiting = max(self.peak_waiting, len(self.waiters))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 已經拿到額度才被取消 → 還回去
+                self._release()
+            elif fut in self.waiters:
+                self.waiters.remove(fut)
+            raise
+
+    def _release(self):
+        while self.waiters:
+            fut = self.waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.free += 1
+
+    # -------------------------------
+    # 對外 API
+    # -------------------------------
+    async def request(self, req: dict):
+        t0 = time.perf_counter()
+        await self._acquire()
+        self.total_wait += time.perf_counter() - t0
+        self.total_requests += 1
+
+        idx = self._pick()
+        self.inflight[idx] += 1
+        self.peak_inflight = max(self.peak_inflight, sum(self.inflight))
+        try:
+            conn = await self._get_conn(idx)
+            return await conn.request(req, timeout=self.timeout)
+        except Exception:
+            self.total_errors += 1
+            raise
+        finally:
+            self.inflight[idx] -= 1
+            self._release()
+
+    def stats(self):
+        in_flight = sum(self.inflight)
+        return {
+            "backend": "remote",
+            "size": self.size,
+            "connected": sum(1 for c in self.conns if c and not c.closed),
+            "transports": list(self.transports),
+            "capacity": self.capacity,
+            "in_flight": in_flight,
+            "in_flight_per_conn": list(self.inflight),
+            "waiting": len(self.waiters),
+            "saturation": round(in_flight / self.capacity, 3) if self.capacity else 0,
+            "peak_in_flight": self.peak_inflight,
+            "peak_waiting": self.peak_waiting,
+            "total_requests": self.total_requests,
+            "total_errors": self.total_errors,
+            "reconnects": self.reconnects,
+            "avg_wait_ms": round(self.total_wait / self.total_requests * 1000, 3) if self.total_requests else 0,
+        }
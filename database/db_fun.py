@@ -2,28 +2,60 @@ import sqlite3
 import hashlib
 from datetime import datetime
 import uuid
-import os
 import json
+import threading
+from database.conn_pool import ConnectionPool
+from database import migrations
 
 
 DB_PATH = "data.db"
-INIT_SQL_FILE = os.path.join(os.path.dirname(__file__), "init_sql.sql")
 
 #part1:初始化資料庫連線與結構
 
+_local = threading.local()   # db_server 執行緒池中每條執行緒綁定的長駐連線
+_pool = None
+_pool_lock = threading.Lock()   # StorageExecutor 的多條執行緒會同時初始化，只能建一個連線池
+
+def get_pool():
+    """取得（必要時建立）DB_PATH 對應的連線池"""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.path == DB_PATH:
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DB_PATH:
+            if _pool is not None:
+                _pool.close_all()
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
+def bind_thread_conn(readonly=False):
+    """執行緒池 initializer：之後這條執行緒裡的 get_conn() 都回傳同一條連線"""
+    _local.conn = get_pool().pin(readonly)
+
 def get_conn():
-    """建立 SQLite 連線（自動關閉 thread 限制）"""
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    """
+    取得 SQLite 連線，用法一律是 `with get_conn() as conn:`
+    執行緒已綁定長駐連線就直接用，否則從連線池借一條暖連線，離開區塊時歸還。
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        get_pool().record_pinned_reuse()
+        return conn
+    return get_pool().connection()
+
+def pool_stats():
+    return get_pool().stats()
 
 def init_db():
-    """讀取 init_sql.sql 並初始化資料庫"""
-    with open(INIT_SQL_FILE, "r", encoding="utf-8") as f:
-        sql_script = f.read()
-
+    """套用尚未執行的 schema migration（已套用的版本記錄在 schema_version）"""
     with get_conn() as conn:
-        conn.executescript(sql_script)
-        conn.commit()
-    print("✅ Database initialized from init_sql.sql")
+        applied = migrations.migrate(conn)
+        version = migrations.current_version(conn)
+    if applied:
+        print(f"✅ Database migrated to v{version}（本次套用 {applied}）")
+    else:
+        print(f"✅ Database schema 已是最新版本 v{version}")
 
 #part2:users操作函式
 
@@ -321,13 +353,10 @@ def get_game_list():
                     g.max_players,
                     g.current_version,
                     g.short_desc,
-                    IFNULL(AVG(r.rating), 0) AS avg_rating,
-                    COUNT(r.id) AS review_count
+                    IFNULL(CAST(g.rating_sum AS REAL) / NULLIF(g.review_count, 0), 0) AS avg_rating,
+                    g.review_count
                 FROM games g
-                LEFT JOIN game_reviews r
-                    ON g.id = r.game_id
                 WHERE g.visible = 1
-                GROUP BY g.id
                 ORDER BY g.id
                 """
             )
@@ -406,6 +435,11 @@ def grading(data: dict):
                 VALUES (?, ?, ?, ?, datetime('now'))""",
                 (user_id, game_id, score, comment)
             )
+            # 同一個 transaction 內累加評分彙總，get_game_list 直接讀
+            cur.execute(
+                "UPDATE games SET rating_sum = rating_sum + ?, review_count = review_count + 1 WHERE id=?",
+                (score, game_id)
+            )
             conn.commit()
         print(f"✅ 遊戲評分成功: user_id={user_id}, game_id={game_id}, score={score}")
         return {"ok": True, "msg": "Grading submitted."}
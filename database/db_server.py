@@ -1,7 +1,9 @@
 import asyncio
 import logging
-from database import db_fun as db
-from common.network import send_msg, recv_msg
+import os
+import socket
+from database.storage import LocalStorage
+from common.network import serve_requests
 import sys
 
 
@@ -11,68 +13,18 @@ logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 
 HOST = "127.0.0.1"
 PORT = 14411
+UNIX_PATH = "/tmp/game_lobby_db.sock"   # 另外在這個 Unix domain socket 監聽（None = 只開 TCP；Windows 自動略過）
+DB_READERS = 4               # 讀取執行緒數（寫入固定 1 條）
+CACHE_MAX_ENTRIES = 1024     # 遊戲目錄快取最多筆數
+
+storage = None               # LocalStorage，main() 啟動時建立
 
 # ----------------------------
 # 處理單一請求
 # ----------------------------
 async def handle_request(req: dict):
-    collection = req.get("collection")
-    action = req.get("action")
-    data = req.get("data", {})
-
-    try:
-        # ---------- User ----------
-        if collection == "Lobby":
-            if action == "init":
-                return db.lobby_init()
-            elif action == "dev_init":
-                return db.dev_lobby_init()
-        elif collection == "User":
-            if action == "create":
-                return db.create_user(data["name"], data["password"])
-            elif action == "login":
-                return db.login_user(data["name"], data["password"])
-            elif action == "logout":
-                return db.logout_user(data["id"])
-            elif action == "list_online":
-                return {"ok": True, "users": db.get_online_users()}
-        
-        elif collection == "Dev_user":
-            if action == "create":
-                return db.dev_create_user(data["name"], data["password"])
-            elif action == "login":
-                return db.dev_login_user(data["name"], data["password"])
-            elif action == "logout":
-                return db.dev_logout_user(data["id"])
-        
-        elif collection == "Dev_game":
-            if action == "create_game":
-                return db.dev_create_game(data)
-        
-        elif collection == "Dev_update_game":
-            if action == "get_my_games":
-                return db.dev_get_my_games(data["user_id"])
-            elif action == "change_game_status":
-                return db.dev_change_game_status(data["game_id"], data["new_status"])
-            elif action == "update_game":
-                return db.dev_update_game(data)
-        
-        elif collection == "games":
-            if action == "game_list":
-                return db.get_game_list()
-            elif action == "get_version":
-                return db.get_game_version(data["game_id"])
-            elif action == "id_to_name":
-                return db.get_game_name_by_id(data["game_id"])
-            elif action == "grading":
-                return db.grading(data)
-        
-        return {"ok": False, "error": f"Unknown collection/action: {collection}/{action}"}
-
-    except KeyError as e:
-        return {"ok": False, "error": f"Missing field: {e}"}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
+    """讀寫分流、目錄快取都在 LocalStorage（Lobby 的 embedded 模式也用同一套）"""
+    return await storage.request(req)
 
 
 # ----------------------------
@@ -82,14 +34,13 @@ async def handle_client(reader, writer):
     addr = writer.get_extra_info('peername')
     print(f"📡 連線來自 {addr}")
 
+    async def handler(req):
+        print(f"📥 收到: {req}")
+        return await handle_request(req)
+
     try:
-        while True:
-            req = await recv_msg(reader)
-            if req is None:
-                break
-            print(f"📥 收到: {req}")
-            resp = await handle_request(req)
-            await send_msg(writer, resp)
+        # Lobby 會在同一條連線上同時送出多個請求，逐一開 task 處理並亂序回覆
+        await serve_requests(reader, writer, handler)
     except asyncio.IncompleteReadError:
         print(f"❌ 客戶端 {addr} 中斷連線")
     finally:
@@ -106,14 +57,53 @@ async def handle_client(reader, writer):
 # ----------------------------
 # 主程式
 # ----------------------------
+def unix_socket_alive(path):
+    """path 上是否有行程正在接受連線（例如另一個還在跑的 db_server）"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
 async def main():
-    db.init_db()
+    global storage
+
+    use_unix = bool(UNIX_PATH) and hasattr(socket, "AF_UNIX")
+    if use_unix and os.path.exists(UNIX_PATH):
+        if unix_socket_alive(UNIX_PATH):
+            # 直接 unlink 會把正在跑的 DB Server 的 socket 搶走
+            print(f"❌ Unix socket {UNIX_PATH} 已有其他 DB Server 在監聽，不啟動（同時開多個請改 UNIX_PATH）")
+            return
+        # 上次沒正常結束留下的 socket 檔
+        os.unlink(UNIX_PATH)
+
+    storage = LocalStorage(readers=DB_READERS, cache_entries=CACHE_MAX_ENTRIES)
+    await storage.start()
     server = await asyncio.start_server(handle_client, HOST, PORT)
     addr = server.sockets[0].getsockname()
-    print(f"✅ DB Server 啟動於 {addr}")
+    print(f"✅ DB Server 啟動於 {addr}（讀取執行緒 {DB_READERS} 條、寫入 1 條）")
 
-    async with server:
-        await server.serve_forever()
+    # 同一台機器上的 Lobby / Dev Lobby 可以改走 Unix domain socket，省掉 TCP loopback 的協定處理
+    unix_server = None
+    if use_unix:
+        unix_server = await asyncio.start_unix_server(handle_client, UNIX_PATH)
+        print(f"✅ DB Server 同時監聽 Unix socket {UNIX_PATH}")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if unix_server:
+            unix_server.close()
+            try:
+                os.unlink(UNIX_PATH)
+            except OSError:
+                pass
+        await storage.close()
 
 
 if __name__ == "__main__":
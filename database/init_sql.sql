@@ -1,3 +1,8 @@
+-- ========================================
+--  Schema v1（baseline）
+--  之後的 schema 變更請加在 database/migrations.py，不要再改這個檔案
+-- ========================================
+
 -- ========================================
 --  Table 1. users
 --  玩家帳號、登入狀態、所在房間
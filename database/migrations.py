@@ -0,0 +1,111 @@
+import os
+import time
+
+INIT_SQL_FILE = os.path.join(os.path.dirname(__file__), "init_sql.sql")
+
+#part1:各版本的 schema 變更（只會往後加，已發佈的版本不要再改）
+
+def _baseline(conn):
+    """v1：init_sql.sql 的原始資料表（CREATE IF NOT EXISTS，舊資料庫重跑也安全）"""
+    with open(INIT_SQL_FILE, "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+
+def _rating_aggregates(conn):
+    """v2：games 加上評分彙總欄位，由 grading() 累加，並從 game_reviews 回填"""
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(games)")}
+    if "rating_sum" not in cols:
+        conn.execute("ALTER TABLE games ADD COLUMN rating_sum INTEGER NOT NULL DEFAULT 0")
+    if "review_count" not in cols:
+        conn.execute("ALTER TABLE games ADD COLUMN review_count INTEGER NOT NULL DEFAULT 0")
+    backfill_rating_aggregates(conn)
+
+def _perf_indexes(conn):
+    """v3：常用查詢的覆蓋索引與部分索引"""
+    # 評分回填 / 統計：依 game_id 聚合 rating，不必回表
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_game_reviews_game ON game_reviews(game_id, rating)")
+    # dev_get_my_games：WHERE dev_user_id=? ORDER BY id，只取 id/name/visible
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_games_dev_user ON games(dev_user_id, id, name, visible)")
+    # get_game_list：只掃公開的遊戲
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_games_visible ON games(id) WHERE visible = 1")
+    # get_online_users：WHERE is_logged_in=1 ORDER BY id，只取 id/name
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_online ON users(id, name) WHERE is_logged_in = 1")
+
+def _bump_game_version(conn, name, old, new):
+    """
+    內建遊戲改了連線協定時，把 games.current_version 從 old 升到 new，
+    讓已下載舊版 client 的玩家開局前重新下載（開發者已自行上傳其他版本的就不動）
+    """
+    conn.execute(
+        "UPDATE games SET current_version=?, updated_at=datetime('now') WHERE name=? AND current_version=?",
+        (new, name, old),
+    )
+
+def _battleship_server_authoritative(conn):
+    """v4：Battleship 改成 READY:<艦隊> 與伺服器判定 RESULT，版本 1.1 -> 1.2"""
+    _bump_game_version(conn, "Battleship_5x5_Network", "1.1", "1.2")
+
+def _old_maid_server_hands(conn):
+    """v5：抽鬼牌改由伺服器持有手牌（CARDS/PAIRS/GOT/LOST/COUNT），版本 1.1 -> 1.2"""
+    _bump_game_version(conn, "多人抽鬼牌 (Old Maid Multiplayer)", "1.1", "1.2")
+
+def _multi_match_hello(conn):
+    """v6：三款內建遊戲改成多場 host，client 連線後要先送 HELLO <room_id>，版本各升一版"""
+    _bump_game_version(conn, "Rock Paper Scissors", "1.2", "1.3")
+    _bump_game_version(conn, "Battleship_5x5_Network", "1.2", "1.3")
+    _bump_game_version(conn, "多人抽鬼牌 (Old Maid Multiplayer)", "1.2", "1.3")
+
+MIGRATIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "games rating aggregates", _rating_aggregates),
+    (3, "performance indexes", _perf_indexes),
+    (4, "battleship protocol 1.2", _battleship_server_authoritative),
+    (5, "old maid protocol 1.2", _old_maid_server_hands),
+    (6, "multi-match hello 1.3", _multi_match_hello),
+]
+
+#part2:執行器
+
+def backfill_rating_aggregates(conn):
+    """依 game_reviews 重新計算每款遊戲的評分彙總"""
+    conn.execute(
+        """
+        UPDATE games SET
+            rating_sum = IFNULL((SELECT SUM(rating) FROM game_reviews r WHERE r.game_id = games.id), 0),
+            review_count = (SELECT COUNT(*) FROM game_reviews r WHERE r.game_id = games.id)
+        """
+    )
+
+def current_version(conn):
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    conn.commit()
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def migrate(conn):
+    """依序套用尚未執行的 migration，每一版各自 commit；有變更時最後跑一次 ANALYZE"""
+    version = current_version(conn)
+    applied = []
+    for ver, name, fn in MIGRATIONS:
+        if ver <= version:
+            continue
+        t0 = time.perf_counter()
+        try:
+            fn(conn)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (ver, name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(ver)
+        print(f"🔧 已套用 migration v{ver} {name}（{(time.perf_counter() - t0) * 1000:.1f} ms）")
+
+    if applied:
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
@@ -0,0 +1,210 @@
+"""
+資料存取的後端：Lobby / Dev Lobby 透過同一組 async API（start / request / close / stats）呼叫，
+請求格式都是 {"collection", "action", "data"}。
+
+  remote   - database.db_client.DBClient：經 TCP 送給 db_server（多台機器、或多個 Lobby 共用一份 DB）
+  embedded - LocalStorage：在自己的行程裡用執行緒池直接呼叫 db_fun，省掉 JSON 編解碼與 loopback 來回
+             （單機部署；db_server 本身也是用 LocalStorage 處理收到的請求）
+
+    backend = make_backend("embedded")
+    await backend.start()
+    resp = await backend.request({"collection": "games", "action": "game_list", "data": {}})
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from database import db_fun as db
+from database.catalog_cache import CatalogCache
+from database.db_client import DBClient
+
+
+class StorageExecutor:
+    """
+    把同步的 db_fun 呼叫移出 event loop：
+    - 1 條寫入執行緒：所有會改資料的動作排隊執行，避免 SQLite 寫鎖互搶
+    - N 條讀取執行緒：查詢可以並行，WAL 模式下不會被寫入擋住
+    每條執行緒各自持有一條長駐連線（db_fun.bind_thread_conn）。
+    """
+
+    def __init__(self, readers=4):
+        self.readers = readers
+        self.writer_pool = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="db-writer",
+            initializer=db.bind_thread_conn,
+        )
+        self.reader_pool = ThreadPoolExecutor(
+            max_workers=readers,
+            thread_name_prefix="db-reader",
+            initializer=db.bind_thread_conn,
+            initargs=(True,),
+        )
+
+    async def run(self, write: bool, fn, *args):
+        pool = self.writer_pool if write else self.reader_pool
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+    def shutdown(self):
+        self.writer_pool.shutdown(wait=True)
+        self.reader_pool.shutdown(wait=True)
+
+
+# ----------------------------
+# 請求分派
+# ----------------------------
+# 只讀的動作交給讀取執行緒，其餘一律走唯一的寫入執行緒
+READ_ACTIONS = {
+    ("User", "list_online"),
+    ("Dev_update_game", "get_my_games"),
+    ("games", "game_list"),
+    ("games", "get_version"),
+    ("games", "id_to_name"),
+    ("Stats", "conn_pool"),
+}
+
+# 可快取的目錄查詢 → 組成快取 key 的參數欄位（game_list 的 user_id 不影響結果）
+CACHEABLE = {
+    ("games", "game_list"): (),
+    ("games", "get_version"): ("game_id",),
+    ("games", "id_to_name"): ("game_id",),
+}
+
+# 完成後要讓目錄快取失效的寫入
+CATALOG_WRITES = {
+    ("Dev_game", "create_game"),
+    ("Dev_update_game", "update_game"),
+    ("Dev_update_game", "change_game_status"),
+    ("games", "grading"),
+}
+
+
+def dispatch(req: dict):
+    """同步執行一個請求（在 StorageExecutor 的執行緒中呼叫）"""
+    collection = req.get("collection")
+    action = req.get("action")
+    data = req.get("data", {})
+
+    try:
+        # ---------- User ----------
+        if collection == "Lobby":
+            if action == "init":
+                return db.lobby_init()
+            elif action == "dev_init":
+                return db.dev_lobby_init()
+        elif collection == "User":
+            if action == "create":
+                return db.create_user(data["name"], data["password"])
+            elif action == "login":
+                return db.login_user(data["name"], data["password"])
+            elif action == "logout":
+                return db.logout_user(data["id"])
+            elif action == "list_online":
+                return {"ok": True, "users": db.get_online_users()}
+        
+        elif collection == "Dev_user":
+            if action == "create":
+                return db.dev_create_user(data["name"], data["password"])
+            elif action == "login":
+                return db.dev_login_user(data["name"], data["password"])
+            elif action == "logout":
+                return db.dev_logout_user(data["id"])
+        
+        elif collection == "Dev_game":
+            if action == "create_game":
+                return db.dev_create_game(data)
+        
+        elif collection == "Dev_update_game":
+            if action == "get_my_games":
+                return db.dev_get_my_games(data["user_id"])
+            elif action == "change_game_status":
+                return db.dev_change_game_status(data["game_id"], data["new_status"])
+            elif action == "update_game":
+                return db.dev_update_game(data)
+        
+        elif collection == "games":
+            if action == "game_list":
+                return db.get_game_list()
+            elif action == "get_version":
+                return db.get_game_version(data["game_id"])
+            elif action == "id_to_name":
+                return db.get_game_name_by_id(data["game_id"])
+            elif action == "grading":
+                return db.grading(data)
+        
+        elif collection == "Stats":
+            if action == "conn_pool":
+                return {"ok": True, "stats": db.pool_stats()}
+        
+        return {"ok": False, "error": f"Unknown collection/action: {collection}/{action}"}
+
+    except KeyError as e:
+        return {"ok": False, "error": f"Missing field: {e}"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+class LocalStorage:
+    """
+    在目前的行程裡處理請求：讀寫分流到 StorageExecutor，目錄查詢走 CatalogCache。
+    cache_entries=0 時不快取：embedded 模式下 Dev Lobby 在另一個行程更新遊戲，這裡不會知道要失效。
+    """
+
+    def __init__(self, readers=4, cache_entries=1024):
+        self.readers = readers
+        self.executor = None
+        self.cache = CatalogCache(cache_entries) if cache_entries else None
+        self.total_requests = 0
+
+    async def start(self):
+        db.init_db()
+        self.executor = StorageExecutor(readers=self.readers)
+
+    async def request(self, req: dict):
+        """依動作類型丟到讀取或寫入執行緒執行，event loop 不會被 SQLite 卡住"""
+        op = (req.get("collection"), req.get("action"))
+        self.total_requests += 1
+
+        if op == ("Stats", "cache"):
+            return {"ok": True, "stats": self.cache.stats() if self.cache else None}
+
+        # 目錄查詢：先查快取，沒有才讀資料庫
+        if self.cache and op in CACHEABLE:
+            data = req.get("data") or {}
+            key = self.cache.key(op[1], tuple(data.get(f) for f in CACHEABLE[op]))
+            resp = self.cache.get(key)
+            if resp is None:
+                resp = await self.executor.run(False, dispatch, req)
+                if resp.get("ok"):
+                    self.cache.put(key, resp)
+            return resp
+
+        write = op not in READ_ACTIONS
+        try:
+            return await self.executor.run(write, dispatch, req)
+        finally:
+            if self.cache and op in CATALOG_WRITES:
+                self.cache.bump()
+
+    async def close(self):
+        if self.executor:
+            # 等排隊中的寫入做完；放到執行緒裡等，不卡住 event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+            self.executor = None
+
+    def stats(self):
+        return {
+            "backend": "embedded",
+            "readers": self.readers,
+            "total_requests": self.total_requests,
+            "conn_pool": db.pool_stats(),
+            "cache": self.cache.stats() if self.cache else None,
+        }
+
+
+def make_backend(kind, host="127.0.0.1", port=14411, size=4, max_inflight=32, readers=4, cache_entries=0,
+                 unix_path=None):
+    """依設定建立資料存取後端："remote" 連 db_server（有 unix_path 時優先走 Unix socket），"embedded" 在本行程直接用 db_fun"""
+    if kind == "embedded":
+        return LocalStorage(readers=readers, cache_entries=cache_entries)
+    if kind == "remote":
+        return DBClient(host, port, size=size, max_inflight=max_inflight, unix_path=unix_path)
+    raise ValueError(f"未知的 DB 後端：{kind}")
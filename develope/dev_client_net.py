@@ -1,5 +1,5 @@
 import asyncio
-from common.network import send_msg, recv_msg
+from common.network import RpcClient
 import os.path
 from pathlib import Path
 import json
@@ -44,7 +44,7 @@ class DevClient:
         self.writer = None
         self.user_id = None
         self.username = None
-        self.lock = asyncio.Lock()
+        self.rpc = None
 
     async def connect(self):
         """嘗試多個 IP，直到成功連線到 Lobby"""
@@ -52,6 +52,7 @@ class DevClient:
             try:
                 print(f"🔍 嘗試連線 Lobby：{host}:{self.port} ...")
                 self.reader, self.writer = await asyncio.open_connection(host, self.port)
+                self.rpc = RpcClient(self.reader, self.writer)
                 self.host = host
                 print(f"✅ 已連線到 Lobby Server：{host}:{self.port}")
                 return True
@@ -62,9 +63,8 @@ class DevClient:
 
 
     async def close(self):
-        if self.writer:
-            self.writer.close()
-            await self.writer.wait_closed()
+        if self.rpc:
+            await self.rpc.close()
 
     # -------------------------------
     # 封裝請求/回應機制
@@ -73,9 +73,8 @@ class DevClient:
         req = {"collection": collection, "action": action, "data": data or {}}
         if not self.writer:
             raise ConnectionError("尚未連線到 Lobby，請先呼叫 connect() 成功後再發送請求。")
-        async with self.lock:  # ✅ 同步鎖
-            await send_msg(self.writer, req)
-            return await recv_msg(self.reader)
+        # ✅ 以 rid 多工，背景輪詢不再排在使用者操作後面
+        return await self.rpc.request(req)
 
     # -------------------------------
     # 使用者相關
@@ -176,6 +175,9 @@ class DevClient:
                 except ValueError:
                     config_wrong = True
             
+            if config_dict.get("host_mode", "process") not in ["process", "multi"]:
+                config_wrong = True
+            
             if config_wrong:
                 return {"ok": False, "error": "config.txt 內容有誤，請確認各欄位值是否正確。"}
             
@@ -297,6 +299,9 @@ class DevClient:
                 except ValueError:
                     config_error = True
             
+            if config_dict.get("host_mode", "process") not in ["process", "multi"]:
+                config_error = True
+            
             if config_error:
                 return {"ok": False, "error": "config.json 內容有誤，請確認各欄位值是否正確。"}
             
@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from common.network import send_msg, recv_msg
+from common.network import serve_requests
+from database.storage import make_backend
 import socket
 import subprocess
 import sys
@@ -13,8 +14,13 @@ logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 # -------------------------------
 # 設定區
 # -------------------------------
+DB_BACKEND = "remote"       # "remote" = 經 TCP 連 DB Server；"embedded" = 單機部署，在本行程用執行緒池直接呼叫 db_fun
 DB_HOST = "127.0.0.1"       # DB Server 位址
 DB_PORT = 14411              # DB Server 監聽埠
+DB_UNIX_PATH = None          # 與 DB Server 同一台機器時填它的 UNIX_PATH（例如 "/tmp/game_lobby_db.sock"），改走 Unix socket
+DB_POOL_SIZE = 4             # 與 DB Server 的常駐連線數
+DB_MAX_INFLIGHT = 32         # 每條連線最多同時在途的請求數，超過就排隊
+DB_READERS = 4               # embedded：讀取執行緒數（寫入固定 1 條）
 
 connected_users = {}
 
@@ -32,8 +38,7 @@ def get_host_ip():
 
 LOBBY_HOST = get_host_ip()     # Lobby Server 對外開放 IP
 LOBBY_PORT = 18110           # Dev Server 監聽埠
-db_reader = None
-db_writer = None
+db_pool = None               # 資料存取後端（remote：DBClient；embedded：LocalStorage）
 
 def find_free_port(start=16800, end=16900):
     import socket
@@ -53,12 +58,9 @@ def find_free_port(start=16800, end=16900):
 # 與 DB Server 溝通
 # -------------------------------
 async def db_request(req: dict):
-    """透過既有的持續 TCP 連線與 DB Server 溝通"""
-    global db_reader, db_writer
+    """透過資料存取後端處理請求（remote：DB 連線池，多條常駐連線、每條可多個請求同時在途）"""
     try:
-        await send_msg(db_writer, req)
-        resp = await recv_msg(db_reader)
-        return resp
+        return await db_pool.request(req)
     except Exception as e:
         print(f"⚠️ DB Server 通訊錯誤: {e}")
         return {"ok": False, "error": str(e)}
@@ -128,7 +130,12 @@ async def handle_request(req, writer):
             return resp
         
         
-            
+
+    if collection == "Stats":
+        # === 伺服器狀態 ===
+        if action == "db_pool":
+            return {"ok": True, "stats": db_pool.stats()}
+
     if collection == "Dev_update_game":
         # === 4️⃣ 更新遊戲列表 ===
         if action == "get_my_games":
@@ -174,14 +181,8 @@ async def handle_client(reader, writer):
     print(f"📡 玩家連線: {addr}")
 
     try:
-        while True:
-            req = await recv_msg(reader)
-            if not req:
-                break
-            #print(f"📥 收到來自 {addr}: {req}")
-
-            resp = await handle_request(req, writer)
-            await send_msg(writer, resp)
+        # 每個請求各自成為 task，回應依 rid 亂序送回
+        await serve_requests(reader, writer, lambda req: handle_request(req, writer))
 
     except asyncio.IncompleteReadError:
         print(f"❌ 玩家斷線: {addr}")
@@ -255,11 +256,19 @@ async def get_game_data(data):
 # 主程式入口
 # -------------------------------
 async def main():
-    global db_reader, db_writer
+    global db_pool
 
-    # 啟動時就連上 DB Server
-    db_reader, db_writer = await asyncio.open_connection(DB_HOST, DB_PORT)
-    print(f"✅ 已連線至 DB Server {DB_HOST}:{DB_PORT}")
+    # 啟動時就連上 DB Server（embedded 模式則在本行程開好 SQLite 執行緒池）
+    db_pool = make_backend(
+        DB_BACKEND, DB_HOST, DB_PORT, size=DB_POOL_SIZE, max_inflight=DB_MAX_INFLIGHT, readers=DB_READERS,
+        unix_path=DB_UNIX_PATH,
+    )
+    await db_pool.start()
+    if DB_BACKEND == "embedded":
+        print(f"✅ 使用內嵌資料庫（讀取執行緒 {DB_READERS} 條、寫入 1 條）")
+    else:
+        via = "unix" if "unix" in db_pool.transports else "tcp"
+        print(f"✅ 已連線至 DB Server {DB_HOST}:{DB_PORT}（{DB_POOL_SIZE} 條連線，{via}）")
     
     # Lobby 初始化
     resp = await db_request({"collection": "Lobby", "action": "dev_init"})
@@ -277,9 +286,8 @@ async def main():
         async with server:
             await server.serve_forever()
     finally:
-        if db_writer:
-            db_writer.close()
-            await db_writer.wait_closed()
+        if db_pool:
+            await db_pool.close()
             print("🛑 已關閉 DB 連線。")
 
 if __name__ == "__main__":
@@ -1,24 +1,46 @@
 # game_client.py
+import os
 import socket
 import sys
 
 
+# -------------------------------
+# 連線與訊息切分
+# 玩家只會下載這一個 game_client.py，不能依賴 Lobby 專案裡的 common/，所以直接放在檔案裡
+# -------------------------------
+def connect_game(host, port):
+    """連上遊戲伺服器；Lobby 用多場模式開房時會帶環境變數 GAME_ROOM_ID，連線後先送握手"""
+    sock = socket.create_connection((host, int(port)))
+    room_id = os.environ.get("GAME_ROOM_ID")
+    if room_id:
+        sock.sendall(f"HELLO {room_id}\n".encode("utf-8"))
+    return sock
+
+
+def iter_frames(sock, sep):
+    """逐則讀取以 sep 分隔的訊息，沒收齊的半則（含被切開的 UTF-8 字元）留到下次；對方關閉連線時結束"""
+    sep = sep.encode("utf-8")
+    buf = b""
+    while True:
+        data = sock.recv(4096)
+        if not data:
+            return
+        *frames, buf = (buf + data).split(sep)
+        for frame in frames:
+            if frame:
+                yield frame.decode("utf-8", errors="replace")
+
+
 def main(host, port, client_user_id):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.connect((host, port))
+    sock = connect_game(host, port)
 
     # 一連線先送 user_id
     sock.sendall(f"USER {client_user_id}\n".encode())
 
     try:
-        while True:
-            data = sock.recv(1024)
-            if not data:
-                print("\n⚠️ 伺服器已關閉連線")
-                break
-
-            msg = data.decode()
-            print(msg, end="")
+        # 一行一則訊息；被切開的行會等收齊才印出
+        for msg in iter_frames(sock, "\n"):
+            print(msg)
 
             # ⭐ 只有在 server 明確要求時才輸入
             if "Choose a card" in msg:
@@ -30,6 +52,8 @@ def main(host, port, client_user_id):
                     else:
                         print("❌ 請輸入 0 / 1 / 2")
 
+        print("\n⚠️ 伺服器已關閉連線")
+
     except ConnectionResetError:
         print("\n⚠️ 連線被中斷（對手或伺服器離線）")
 
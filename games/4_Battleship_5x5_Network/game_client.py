@@ -1,30 +1,142 @@
-import socket
 import threading
 import tkinter as tk
 from tkinter import messagebox
 import sys
+import os
+import socket
+
+
+# -------------------------------
+# 連線與訊息切分
+# 玩家只會下載這一個 game_client.py，不能依賴 Lobby 專案裡的 common/，所以直接放在檔案裡
+# -------------------------------
+def connect_game(host, port):
+    """連上遊戲伺服器；Lobby 用多場模式開房時會帶環境變數 GAME_ROOM_ID，連線後先送握手"""
+    sock = socket.create_connection((host, int(port)))
+    room_id = os.environ.get("GAME_ROOM_ID")
+    if room_id:
+        sock.sendall(f"HELLO {room_id}\n".encode("utf-8"))
+    return sock
+
+
+def iter_frames(sock, sep):
+    """逐則讀取以 sep 分隔的訊息，沒收齊的半則（含被切開的 UTF-8 字元）留到下次；對方關閉連線時結束"""
+    sep = sep.encode("utf-8")
+    buf = b""
+    while True:
+        data = sock.recv(4096)
+        if not data:
+            return
+        *frames, buf = (buf + data).split(sep)
+        for frame in frames:
+            if frame:
+                yield frame.decode("utf-8", errors="replace")
+
+
+# -------------------------------
+# 佈署規則（bitboard）
+# 跟 server 端的 common/battleship.py 是同一套規則；改規則時兩邊要一起改
+# 第 r 列第 c 行是第 r*5+c 個 bit，船依 FLEET 的順序放，每艘周圍 9 格成為禁區
+# -------------------------------
+SIZE = 5
+FLEET = (3, 2, 1, 1)                    # 3-2-1-1 船隻配置
+FULL = (1 << SIZE * SIZE) - 1
+COL_LEFT = sum(1 << (r * SIZE) for r in range(SIZE))
+COL_RIGHT = COL_LEFT << (SIZE - 1)
+
+
+def bit(r, c):
+    return 1 << (r * SIZE + c)
+
+
+def cells(mask):
+    """bitboard → [(r, c), ...]"""
+    return [divmod(i, SIZE) for i in range(SIZE * SIZE) if mask >> i & 1]
+
+
+def around(mask):
+    """mask 每一格的 9 格範圍（含自己與斜角）"""
+    row = mask | ((mask & ~COL_RIGHT) << 1) | ((mask & ~COL_LEFT) >> 1)
+    return (row | (row << SIZE) | (row >> SIZE)) & FULL
+
+
+def _lines(length):
+    out = []
+    for r in range(SIZE):
+        for c in range(SIZE):
+            if c + length <= SIZE:
+                out.append(sum(bit(r, c + i) for i in range(length)))
+            if length > 1 and r + length <= SIZE:
+                out.append(sum(bit(r + i, c) for i in range(length)))
+    return out
+
+
+LINES = {length: _lines(length) for length in set(FLEET)}
+
+
+def _build_feasible():
+    """{(已放幾艘, blocked mask): 剩下的船是否還放得完}；狀態只有幾千個，啟動時列舉一次"""
+    table = {}
+
+    def solve(k, blocked):
+        key = (k, blocked)
+        if key in table:
+            return table[key]
+        if k == len(FLEET):
+            table[key] = True
+            return True
+        ok = False
+        for line in LINES[FLEET[k]]:
+            if not line & blocked:
+                ok = solve(k + 1, blocked | around(line)) or ok
+        table[key] = ok
+        return ok
+
+    solve(0, 0)
+    return table
+
+
+FEASIBLE = _build_feasible()
+
+
+def can_complete(k, blocked):
+    """已放好前 k 艘船、blocked 格子不能用時，剩下的船是否還放得完"""
+    return FEASIBLE.get((k, blocked), False)
+
+
+def playable_cells(k, blocked, partial=0, complete=True):
+    """正在放第 k 艘船、已點了 partial 時，下一格可以點哪些格子（mask）"""
+    mask = 0
+    for line in LINES[FLEET[k]]:
+        if line & blocked or line & partial != partial:
+            continue
+        if complete and not can_complete(k + 1, blocked | around(line)):
+            continue
+        mask |= line
+    return mask & ~partial
+
+
+def encode_fleet(ships):
+    """[ship_mask, ...] → '0 0,0 1,0 2;2 0,3 0;4 4;2 4'（READY: 訊息的內容）"""
+    return ";".join(",".join(f"{r} {c}" for r, c in cells(ship)) for ship in ships)
+
 
 class BattleshipClient:
     def __init__(self, host, port):
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((host, int(port)))
+            self.socket = connect_game(host, port)
         except:
             print("連線失敗，請檢查 Server 是否已啟動")
             return
 
         self.player_id = None
-        self.ships_to_place = [3, 2, 1, 1] 
+        self.ships_to_place = list(FLEET)
         self.current_ship_idx = 0
         
-        self.my_ships_list = []    # 存每艘船的座標 [[(r,c),(r,c)], ...]
-        self.my_hits_on_me = set() # 我方被擊中的座標
-        self.forbidden_zones = set() # 9格規則禁區
-        self.temp_ship = []        # 當前正在放置的船隻暫存
+        self.my_ships_list = []    # 存每艘船的 bitboard（見上方的佈署規則）
+        self.blocked = 0           # 已放船格 + 9格規則禁區
+        self.temp_ship = 0         # 當前正在放置的船隻暫存（bitboard）
         
-        self.total_ship_cells = sum(self.ships_to_place)
-        self.my_hits = 0      # 我打中對方的次數
-        self.enemy_hits = 0   # 對方打中我的次數
         self.is_my_turn = False
         self.phase = "WAITING_FOR_ID"
 
@@ -83,9 +195,8 @@ class BattleshipClient:
     def reset_logic(self):
         """清空所有佈署狀態與顏色"""
         self.my_ships_list = []
-        self.my_hits_on_me = set()
-        self.forbidden_zones = set()
-        self.temp_ship = []
+        self.blocked = 0
+        self.temp_ship = 0
         self.current_ship_idx = 0
         self.phase = "PLACEMENT"
         
@@ -101,49 +212,26 @@ class BattleshipClient:
 
     def on_my_click(self, r, c):
         if self.phase != "PLACEMENT": return
-        
-        # 取得所有已放船格
-        all_placed = [cell for ship in self.my_ships_list for cell in ship]
-        if (r, c) in all_placed or (r, c) in self.forbidden_zones or (r, c) in self.temp_ship:
-            return
 
-        target_len = self.ships_to_place[self.current_ship_idx]
+        # 只能點「還能湊成一條直線、且不碰到禁區」的格子（三級艦與二級艦的相鄰、直線判定都在這裡）
+        if not playable_cells(self.current_ship_idx, self.blocked, self.temp_ship, complete=False) & bit(r, c):
+            return
 
-        # --- 核心邏輯：三級艦與二級艦的直線與相鄰判定 (保留雙向放置) ---
-        if len(self.temp_ship) > 0:
-            # 必須與當前暫存船隻中的「任何一格」相鄰
-            is_adj = any(abs(sr - r) + abs(sc - c) == 1 for sr, sc in self.temp_ship)
-            if not is_adj: return 
-            
-            # 直線判定 (當放第三格時)
-            if len(self.temp_ship) == 2:
-                r0, c0 = self.temp_ship[0]
-                r1, c1 = self.temp_ship[1]
-                # 第三格必須與前兩格在同一 row 或同一 col
-                if not ((r0 == r1 == r) or (c0 == c1 == c)):
-                    return
-
-        self.temp_ship.append((r, c))
+        self.temp_ship |= bit(r, c)
         self.my_btns[r][c].config(bg="darkblue")
 
         # 船隻放置完成
-        if len(self.temp_ship) == target_len:
-            self.my_ships_list.append(list(self.temp_ship))
-            # 計算 9 格禁區
-            for (sr, sc) in self.temp_ship:
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        nr, nc = sr + dr, sc + dc
-                        if 0 <= nr < 5 and 0 <= nc < 5:
-                            curr_all = [cell for ship in self.my_ships_list for cell in ship]
-                            if (nr, nc) not in curr_all:
-                                self.forbidden_zones.add((nr, nc))
-                                self.my_btns[nr][nc].config(bg="#FFCCCC") # 淡紅色禁區
-
-            self.temp_ship = []
+        if bin(self.temp_ship).count("1") == self.ships_to_place[self.current_ship_idx]:
+            self.my_ships_list.append(self.temp_ship)
+            # 9 格禁區（淡紅色）
+            for nr, nc in cells(around(self.temp_ship) & ~self.blocked & ~self.temp_ship):
+                self.my_btns[nr][nc].config(bg="#FFCCCC")
+            self.blocked |= around(self.temp_ship)
+
+            self.temp_ship = 0
             self.current_ship_idx += 1
             
-            # --- 關鍵修復：在此判斷下一艘船是否還有空間 ---
+            # --- 查可行性表：剩下的船是否還放得完 ---
             if self.current_ship_idx < len(self.ships_to_place):
                 if self.is_deadlock():
                     messagebox.showwarning("提示", "空間不足以放置剩餘船隻，棋盤將自動重製。")
@@ -153,44 +241,12 @@ class BattleshipClient:
             else:
                 self.phase = "READY_SENT"
                 self.info_label.config(text="佈署完成，等待對方就緒...", fg="orange")
-                self.socket.send("READY|".encode('utf-8'))
+                # 把佈署交給 server 驗證與保管，之後的命中判定都由 server 負責
+                self.socket.send(f"READY:{encode_fleet(self.my_ships_list)}|".encode('utf-8'))
 
     def is_deadlock(self):
-        """檢查地圖上是否還有足夠的連續空間可以放下下一艘船"""
-        # 取得下一艘船需要的長度
-        target_len = self.ships_to_place[self.current_ship_idx]
-        
-        # 取得所有已被佔用的格子（已放船的格 + 淡紅色禁區）
-        all_taken = set()
-        for ship in self.my_ships_list:
-            for cell in ship:
-                all_taken.add(cell)
-        all_taken.update(self.forbidden_zones)
-
-        # 遍歷棋盤每一個點作為起點
-        for r in range(5):
-            for c in range(5):
-                if (r, c) not in all_taken:
-                    # 如果下一艘船只要 1 格，只要找到一個空格就沒死路
-                    if target_len == 1:
-                        return False
-                    
-                    # 檢查兩個方向：水平 (右) 與 垂直 (下)
-                    for dr, dc in [(0, 1), (1, 0)]:
-                        can_fit = True
-                        for i in range(target_len):
-                            nr, nc = r + dr*i, c + dc*i
-                            # 如果超出邊界或是該格已被佔用，則此方向不行
-                            if not (0 <= nr < 5 and 0 <= nc < 5 and (nr, nc) not in all_taken):
-                                can_fit = False
-                                break
-                        
-                        # 如果有一個方向放得下，就代表還沒死路
-                        if can_fit:
-                            return False
-                            
-        # 找遍全地圖都沒有任何一個方向能放下連續的 target_len 格，回傳 True (死路)
-        return True
+        """剩下的船是否已經放不完（查 FEASIBLE 預先算好的表）"""
+        return not can_complete(self.current_ship_idx, self.blocked)
 
     def on_enemy_click(self, r, c):
         if self.phase == "BATTLE" and self.is_my_turn:
@@ -200,16 +256,12 @@ class BattleshipClient:
                 self.socket.send(f"ATTACK:{self.player_id},{r},{c}|".encode('utf-8'))
 
     def receive_messages(self):
-        while True:
-            try:
-                data = self.socket.recv(1024).decode('utf-8')
-                if not data: 
-                    # 當 Server 主動關閉 Socket 時會執行到這
-                    break 
-                for cmd in data.split('|'):
-                    if cmd: self.handle_cmd(cmd)
-            except: 
-                break
+        try:
+            # 以 | 切訊息；跨 recv 的半則訊息會留到下一次湊齊（Server 主動關閉 Socket 時迴圈結束）
+            for cmd in iter_frames(self.socket, "|"):
+                self.handle_cmd(cmd)
+        except: 
+            pass
         
         # 斷線後處理：提示玩家並結束遊戲
         messagebox.showerror("連線中斷", "與伺服器的連線已斷開。")
@@ -225,12 +277,27 @@ class BattleshipClient:
             self.phase = "BATTLE"
             self.is_my_turn = (self.player_id == 1)
             self.update_turn_ui()
-        elif cmd.startswith("ATTACK:"):
-            p = cmd.split(":")[1].split(",")
-            if int(p[0]) != self.player_id: self.handle_defense(int(p[1]), int(p[2]))
+        elif cmd.startswith("PLACE_REJECTED:"):
+            messagebox.showwarning("佈署不合法", cmd.split(":", 1)[1] + "，棋盤將自動重製。")
+            self.reset_logic()
+            self.info_label.config(text=f"請放置 {self.ships_to_place[0]} 格艦", fg="blue")
+        elif cmd.startswith("ATTACK_REJECTED:"):
+            self.is_my_turn = True
+            self.update_turn_ui()
         elif cmd.startswith("RESULT:"):
+            # RESULT:被攻擊方,r,c,MISS/HIT/SUNK,沉船座標...
             p = cmd.split(":")[1].split(",")
-            if int(p[0]) != self.player_id: self.handle_result(int(p[1]), int(p[2]), p[3], p[4:])
+            if int(p[0]) == self.player_id:
+                self.handle_defense(int(p[1]), int(p[2]), p[3], p[4:])
+            else:
+                self.handle_result(int(p[1]), int(p[2]), p[3], p[4:])
+        elif cmd.startswith("OVER:"):
+            self.phase = "GAME_OVER"
+            self.is_my_turn = False
+            if int(cmd.split(":")[1]) == self.player_id:
+                self.info_label.config(text="【 恭喜：你贏了！ 】", fg="#006400", font=('Arial', 14, 'bold'))
+            else:
+                self.info_label.config(text="【 遊戲結束：你輸了！ 】", fg="red", font=('Arial', 14, 'bold'))
         
         if cmd.startswith("OPPONENT_DISCONNECTED"):
             if self.phase != "GAME_OVER":
@@ -239,43 +306,20 @@ class BattleshipClient:
                 self.info_label.config(text="【 對手已斷開連線 】", fg="red")
                 # 可選擇直接關閉或是鎖死棋盤
 
-    def handle_defense(self, r, c):
-        hit = False
-        target_ship = None
-        # 尋找被打中的是哪一艘船
-        for ship in self.my_ships_list:
-            if (r, c) in ship:
-                hit = True
-                target_ship = ship
-                break
-        
-        res = "MISS"
-        sunk_data = ""
-        if hit:
-            res = "HIT"
-            self.my_hits_on_me.add((r, c))
-            # 檢查整艘船是否都已擊中
-            if all(cell in self.my_hits_on_me for cell in target_ship):
-                res = "SUNK"
-                sunk_data = ",".join([f"{cell[0]} {cell[1]}" for cell in target_ship])
-                # 這裡修正：立即將整艘船（含最後一格）塗成深灰色
-                for sr, sc in target_ship:
-                    self.my_btns[sr][sc].config(bg="#444444", text="X")
-            else:
-                # 尚未全沉，只把當前格變紅
-                self.my_btns[r][c].config(bg="red", text="X")
-        else:
-            # 沒打中
+    def handle_defense(self, r, c, res, sunk_coords):
+        """對方的攻擊結果（由 server 判定），只負責畫在我的海域"""
+        if res == "MISS":
             self.my_btns[r][c].config(bg="white", text="O")
-        
-        # 回傳結果給所有人
-        self.socket.send(f"RESULT:{self.player_id},{r},{c},{res},{sunk_data}|".encode('utf-8'))
-        
-        # 判斷勝負
-        if len(self.my_hits_on_me) == self.total_ship_cells:
-            self.phase = "GAME_OVER"
-            self.info_label.config(text="【 遊戲結束：你輸了！ 】", fg="red", font=('Arial', 14, 'bold'))
+        elif res == "SUNK":
+            # 整艘船（含最後一格）塗成深灰色
+            for coord in sunk_coords:
+                if coord:
+                    sr, sc = map(int, coord.split())
+                    self.my_btns[sr][sc].config(bg="#444444", text="X")
         else:
+            self.my_btns[r][c].config(bg="red", text="X")
+
+        if self.phase != "GAME_OVER":
             self.is_my_turn = True
             self.update_turn_ui()
 
@@ -284,7 +328,6 @@ class BattleshipClient:
             self.enemy_btns[r][c].config(bg="white", text="O")
         else:
             self.enemy_btns[r][c].config(bg="red", text="X")
-            self.my_hits += 1
             if res == "SUNK":
                 for coord in sunk_coords:
                     if coord:
@@ -292,10 +335,7 @@ class BattleshipClient:
                         self.enemy_btns[sr][sc].config(bg="#444444")
                 messagebox.showinfo("好球", "擊沉敵方船隻！")
 
-        if self.my_hits == self.total_ship_cells:
-            self.phase = "GAME_OVER"
-            self.info_label.config(text="【 恭喜：你贏了！ 】", fg="#006400", font=('Arial', 14, 'bold'))
-        else:
+        if self.phase != "GAME_OVER":
             self.is_my_turn = False
             self.update_turn_ui()
 
@@ -1,68 +1,123 @@
-import socket
-import threading
 import sys
+from pathlib import Path
 
-class BattleshipServer:
-    def __init__(self, port):
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server.bind(('0.0.0.0', int(port)))
-        self.server.listen(2)
-        self.clients = {}  
-        self.ready_players = set()
-        print(f"Server 啟動於連接埠 {port}...")
-
-    def broadcast(self, message):
-        # 統一在結尾加分割符，確保客戶端 split 後不會出錯
-        msg_to_send = (message.strip('|') + "|").encode('utf-8')
-        for client in self.clients.values():
-            try:
-                client.send(msg_to_send)
-            except: pass
-
-    def handle_client(self, client_socket, player_id):
-        client_socket.send(f"ID:{player_id}|".encode('utf-8'))
-        
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.battleship import SIZE, bit, cells, parse_fleet, validate_fleet
+from common.game_sdk import Match, serve
+
+
+class Board:
+    """一位玩家的船隊與被打過的格子（bitboard，見 common.battleship）"""
+
+    def __init__(self, ships):
+        self.ships = ships
+        self.fleet = 0
+        self.ship_at = [0] * (SIZE * SIZE)   # 格子 index → 所屬船隻的 mask
+        for ship in ships:
+            self.fleet |= ship
+            for i in range(SIZE * SIZE):
+                if ship >> i & 1:
+                    self.ship_at[i] = ship
+        self.shots = 0                      # 被打過的格子
+        self.hits = 0
+
+    def attack(self, r, c):
+        """回傳 (結果, 沉船 mask)，結果為 MISS / HIT / SUNK"""
+        b = bit(r, c)
+        self.shots |= b
+        if not self.fleet & b:
+            return "MISS", 0
+        self.hits |= b
+        ship = self.ship_at[r * SIZE + c]
+        if ship & ~self.hits:
+            return "HIT", 0
+        return "SUNK", ship
+
+    @property
+    def defeated(self):
+        return not self.fleet & ~self.hits
+
+
+class BattleshipServer(Match):
+    max_players = 2
+    sep = "|"               # 統一以 | 分割訊息，客戶端 split 後不會出錯
+
+    def __init__(self):
+        super().__init__()
+        self.boards = {}        # {player_id: Board}，READY 時由 server 驗證後建立
+        self.turn = None        # 輪到哪位玩家攻擊
+
+    async def on_join(self, player):
+        player.send(f"ID:{player.id}")
+
+    async def on_message(self, player, cmd):
+        print(f"收到來自玩家 {player.id} 的指令: {cmd}")
+        if cmd.startswith("READY:"):
+            self.place(player, cmd.split(":", 1)[1])
+        elif cmd == "NOT_READY":
+            if not self.started:
+                self.boards.pop(player.id, None)
+        elif cmd.startswith("ATTACK:"):
+            self.attack(player, cmd.split(":", 1)[1])
+        else:
+            # START / RESULT / OVER 等都由 server 判定後送出，不轉發玩家送來的任何其他訊息
+            print(f"⚠️ 忽略玩家 {player.id} 的未知指令: {cmd}")
+
+    def place(self, player, text):
+        if self.started:
+            return
+        try:
+            ships = parse_fleet(text)
+        except ValueError as e:
+            player.send(f"PLACE_REJECTED:{e}")
+            return
+        error = validate_fleet(ships)
+        if error:
+            player.send(f"PLACE_REJECTED:{error}")
+            return
+
+        self.boards[player.id] = Board(ships)
+        if len(self.boards) == self.max_players:
+            self.started = True
+            self.turn = min(self.boards)
+            self.broadcast("START")
+
+    def attack(self, player, text):
+        """ATTACK:attacker,r,c → 直接由 server 判定，廣播 RESULT:defender,r,c,結果,沉船座標"""
+        if self.turn != player.id:
+            player.send("ATTACK_REJECTED:還沒輪到你")
+            return
         try:
-            while True:
-                data = client_socket.recv(1024).decode('utf-8')
-                if not data: break
-                
-                for cmd in data.split('|'):
-                    if not cmd: continue
-                    print(f"收到來自玩家 {player_id} 的指令: {cmd}")
-                    if cmd == "READY":
-                        self.ready_players.add(player_id)
-                        if len(self.ready_players) == 2:
-                            self.broadcast("START")
-                    elif cmd == "NOT_READY":
-                        if player_id in self.ready_players:
-                            self.ready_players.remove(player_id)
-                    else:
-                        self.broadcast(cmd)
-        except Exception as e:
-            print(f"玩家 {player_id} 發生異常: {e}")
-        finally:
-            # --- 斷線後的處理邏輯 ---
-            if player_id in self.clients:
-                del self.clients[player_id]
-            if player_id in self.ready_players:
-                self.ready_players.remove(player_id)
-            
-            # 通知剩下的玩家有人離開了
-            self.broadcast(f"OPPONENT_DISCONNECTED|PLAYER:{player_id}")
-            
-            client_socket.close()
-            print(f"玩家 {player_id} 已斷開連線。")
-
-    def run(self):
-        while True:
-            conn, addr = self.server.accept()
-            if len(self.clients) < 2:
-                p_id = 1 if 1 not in self.clients else 2
-                self.clients[p_id] = conn
-                threading.Thread(target=self.handle_client, args=(conn, p_id), daemon=True).start()
+            _, r, c = map(int, text.split(","))
+        except ValueError:
+            player.send("ATTACK_REJECTED:格式錯誤")
+            return
+        defender = next((pid for pid in self.boards if pid != player.id), None)
+        board = self.boards.get(defender)
+        if board is None or not (0 <= r < SIZE and 0 <= c < SIZE) or board.shots & bit(r, c):
+            player.send("ATTACK_REJECTED:無效的攻擊位置")
+            return
+
+        result, sunk = board.attack(r, c)
+        sunk_data = ",".join(f"{sr} {sc}" for sr, sc in cells(sunk))
+        self.broadcast(f"RESULT:{defender},{r},{c},{result},{sunk_data}")
+        if board.defeated:
+            self.turn = None
+            self.broadcast(f"OVER:{player.id}")
+        else:
+            self.turn = defender
+
+    async def on_leave(self, player):
+        # --- 斷線後的處理邏輯 ---
+        if not self.started:
+            self.boards.pop(player.id, None)
+
+        # 通知剩下的玩家有人離開了；開局後兩人都離開，Match 會自動結束
+        self.broadcast(f"OPPONENT_DISCONNECTED|PLAYER:{player.id}")
+        print(f"玩家 {player.id} 已斷開連線。")
+
 
 if __name__ == "__main__":
     port = sys.argv[1] if len(sys.argv) > 1 else 5555
-    BattleshipServer(port).run()
\ No newline at end of file
+    print(f"Server 啟動於連接埠 {port}...")
+    serve(BattleshipServer, port)
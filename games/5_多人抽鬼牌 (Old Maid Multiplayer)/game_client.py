@@ -1,16 +1,43 @@
-import socket
 import threading
 import tkinter as tk
 from tkinter import messagebox
 import sys
 import time
-from collections import Counter
+import os
+import socket
+
+
+# -------------------------------
+# 連線與訊息切分
+# 玩家只會下載這一個 game_client.py，不能依賴 Lobby 專案裡的 common/，所以直接放在檔案裡
+# -------------------------------
+def connect_game(host, port):
+    """連上遊戲伺服器；Lobby 用多場模式開房時會帶環境變數 GAME_ROOM_ID，連線後先送握手"""
+    sock = socket.create_connection((host, int(port)))
+    room_id = os.environ.get("GAME_ROOM_ID")
+    if room_id:
+        sock.sendall(f"HELLO {room_id}\n".encode("utf-8"))
+    return sock
+
+
+def iter_frames(sock, sep):
+    """逐則讀取以 sep 分隔的訊息，沒收齊的半則（含被切開的 UTF-8 字元）留到下次；對方關閉連線時結束"""
+    sep = sep.encode("utf-8")
+    buf = b""
+    while True:
+        data = sock.recv(4096)
+        if not data:
+            return
+        *frames, buf = (buf + data).split(sep)
+        for frame in frames:
+            if frame:
+                yield frame.decode("utf-8", errors="replace")
+
 
 class OldMaidClient:
     def __init__(self, host, port, user_id):
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((host, int(port)))
+            self.socket = connect_game(host, port)
         except:
             print("無法連線至伺服器")
             return
@@ -22,6 +49,7 @@ class OldMaidClient:
         self.is_my_turn = False
         self.target_id = None
         self.is_game_over = False
+        self.dealt = False     # 收到 CARDS 後的第一個 PAIRS 是開場去對
         
         self.root = tk.Tk()
         self.setup_ui()
@@ -90,8 +118,8 @@ class OldMaidClient:
             lbl.pack(side="left", padx=4) # padx 稍微縮小一點點，確保 10 張放得下
             self.card_labels.append(lbl)
 
-    def visual_match_and_remove(self, is_initial=False):
-        """精確配對 2 張相同牌並上色移除"""
+    def visual_match_and_remove(self, pairs, is_initial=False):
+        """把 server 判定成對的牌（pairs 為點數 list，每一對一個）上色後移除"""
         def process():
             if is_initial:
                 for i in range(5, 0, -1):
@@ -101,26 +129,15 @@ class OldMaidClient:
                 self.info.config(text="抽到牌了！觀察中...", fg="orange")
                 time.sleep(2)
 
-            # --- 關鍵修正：精確找出「成對」的索引 ---
+            # 每個點數在手牌中的位置，一對取兩個
+            positions = {}
+            for i, c in enumerate(self.my_cards):
+                positions.setdefault(c, []).append(i)
             found_pair_indices = []  # 存要上色的 Label 索引
-            cards_to_remove_indices = [] # 存要移除的牌索引
-            
-            temp_cards = list(self.my_cards)
-            already_matched = set()
-
-            # 找出所有成對的組合（不包含鬼牌）
-            for i in range(len(temp_cards)):
-                if i in already_matched or temp_cards[i] == "JK":
-                    continue
-                for j in range(i + 1, len(temp_cards)):
-                    if j in already_matched:
-                        continue
-                    if temp_cards[i] == temp_cards[j]:
-                        # 找到一對！
-                        already_matched.add(i)
-                        already_matched.add(j)
-                        found_pair_indices.append((i, j, temp_cards[i]))
-                        break
+            for card_val in pairs:
+                i, j = positions[card_val][:2]
+                del positions[card_val][:2]
+                found_pair_indices.append((i, j, card_val))
 
             if found_pair_indices:
                 # 定義顏色池
@@ -144,15 +161,13 @@ class OldMaidClient:
                 self.info.config(text="發現配對！準備丟棄成對卡片...", fg="red")
                 time.sleep(2) 
 
-            # --- 執行移除：只移除已經被 match 的牌 ---
-            self.my_cards = [self.my_cards[k] for k in range(len(self.my_cards)) if k not in already_matched]
+            # --- 執行移除：依點數移除（觀察期間可能有牌被抽走，索引已經不準）---
+            for card_val in pairs:
+                self.my_cards.remove(card_val)
+                self.my_cards.remove(card_val)
             
-            # 更新顯示並重設 Highlight
+            # 更新顯示並重設 Highlight（張數由 server 廣播 COUNT）
             self.root.after(0, lambda: self.update_cards_display(highlight_idx=-1))
-            try:
-                self.socket.send(f"COUNT:{self.p_id},{len(self.my_cards)}|".encode())
-            except (ConnectionResetError, BrokenPipeError):
-                print("連線已斷開，停止發送 COUNT。")
             
             if is_initial:
                 #time.sleep(0.5)
@@ -199,14 +214,12 @@ class OldMaidClient:
                 print("發送抽牌請求失敗，連線可能已關閉。")
 
     def receive(self):
-        while True:
-            try:
-                data = self.socket.recv(1024).decode('utf-8')
-                if not data: break
-                for cmd in data.split('|'):
-                    if cmd: self.handle_cmd(cmd)
-            except: 
-                break
+        try:
+            # 以 | 切訊息；跨 recv 的半則訊息會留到下一次湊齊
+            for cmd in iter_frames(self.socket, "|"):
+                self.handle_cmd(cmd)
+        except: 
+            pass
         
         # 斷線後提示並關閉視窗
         if not self.is_game_over:
@@ -228,9 +241,15 @@ class OldMaidClient:
             self.root.title(f"玩家 {self.p_id} ({self.user_id})")
             
         elif tag == "CARDS":
+            # 發牌結果；成對的牌由接下來的 PAIRS 告知
             self.my_cards = parts[1].split(',')
             self.update_cards_display()
-            self.visual_match_and_remove(is_initial=True)
+            self.dealt = True
+
+        elif tag == "PAIRS":
+            pairs = [c for c in parts[1].split(',') if c]
+            self.visual_match_and_remove(pairs, is_initial=self.dealt)
+            self.dealt = False
             
         elif tag == "TURN":
             if self.is_game_over: return
@@ -241,49 +260,23 @@ class OldMaidClient:
             if target == self.p_id:
                 import random
                 random.shuffle(self.my_cards)
-                # 立即刷新，讓自己看到洗牌後的新位置
+                # 立即刷新，讓自己看到洗牌後的新位置（只影響顯示，抽到哪張由 server 決定）
                 self.update_cards_display()
-                # 同時也要發送一次 COUNT，確保 Server 記錄的牌數與索引同步（雖然張數沒變，但這是保險）
-                try:
-                    self.socket.send(f"COUNT:{self.p_id},{len(self.my_cards)}|".encode('utf-8'))
-                except:
-                    pass
                 
             self.info.config(text=f"輪到 玩家 {curr} 抽 玩家 {target}", 
                              fg="green" if self.is_my_turn else "black")
             self.refresh_opponents()
             
-        elif tag == "DRAW_REQ":
-            p_idx, from_id, c_idx = map(int, parts[1].split(','))
-            if from_id == self.p_id:
-                # 關鍵修正：有人要抽我的牌前，先打亂手牌順序
-                # import random
-                # random.shuffle(self.my_cards)
-                
-                # # 更新顯示（已打亂）
-                # self.update_cards_display()
-                
-                # 抽出一張牌 (確保索引不超出範圍)
-                safe_idx = c_idx if c_idx < len(self.my_cards) else 0
-                card = self.my_cards.pop(safe_idx)
-                
-                try:
-                    self.socket.send(f"DRAW_VAL:{p_idx},{card}|".encode('utf-8'))
-                    self.update_cards_display() # 更新顯示（已打亂且少一張）
-                    self.socket.send(f"COUNT:{self.p_id},{len(self.my_cards)}|".encode('utf-8'))
-                except:
-                    pass
-                
-        elif tag == "DRAW_VAL":
-            p_idx, card = int(parts[1].split(',')[0]), parts[1].split(',')[1]
-            if p_idx == self.p_id:
-                # 抽到牌加入手牌末尾
-                self.my_cards.append(card)
-                new_idx = len(self.my_cards) - 1
-                # 關鍵修正：傳入新牌的索引位置進行標色
-                self.update_cards_display(highlight_idx=new_idx)
-                self.visual_match_and_remove(is_initial=False)
-        
+        elif tag == "LOST":
+            # 被抽走的牌
+            self.my_cards.remove(parts[1])
+            self.update_cards_display()
+
+        elif tag == "GOT":
+            # 抽到牌加入手牌末尾並標色，接著的 PAIRS 告知是否成對
+            self.my_cards.append(parts[1])
+            self.update_cards_display(highlight_idx=len(self.my_cards) - 1)
+
         elif tag == "COUNT":
             pid, cnt = map(int, parts[1].split(','))
             self.players_info[pid] = cnt
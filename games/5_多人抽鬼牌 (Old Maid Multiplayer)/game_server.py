@@ -1,139 +1,232 @@
-import socket
-import threading
 import sys
+import json
+import math
 import random
-import time
-
-class OldMaidServer:
-    def __init__(self, port):
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server.bind(('0.0.0.0', int(port)))
-        self.server.listen(5)
-        self.clients = {}  # {p_id: socket}
-        self.player_hands_count = {} # {p_id: count}
-        self.turn_order = []
-        self.current_picker_idx = 0
-        self.running = True
-        print(f"多人抽鬼牌 Server 啟動於 {port}，滿 3 人即自動開始...")
-
-    def broadcast(self, msg):
-        full_msg = (msg.strip('|') + "|").encode('utf-8')
-        # 使用 list(self.clients.items()) 以免在迴圈中刪除字典成員報錯
-        for p_id, sock in list(self.clients.items()):
-            try:
-                sock.send(full_msg)
-            except:
-                # 如果發送失敗，代表這個玩家也斷線了，直接移除
-                if p_id in self.clients:
-                    del self.clients[p_id]
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.game_sdk import Match, serve
+
+RANKS = [str(n) for n in range(1, 14)] + ["JK"]   # 13 種點數 + 鬼牌
+JOKER = len(RANKS) - 1
+PLAYERS_PER_DECK = 4        # 每多 4 個人多加一副牌（不含鬼牌）
+DEFAULT_MAX_PLAYERS = 3
+
+
+def load_max_players():
+    """開桌人數跟 lobby 的房間一樣讀 config.json 的 max_players"""
+    try:
+        config = json.loads((Path(__file__).parent / "config.json").read_text(encoding="utf-8"))
+        return max(2, int(config.get("max_players", DEFAULT_MAX_PLAYERS)))
+    except (OSError, ValueError):
+        return DEFAULT_MAX_PLAYERS
+
+
+class Hand:
+    """
+    一位玩家的手牌：每種點數各有幾張（長度 14 的陣列）。
+    成對的牌一進手牌就丟掉，所以每格只會是 0 或 1，加牌、去對、抽牌都不用掃整副手牌。
+    """
+
+    def __init__(self):
+        self.count = [0] * len(RANKS)
+        self.size = 0
+
+    def add(self, rank):
+        """加入一張牌；湊成一對就直接丟掉並回傳 True"""
+        if rank != JOKER and self.count[rank]:
+            self.count[rank] = 0
+            self.size -= 1
+            return True
+        self.count[rank] += 1
+        self.size += 1
+        return False
+
+    def take(self, rng):
+        """
+        被抽走一張牌。牌面朝下、每回合都會洗牌，對方點哪一張都等同隨機抽一張，
+        所以直接在 14 格裡找第 k 張，不需要保存牌的順序
+        """
+        k = rng.randrange(self.size)
+        for rank, n in enumerate(self.count):
+            if n > k:
+                self.count[rank] -= 1
+                self.size -= 1
+                return rank
+            k -= n
+        raise IndexError("手牌是空的")
+
+
+class ActiveRing:
+    """還有牌的玩家排成環狀雙向串列：換下一位與淘汰玩家都是 O(1)，不用繞過已脫手的人"""
+
+    def __init__(self, player_ids):
+        n = len(player_ids)
+        self.next_of = {p: player_ids[(i + 1) % n] for i, p in enumerate(player_ids)}
+        self.prev_of = {p: player_ids[i - 1] for i, p in enumerate(player_ids)}
+
+    def __len__(self):
+        return len(self.next_of)
+
+    def __contains__(self, p_id):
+        return p_id in self.next_of
+
+    def next(self, p_id):
+        return self.next_of[p_id]
+
+    def remove(self, p_id):
+        """拿掉 p_id，回傳他的前一位"""
+        prev, nxt = self.prev_of.pop(p_id), self.next_of.pop(p_id)
+        self.next_of[prev] = nxt
+        self.prev_of[nxt] = prev
+        return prev
+
+
+class OldMaidTable:
+    """一桌的牌局狀態（不碰網路）：發牌、手牌、輪到誰、抽牌與淘汰"""
+
+    def __init__(self, player_ids, rng=random):
+        # 人多時加副牌，讓每人手牌維持在 PLAYERS_PER_DECK 人一副的份量；鬼牌永遠只有一張
+        decks = max(1, math.ceil(len(player_ids) / PLAYERS_PER_DECK))
+        deck = list(range(len(RANKS) - 1)) * 4 * decks + [JOKER]
+        rng.shuffle(deck)
+
+        self.rng = rng
+        self.hands = {}         # {p_id: Hand}
+        self.dealt = {}         # {p_id: 發到的牌}
+        self.pairs = {}         # {p_id: 發牌後直接丟掉的對子}
+        for i, p_id in enumerate(player_ids):
+            dealt = self.dealt[p_id] = deck[i::len(player_ids)]
+            hand = self.hands[p_id] = Hand()
+            self.pairs[p_id] = [rank for rank in dealt if hand.add(rank)]
+
+        self.ring = ActiveRing(list(player_ids))
+        self.picker = player_ids[-1]    # advance 往下一位推進，第一輪由 player_ids[0] 開始
+        self.target = None              # 被抽牌的玩家；這一輪抽完或還沒開始時為 None
+        for p_id in player_ids:
+            if self.hands[p_id].size == 0:
+                self.eliminate(p_id)
+
+    def eliminate(self, p_id):
+        """手牌清空的玩家從環上拿掉；若剛好是 picker，下一輪從他的下一位接手"""
+        prev = self.ring.remove(p_id)
+        if self.picker == p_id:
+            self.picker = prev
+
+    @property
+    def over(self):
+        """只剩一個人還有牌，他手上的就是鬼牌（picker 即輸家）"""
+        return len(self.ring) == 1
+
+    def advance(self):
+        """換下一位抽牌；回傳 (picker, target)，牌局結束則回傳 None"""
+        self.picker = self.ring.next(self.picker)
+        if self.over:
+            self.target = None
+            return None
+        self.target = self.ring.next(self.picker)
+        return self.picker, self.target
+
+    def draw(self):
+        """picker 抽 target 一張牌；回傳 (target, rank, 是否成對)"""
+        target, self.target = self.target, None
+        rank = self.hands[target].take(self.rng)
+        paired = self.hands[self.picker].add(rank)
+        for p_id in (target, self.picker):
+            if self.hands[p_id].size == 0:
+                self.eliminate(p_id)
+        return target, rank, paired
+
+
+class OldMaidServer(Match):
+    max_players = load_max_players()    # 滿人即自動開始
+    sep = "|"
+
+    def __init__(self):
+        super().__init__()
+        self.rng = random.Random()
+        self.table = None
+        self.drawer = None      # 這一輪已經抽過牌的玩家，等他的 DRAW_DONE
+        self.over = False
+
+    async def on_join(self, player):
+        player.send(f"ID:{player.id}")
+        if len(self.players) == self.max_players:
+            print("人數已滿，正在發牌...")
+            self.started = True
+            self.call_later(1, self.start_game)   # 給予一點緩衝時間
 
     def start_game(self):
-        print("人數已滿，正在發牌...")
-        time.sleep(1) # 給予一點緩衝時間
-        deck = [str(n) for n in range(1, 14)] * 4 + ["JK"]
-        random.shuffle(deck)
-        
-        self.turn_order = sorted(list(self.clients.keys()))
-        num_p = len(self.turn_order)
-        
-        for i, p_id in enumerate(self.turn_order):
-            p_cards = deck[i::num_p]
-            self.clients[p_id].send(f"CARDS:{','.join(p_cards)}|".encode('utf-8'))
-        
+        table = self.table = OldMaidTable(sorted(self.players.keys()), self.rng)
+        for p_id, dealt in table.dealt.items():
+            # 先給完整的發牌結果讓玩家觀察，再告訴他哪些成對被丟掉
+            self.send_to(p_id, f"CARDS:{','.join(RANKS[r] for r in dealt)}")
+            self.send_to(p_id, f"PAIRS:{','.join(RANKS[r] for r in table.pairs[p_id])}")
+        for p_id, hand in table.hands.items():
+            self.broadcast(f"COUNT:{p_id},{hand.size}")
+
         self.broadcast(f"INFO:遊戲開始！正在自動去對...")
-        time.sleep(2) # 讓玩家看一眼原始手牌
-        self.next_turn(first_time=True)
-
-    def next_turn(self, first_time=False):
-        # 尋找下一個還有牌的玩家作為 Picker
-        if not first_time:
-            self.current_picker_idx = (self.current_picker_idx + 1) % len(self.turn_order)
-        
-        # 確保 Picker 還有牌
-        while self.player_hands_count.get(self.turn_order[self.current_picker_idx], 1) == 0:
-            self.current_picker_idx = (self.current_picker_idx + 1) % len(self.turn_order)
-            
-        picker_id = self.turn_order[self.current_picker_idx]
-        
-        # 尋找 Picker 之後第一個還有牌的人作為 Target
-        target_idx = (self.current_picker_idx + 1) % len(self.turn_order)
-        while self.player_hands_count.get(self.turn_order[target_idx], 1) == 0:
-            target_idx = (target_idx + 1) % len(self.turn_order)
-        
-        target_id = self.turn_order[target_idx]
-        
-        # 如果 Picker 和 Target 是同一人，代表遊戲結束
-        if picker_id == target_id:
-            self.broadcast(f"OVER:玩家 {picker_id} 輸了，他是最後的鬼牌得主！")
+        self.call_later(2, self.next_turn)   # 讓玩家看一眼原始手牌
+
+    def send_to(self, p_id, msg):
+        player = self.players.get(p_id)
+        if player:
+            player.send(msg)
+
+    def next_turn(self):
+        if self.ended.is_set() or self.over:
             return
+        turn = self.table.advance()
+        if turn is None:
+            self.over = True
+            self.broadcast(f"OVER:玩家 {self.table.picker} 輸了，他是最後的鬼牌得主！")
+            self.call_later(5, self.end)
+            return
+        self.broadcast(f"TURN:{turn[0]},{turn[1]}")
+
+    def draw(self, player):
+        table = self.table
+        if self.over or table is None or table.target is None or player.id != table.picker:
+            return
+        self.drawer = player.id
+        target, rank, paired = table.draw()
+
+        self.send_to(target, f"LOST:{RANKS[rank]}")
+        player.send(f"GOT:{RANKS[rank]}")
+        player.send(f"PAIRS:{RANKS[rank] if paired else ''}")
+        self.broadcast(f"COUNT:{target},{table.hands[target].size}")
+        self.broadcast(f"COUNT:{player.id},{table.hands[player.id].size}")
+
+    async def on_message(self, player, cmd):
+        if cmd.startswith("DRAW_REQ:"):
+            # DRAW_REQ:picker,target,index；抽到哪張由 server 決定
+            self.draw(player)
+
+        elif cmd.startswith("DRAW_DONE:"):
+            # picker 的去對動畫播完，停頓一下再換下一位（排程，不會卡住收訊息）
+            if player.id == self.drawer:
+                self.drawer = None
+                self.call_later(1.5, self.next_turn)
+
+        else:
+            # 玩家只會送 DRAW_REQ / DRAW_DONE；牌桌狀態（COUNT/TURN/GOT/LOST/PAIRS/OVER）一律由 server 發
+            print(f"⚠️ 忽略玩家 {player.id} 的未知指令: {cmd}")
+
+    async def on_leave(self, player):
+        if self.over:
+            return
+        # 任何玩家斷線，整場遊戲結束
+        self.stop_game_server(player.id)
 
-        self.broadcast(f"TURN:{picker_id},{target_id}")
-
-    def handle_client(self, conn, p_id):
-        conn.send(f"ID:{p_id}|".encode('utf-8'))
-        try:
-            while True:
-                try:
-                    data = conn.recv(1024).decode('utf-8')
-                    if not data: break
-                    for cmd in data.split('|'):
-                        if not cmd: continue
-                        
-                        if cmd.startswith("COUNT:"):
-                            _, val = cmd.split(':')
-                            pid, count = map(int, val.split(','))
-                            self.player_hands_count[pid] = count
-                            self.broadcast(cmd)
-                            
-                        elif cmd.startswith("DRAW_DONE:"):
-                            # 抽牌動作完成，換下一位
-                            time.sleep(1.5) # 抽完後停頓一下才換人
-                            self.next_turn()
-                            
-                        else:
-                            self.broadcast(cmd)
-                except: break
-            del self.clients[p_id]
-        
-        except Exception as e:
-            print(f"玩家 {p_id} 通訊異常: {e}")
-        finally:
-            # 當程式執行到這裡，代表該玩家已經斷線
-            if self.running: # 如果還沒被關閉，則執行關閉邏輯
-                self.stop_game_server(p_id)
-    
     def stop_game_server(self, disconnected_id):
         print(f"玩家 {disconnected_id} 斷開，正在停止伺服器...")
         self.broadcast(f"ERROR:玩家 {disconnected_id} 斷開，遊戲結束。")
-        
-        # 關閉所有連線
-        for sock in list(self.clients.values()):
-            try: sock.close()
-            except: pass
-        
-        # 關鍵：將旗標設為 False，讓 run 迴圈停止
-        self.running = False
-        # 關閉監聽 socket 讓 accept 拋出例外從而跳出迴圈
-        self.server.close()
-
-
-    def run(self):
-        print("等待玩家連線...")
-        while self.running:
-            try:
-                conn, addr = self.server.accept()
-                p_id = len(self.clients) + 1
-                self.clients[p_id] = conn
-                threading.Thread(target=self.handle_client, args=(conn, p_id), daemon=True).start()
-                
-                if len(self.clients) == 3:
-                    threading.Thread(target=self.start_game, daemon=True).start()
-            except:
-                # 當 stop_game_server 呼叫 self.server.close() 時，
-                # accept 會報錯，程式會跑到這裡並跳出迴圈
-                break
+        self.end()
         print("Server 邏輯已結束。")
 
+
 if __name__ == "__main__":
-    OldMaidServer(sys.argv[1] if len(sys.argv) > 1 else 5555).run()
\ No newline at end of file
+    port = sys.argv[1] if len(sys.argv) > 1 else 5555
+    print(f"多人抽鬼牌 Server 啟動於 {port}，滿 {OldMaidServer.max_players} 人即自動開始...")
+    print("等待玩家連線...")
+    serve(OldMaidServer, port)
@@ -0,0 +1,394 @@
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from lobby.port_alloc import PortAllocator
+
+WORKER_PY = Path(__file__).with_name("game_worker.py")
+BIND_RETRIES = 3                 # port 被其他程式佔用時，換 port 重試的次數
+
+
+class PortInUse(RuntimeError):
+    pass
+
+
+def _percentile(sorted_samples, p):
+    idx = min(len(sorted_samples) - 1, int(round(p / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[idx]
+
+
+class GameWorker:
+    """一個 game_worker 子程序；stdout 由背景執行緒逐行讀取，再丟回 event loop 處理"""
+
+    def __init__(self, pool, script):
+        self.pool = pool
+        self.script = script
+        self.mtime = script.stat().st_mtime
+        self.state = "warming"        # warming -> ready -> busy -> exited
+        self.port = None
+        self.bind_failed = False
+        self.warm_ms = None
+        self.listening = pool.loop.create_future()
+        self.hosting = False          # 多場模式的常駐行程
+        self.retiring = False         # game_server.py 已更新：不再開新房，現有的房間結束後就關掉
+        self.rooms = {}               # 多場模式：room_id -> 等待 opened 的 future
+        self.rss_kb = None
+
+        # Lobby 在 Windows 上用 Selector loop，不支援 asyncio subprocess，所以用 Popen + 讀取執行緒
+        self.proc = subprocess.Popen(
+            [sys.executable, str(WORKER_PY), str(script)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+
+    def _read_stdout(self):
+        for line in self.proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            self.pool.loop.call_soon_threadsafe(self._on_event, msg)
+        self.proc.wait()
+        self.pool.loop.call_soon_threadsafe(self._on_exit)
+
+    def _on_event(self, msg):
+        event = msg.get("event")
+        if event == "ready":
+            self.warm_ms = msg.get("warm_ms")
+            if self.state == "warming":
+                self.state = "ready"
+        elif event == "listening" and not self.listening.done():
+            self.listening.set_result(msg.get("port"))
+        elif event == "bind_failed":
+            self.bind_failed = True
+        elif event == "opened":
+            opened = self.rooms.get(msg.get("room_id"))
+            if opened and not opened.done():
+                opened.set_result(True)
+        elif event == "match_end":
+            self.rooms.pop(msg.get("room_id"), None)
+            self.pool._on_hosted_end(self, msg.get("room_id"))
+        elif event == "heartbeat":
+            self.rss_kb = msg.get("rss_kb")
+            if self.pool.supervisor:
+                self.pool.supervisor.on_heartbeat(self, msg)
+
+    def _on_exit(self):
+        was_busy = self.state == "busy"
+        self.state = "exited"
+        for opened in self.rooms.values():
+            if not opened.done():
+                opened.set_exception(RuntimeError("遊戲伺服器在開房前就結束了"))
+        if not self.listening.done() and not was_busy:
+            # 待命中就結束（關機或被丟棄），沒有人在等它開局
+            self.listening.cancel()
+        elif not self.listening.done():
+            if self.bind_failed:
+                self.listening.set_exception(PortInUse(f"port {self.port} 已被佔用"))
+            else:
+                self.listening.set_exception(
+                    RuntimeError(f"遊戲伺服器在開始監聽前就結束了（exit code {self.proc.returncode}）")
+                )
+        self.pool._on_worker_exit(self)
+
+    def run(self, port, options=None, cmd="run"):
+        """
+        把這場對戰交給 worker；options 是 Supervisor 的資源限制與 heartbeat 間隔。
+        cmd="host" 時 worker 成為多場模式的常駐行程，之後用 open_match() 開房
+        """
+        self.state = "busy"
+        self.port = port
+        self.hosting = cmd == "host"
+        self._write({"cmd": cmd, "port": port, **(options or {})})
+
+    def open_match(self, room_id):
+        """多場模式：在這個行程裡開一場，回傳收到 opened 時完成的 future"""
+        opened = self.rooms[room_id] = self.pool.loop.create_future()
+        self._write({"cmd": "open", "room_id": room_id})
+        return opened
+
+    def close_match(self, room_id):
+        self._write({"cmd": "close", "room_id": room_id})
+
+    def retire(self):
+        """不再開新房；沒有房間時關掉 stdin，行程會結束剩下的對戰後退出"""
+        self.retiring = True
+        if not self.rooms:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+
+    def _write(self, msg):
+        try:
+            self.proc.stdin.write(json.dumps(msg) + "\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            # 行程已經結束（ValueError：stdin 已關閉），結束事件會另外處理
+            pass
+
+    def kill(self):
+        try:
+            self.proc.kill()
+        except OSError:
+            pass
+
+
+class GamePool:
+    """
+    預熱的遊戲伺服器 worker 池（每款遊戲各自一組）：
+    - 每款遊戲保留 warm_per_game 個已 import、已編譯好的 worker 待命
+    - start() 取一個待命 worker 開局，等它真的 listen 了才回傳，並在背景補一個新的
+    - game_server.py 被開發者更新（mtime 改變）時，舊的待命 worker 直接丟掉
+    - port 由 PortAllocator 租出，worker 結束（對戰結束）時歸還
+    - 開局後的子程序交給 Supervisor 管理（資源限制、閒置回收、結束原因）
+    - 多場模式（start(..., multi=True)）：每款遊戲一個常駐的 host 行程，開局只是在裡面開一個房間，
+      所有房間共用 host 的 port；game_server.py 更新後改開新的 host，舊的等房間都結束再關
+    """
+
+    def __init__(self, warm_per_game=1, listen_timeout=5.0, port_range=None, supervisor=None):
+        self.warm_per_game = warm_per_game
+        self.listen_timeout = listen_timeout
+        self.ports = PortAllocator(port_range)
+        self.supervisor = supervisor
+        self.loop = None
+        self.spares = {}             # script -> deque[GameWorker]（warming / ready）
+        self.busy = set()
+        self.hosts = {}              # script -> 多場模式的 host worker
+
+        self.spawned = 0
+        self.warm_starts = 0         # 拿到已預熱完成的 worker
+        self.cold_starts = 0         # 沒有待命 worker，或 worker 還在預熱
+        self.failed = 0
+        self.hosted_starts = 0       # 多場模式：在既有 host 裡開房
+        self.listen_timeouts = 0
+        self.discarded = 0
+        self.peak_busy = 0
+        self.listen_ms = deque(maxlen=256)
+        self.warm_ms = deque(maxlen=256)
+
+    def prewarm(self, scripts):
+        self.loop = asyncio.get_running_loop()
+        for script in scripts:
+            self._refill(Path(script).resolve())
+
+    def _spawn(self, script):
+        self.spawned += 1
+        return GameWorker(self, script)
+
+    def _refill(self, script):
+        spares = self.spares.setdefault(script, deque())
+        while len(spares) < self.warm_per_game:
+            spares.append(self._spawn(script))
+
+    def _take(self, script):
+        """取一個可用的待命 worker；沒有就現場開一個"""
+        spares = self.spares.setdefault(script, deque())
+        mtime = script.stat().st_mtime
+        while spares:
+            worker = spares.popleft()
+            if worker.state == "exited":
+                continue
+            if worker.mtime != mtime:
+                worker.kill()
+                self.discarded += 1
+                continue
+            if worker.state == "ready":
+                self.warm_starts += 1
+            else:
+                self.cold_starts += 1
+            return worker
+        self.cold_starts += 1
+        return self._spawn(script)
+
+    def _on_worker_exit(self, worker):
+        self.busy.discard(worker)
+        if self.hosts.get(worker.script) is worker:
+            del self.hosts[worker.script]
+        if worker.port:
+            self.ports.release(worker.port, in_use=worker.bind_failed)
+        if self.supervisor:
+            self.supervisor.on_exit(worker)
+        spares = self.spares.get(worker.script)
+        if spares and worker in spares:
+            spares.remove(worker)
+
+    def _on_hosted_end(self, worker, key):
+        if self.supervisor:
+            self.supervisor.on_hosted_end(worker, key)
+        if worker.retiring and not worker.rooms:
+            worker.retire()
+
+    async def start(self, script, room_id=None, multi=False):
+        """
+        開一場對戰，回傳遊戲伺服器實際監聽的 port；開局失敗會丟出例外。
+        multi=True 時在這款遊戲的 host 行程裡開房（玩家連線後要先送 HELLO <room_id>）
+        """
+        self.loop = asyncio.get_running_loop()
+        script = Path(script).resolve()
+        if not script.exists():
+            raise FileNotFoundError(f"找不到遊戲伺服器：{script}")
+        if multi:
+            return await self._open_hosted(script, room_id)
+
+        worker = await self._start_retrying(script, room_id)
+        return worker.port
+
+    async def _start_retrying(self, script, room_id, host=False):
+        for attempt in range(BIND_RETRIES):
+            try:
+                return await self._start_once(script, room_id, host)
+            except PortInUse as e:
+                print(f"⚠️ {e}，換一個 port 重試")
+        raise RuntimeError("❌ 連續多個 port 都被佔用，無法開局")
+
+    async def _host_for(self, script):
+        """這款遊戲目前的 host 行程；沒有、已結束或 game_server.py 已更新就開一個新的"""
+        host = self.hosts.get(script)
+        if host and host.state != "exited" and host.mtime == script.stat().st_mtime:
+            # 可能還在啟動中（另一個房間剛觸發開 host），一起等它開始監聽
+            await asyncio.shield(host.listening)
+            return host
+        if host:
+            del self.hosts[script]
+            host.retire()
+        return await self._start_retrying(script, None, host=True)
+
+    async def _open_hosted(self, script, room_id):
+        t0 = time.perf_counter()
+        key = str(room_id)
+        host = await self._host_for(script)
+        if self.supervisor:
+            self.supervisor.track(host, room_id, hosted=True)
+        try:
+            await asyncio.wait_for(asyncio.shield(host.open_match(key)), self.listen_timeout)
+        except Exception:
+            self.failed += 1
+            host.rooms.pop(key, None)
+            if self.supervisor:
+                self.supervisor.on_hosted_end(host, key, reason="open_failed")
+            raise
+        self.hosted_starts += 1
+        self.listen_ms.append((time.perf_counter() - t0) * 1000)
+        return host.port
+
+    async def _start_once(self, script, room_id, host=False):
+        t0 = time.perf_counter()
+        # 先取 worker 再租 port：_take 可能失敗（開行程、stat 腳本），不能讓租出的 port 沒人歸還
+        worker = self._take(script)
+        try:
+            port = self.ports.lease()
+        except RuntimeError:
+            # port 用完：worker 放回待命佇列，下次開局再用
+            self.spares.setdefault(script, deque()).appendleft(worker)
+            raise
+        options = self.supervisor.run_options(host) if self.supervisor else {}
+        match = None
+        if host:
+            # host 行程的 CPU / 記憶體是所有房間加總，不套單場的 rlimit（見 Supervisor.run_options）
+            worker.run(port, options, cmd="host")
+            self.hosts[script] = worker
+        else:
+            worker.run(port, options)
+            if self.supervisor:
+                match = self.supervisor.track(worker, room_id)
+        self.busy.add(worker)
+        self.peak_busy = max(self.peak_busy, len(self.busy))
+        self._refill(script)
+
+        try:
+            port = await asyncio.wait_for(asyncio.shield(worker.listening), self.listen_timeout)
+        except asyncio.TimeoutError:
+            self.listen_timeouts += 1
+            print(f"⚠️ 遊戲伺服器 {script.parent.name} 在 {self.listen_timeout}s 內沒有開始監聽")
+            if self.ports.ephemeral:
+                # 沒收到實際 port 就沒辦法讓玩家去連；經由 Supervisor 砍掉才會記下結束原因
+                if match:
+                    self.supervisor.kill(match, "listen_timeout")
+                else:
+                    worker.kill()
+                raise RuntimeError("遊戲伺服器啟動逾時。")
+            # 遊戲可能還在啟動，照舊讓玩家去連
+            return worker
+        except PortInUse:
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+
+        if self.ports.ephemeral:
+            worker.port = port
+            self.ports.claim(port)
+        self.listen_ms.append((time.perf_counter() - t0) * 1000)
+        if worker.warm_ms is not None:
+            self.warm_ms.append(worker.warm_ms)
+        return worker
+
+    def shutdown(self):
+        """
+        關掉待命中的 worker；單場模式進行中的對戰不受影響。
+        多場模式的 host 一併收掉（stdin 關閉後 host 會結束所有房間）
+        """
+        for spares in self.spares.values():
+            for worker in spares:
+                worker.kill()
+        self.spares.clear()
+        for host in list(self.hosts.values()):
+            host.rooms.clear()
+            host.retire()
+        self.hosts.clear()
+
+    def stats(self):
+        samples = sorted(self.listen_ms)
+        listen = {"count": len(samples)}
+        if samples:
+            listen.update({
+                "avg_ms": round(sum(samples) / len(samples), 2),
+                "p50_ms": round(_percentile(samples, 50), 2),
+                "p99_ms": round(_percentile(samples, 99), 2),
+                "max_ms": round(samples[-1], 2),
+            })
+        per_game = {
+            script.parent.name: {
+                "ready": sum(1 for w in spares if w.state == "ready"),
+                "warming": sum(1 for w in spares if w.state == "warming"),
+                "busy": sum(1 for w in self.busy if w.script == script and not w.hosting),
+            }
+            for script, spares in self.spares.items()
+        }
+        hosts = {
+            script.parent.name: {
+                "pid": host.proc.pid,
+                "port": host.port,
+                "rooms": len(host.rooms),
+                "rss_kb": host.rss_kb,
+                "kb_per_room": round(host.rss_kb / len(host.rooms), 1) if host.rss_kb and host.rooms else None,
+            }
+            for script, host in self.hosts.items()
+        }
+        return {
+            "warm_per_game": self.warm_per_game,
+            "spare": sum(len(s) for s in self.spares.values()),
+            "busy": len(self.busy),
+            "peak_busy": self.peak_busy,
+            "spawned": self.spawned,
+            "warm_starts": self.warm_starts,
+            "cold_starts": self.cold_starts,
+            "hosted_starts": self.hosted_starts,
+            "failed": self.failed,
+            "listen_timeouts": self.listen_timeouts,
+            "discarded": self.discarded,
+            "start_to_listen": listen,
+            "avg_warm_ms": round(sum(self.warm_ms) / len(self.warm_ms), 2) if self.warm_ms else None,
+            "ports": self.ports.stats(),
+            "games": per_game,
+            "hosts": hosts,
+        }
@@ -0,0 +1,199 @@
+"""
+預熱好的遊戲伺服器 worker（由 lobby/game_pool.py 啟動，不直接手動執行）：
+    python lobby/game_worker.py <game_server.py>
+
+流程：
+1. 先讀取、編譯 game_server.py，並 import 它用到的模組（省掉開局時的冷啟動）
+2. 從 stdout 回報 {"event": "ready"}，接著在 stdin 等開局指令 {"cmd": "run", "port": ...}
+3. 以 __main__ 身分執行遊戲腳本（sys.argv = [腳本, port]），
+   遊戲第一次呼叫 socket.listen() 時回報 {"event": "listening", "port": ...}；
+   port 為 0 時由系統分配，回報的是實際的 port。bind 失敗則回報 {"event": "bind_failed"}
+
+開局後每 heartbeat 秒回報一次 {"event": "heartbeat", "rss_kb", "cpu_sec", "conns", "queues"}，
+讓 Lobby 的 Supervisor 判斷記憶體用量與對戰是否已經沒人（conns = 還開著的玩家連線數）。
+開局指令帶 cpu_sec / mem_mb 時，用 rlimit 限制這場對戰的 CPU 時間與記憶體（僅限 Unix）；
+撞到記憶體上限（MemoryError）時以 EXIT_MEMORY 結束，CPU 上限則是被 SIGXCPU 終止；
+多場模式的 host 由 Supervisor 改給整個行程的上限（不限 CPU、mem_mb 為 host_mem_mb）。
+
+stdout 是跟 Lobby 溝通的控制通道，遊戲本身的 print 一律改印到 stderr。
+一個 worker 只跑一場對戰，結束後行程就退出，由 Lobby 補新的 worker。
+
+多場模式：開局指令改為 {"cmd": "host", "port": ...} 時，worker 變成這款遊戲的常駐行程，
+由 common.game_sdk 的 MatchHost 在同一個 port 上服務多場對戰；之後 stdin 繼續收
+open / close 指令，stdout 回報 opened / match_end（見 game_sdk.host_control）。
+"""
+import ast
+import importlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import weakref
+
+# 專案根目錄：讓預熱時就能 import common.game_sdk 等共用模組
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXIT_MEMORY = 3                 # 撞到 RLIMIT_AS（MemoryError）時的結束碼，Supervisor 據此回報 mem_limit
+
+send_lock = threading.Lock()
+accepted = weakref.WeakSet()    # 遊戲 accept() 進來的玩家連線
+
+
+def send(ctl, msg):
+    # 遊戲執行緒與 heartbeat 執行緒都可能寫控制通道
+    with send_lock:
+        ctl.write(json.dumps(msg) + "\n")
+        ctl.flush()
+
+
+def warm(script):
+    """編譯遊戲腳本，並預先 import 頂層用到的模組；回傳 code object"""
+    with open(script, "r", encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source, script)
+
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                # 遊戲資料夾內的模組等開局時才 import（sys.path 那時才會加上遊戲目錄）
+                pass
+
+    return compile(tree, script, "exec")
+
+
+def hook_socket(ctl):
+    """遊戲第一次 listen() 時通知 Lobby 已可連線；bind 失敗（port 被佔用）也回報"""
+    original_bind = socket.socket.bind
+    original_listen = socket.socket.listen
+    original_accept = socket.socket.accept
+    reported = []
+
+    def bind(self, address):
+        try:
+            original_bind(self, address)
+        except OSError as e:
+            if not reported:
+                send(ctl, {"event": "bind_failed", "error": str(e)})
+            raise
+
+    def listen(self, *args):
+        original_listen(self, *args)
+        if not reported:
+            reported.append(True)
+            send(ctl, {"event": "listening", "port": self.getsockname()[1]})
+
+    def accept(self):
+        conn, addr = original_accept(self)
+        accepted.add(conn)
+        return conn, addr
+
+    socket.socket.bind = bind
+    socket.socket.listen = listen
+    socket.socket.accept = accept
+
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # 沒有 /proc 時退而求其次用峰值（macOS 單位是 bytes）
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def heartbeat(ctl, interval):
+    while True:
+        t = os.times()
+        conns = sum(1 for conn in list(accepted) if conn.fileno() != -1)
+        msg = {
+            "event": "heartbeat",
+            "rss_kb": rss_kb(),
+            "cpu_sec": round(t.user + t.system, 2),
+            "conns": conns,
+        }
+        # 用 game_sdk 寫的遊戲順便回報每位玩家的送出佇列深度
+        sdk = sys.modules.get("common.game_sdk")
+        if sdk:
+            try:
+                msg["queues"] = sdk.stats()
+            except RuntimeError:
+                # event loop 執行緒剛好在增減玩家，下一次再報
+                pass
+        send(ctl, msg)
+        time.sleep(interval)
+
+
+def apply_limits(cpu_sec, mem_mb):
+    try:
+        import resource
+    except ImportError:
+        # Windows 沒有 rlimit，只靠 Supervisor 的牆鐘與閒置檢查
+        return
+    if cpu_sec:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_sec, cpu_sec + 1))
+    if mem_mb:
+        limit = mem_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        # 遊戲自己開的執行緒撞到上限時也整個結束，不要只死一條執行緒、對戰卡住
+        default_hook = threading.excepthook
+
+        def exit_on_memory_error(args):
+            if issubclass(args.exc_type, MemoryError):
+                os._exit(EXIT_MEMORY)
+            default_hook(args)
+
+        threading.excepthook = exit_on_memory_error
+
+
+def main():
+    script = os.path.abspath(sys.argv[1])
+
+    # stdout 留給控制通道，遊戲的輸出改走 stderr
+    ctl = sys.stdout
+    sys.stdout = sys.stderr
+
+    t0 = time.perf_counter()
+    code = warm(script)
+    send(ctl, {"event": "ready", "warm_ms": round((time.perf_counter() - t0) * 1000, 2)})
+
+    line = sys.stdin.readline()
+    if not line:
+        return
+    cmd = json.loads(line)
+    if cmd.get("cmd") not in ("run", "host"):
+        return
+    if cmd["cmd"] == "host":
+        game_sdk = importlib.import_module("common.game_sdk")
+        game_sdk.host_control(lambda msg: send(ctl, msg), sys.stdin)
+
+    apply_limits(cmd.get("cpu_sec"), cmd.get("mem_mb"))
+    hook_socket(ctl)
+    if cmd.get("heartbeat"):
+        threading.Thread(target=heartbeat, args=(ctl, cmd["heartbeat"]), daemon=True).start()
+    sys.argv = [script, str(cmd["port"])]
+    sys.path.insert(0, os.path.dirname(script))
+    try:
+        exec(code, {"__name__": "__main__", "__file__": script, "__builtins__": __builtins__})
+    except MemoryError:
+        # 例外處理本身也可能再要記憶體，直接用固定的結束碼離開
+        os._exit(EXIT_MEMORY)
+
+
+if __name__ == "__main__":
+    main()
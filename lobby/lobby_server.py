@@ -1,8 +1,11 @@
 import asyncio
+import json
 import logging
-from common.network import send_msg, recv_msg
+from common.network import FrameWriter, serve_requests
+from database.storage import make_backend
+from lobby.game_pool import GamePool
+from lobby.supervisor import Supervisor
 import socket
-import subprocess
 import time
 import sys
 from pathlib import Path
@@ -14,8 +17,24 @@ logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 # -------------------------------
 # 設定區
 # -------------------------------
+DB_BACKEND = "remote"       # "remote" = 經 TCP 連 DB Server；"embedded" = 單機部署，在本行程用執行緒池直接呼叫 db_fun
 DB_HOST = "127.0.0.1"       # DB Server 位址
 DB_PORT = 14411              # DB Server 監聽埠
+DB_UNIX_PATH = None          # 與 DB Server 同一台機器時填它的 UNIX_PATH（例如 "/tmp/game_lobby_db.sock"），改走 Unix socket
+DB_POOL_SIZE = 4             # 與 DB Server 的常駐連線數
+DB_MAX_INFLIGHT = 32         # 每條連線最多同時在途的請求數，超過就排隊
+DB_READERS = 4               # embedded：讀取執行緒數（寫入固定 1 條）
+GAMES_DIR = Path(__file__).parent.parent / "games"
+GAME_POOL_WARM = 1           # 每款遊戲預先啟動、待命中的 game server worker 數
+GAME_LISTEN_TIMEOUT = 5.0    # 開局後等遊戲伺服器開始監聽的上限（秒）
+GAME_PORT_RANGE = (16800, 18800)  # 遊戲伺服器可用的 port 範圍 [start, end)；None = 由系統分配
+MATCH_MAX_SECONDS = 3600     # 單場對戰的牆鐘上限（秒）
+MATCH_IDLE_SECONDS = 120     # 沒有任何玩家連線超過這個秒數就結束對戰
+MATCH_CPU_SEC = 600          # 單場對戰的 CPU 時間上限（RLIMIT_CPU，僅 Unix）
+MATCH_MEM_MB = 512           # 單場對戰的記憶體上限（RLIMIT_AS，僅 Unix）
+HOST_MEM_MB = 4096           # 多場 host 行程的記憶體上限（所有房間共用，超過時全部房間一起結束）；None = 不限制
+GAME_MULTI_HOST = False      # True：config.json 標 "host_mode": "multi" 的遊戲，所有房間共用一個常駐行程
+                             # 預設關閉，維持一場一個行程的隔離（共用時一場撞到 HOST_MEM_MB，同款遊戲的房間會一起結束）
 
 
 
@@ -34,8 +53,16 @@ def get_host_ip():
 
 LOBBY_HOST = get_host_ip()     # Lobby Server 對外開放 IP
 LOBBY_PORT = 14110           # Lobby Server 監聽埠
-db_reader = None
-db_writer = None
+db_pool = None               # 資料存取後端（remote：DBClient；embedded：LocalStorage）
+supervisor = Supervisor(
+    max_seconds=MATCH_MAX_SECONDS, idle_seconds=MATCH_IDLE_SECONDS,
+    cpu_sec=MATCH_CPU_SEC, mem_mb=MATCH_MEM_MB, host_mem_mb=HOST_MEM_MB,
+    on_match_end=lambda match, reason: match_ended(match, reason),
+)
+game_pool = GamePool(
+    warm_per_game=GAME_POOL_WARM, listen_timeout=GAME_LISTEN_TIMEOUT,
+    port_range=GAME_PORT_RANGE, supervisor=supervisor,
+)
 
 # -------------------------------
 # 記憶體內資料結構
@@ -60,7 +87,7 @@ online_users = {}
 #         "game_id": int,            # 綁定哪一款遊戲（對應 dev_games.id）
 #         "player_num": int,         # 目前房間實際玩家數 = 1 + len(guest_id)
 #         "enabled_plugins": list[str],  # 啟用中的 plugin 名稱/ID 清單
-#         "status": str               # 房間狀態：space / play / ready
+#         "status": str               # 房間狀態：space / ready / starting / play（play 時遊戲伺服器已在監聽）
 #     }
 # }
 rooms = {}
@@ -78,37 +105,20 @@ room_counter = 0
 # }
 invites = {}
 invite_counter = 0
-    
-def find_free_port(start=16800, end=16900):
-    import socket
-    import random
-    
-    # 隨機產生一個起點
-    search_range = list(range(start, end))
-    random.shuffle(search_range) 
-    
-    for port in search_range:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            try:
-                # 建議 bind 到 "0.0.0.0" 或 "" 確保測試最精確
-                s.bind(('', port))
-                return port
-            except OSError:
-                continue
-    raise RuntimeError("❌ 沒有可用的 port")
-
-
 
+# room_subscribers = {
+#     room_id: { user_id: FrameWriter }   # 訂閱房間事件的連線，狀態改變時由 Lobby 主動推播
+# }
+room_subscribers = {}
+push_tasks = set()
+    
 # -------------------------------
 # 與 DB Server 溝通
 # -------------------------------
 async def db_request(req: dict):
-    """透過既有的持續 TCP 連線與 DB Server 溝通"""
-    global db_reader, db_writer
+    """透過資料存取後端處理請求（remote：DB 連線池，多條常駐連線、每條可多個請求同時在途）"""
     try:
-        await send_msg(db_writer, req)
-        resp = await recv_msg(db_reader)
-        return resp
+        return await db_pool.request(req)
     except Exception as e:
         print(f"⚠️ DB Server 通訊錯誤: {e}")
         return {"ok": False, "error": str(e)}
@@ -117,11 +127,83 @@ async def db_request(req: dict):
 # -------------------------------
 # 輔助函式
 # -------------------------------
+def room_snapshot(rid):
+    """組出與 Room/status 相同格式的房間狀態（查詢與推播事件共用）"""
+    room = rooms.get(rid)
+    if not room:
+        return {"ok": False, "error": "Room not found."}
+
+    guest_ids = room.get("guest_id") or []
+    ready = room.get("ready_status", [])
+    if ready and all(ready):
+        room["all_ready"] = True
+
+    return {
+        "ok": True,
+        "status": room["status"],
+        "guest_joined": len(guest_ids) > 0,
+        "guest_id": list(guest_ids),
+        "guest_name": [online_users[uid]["name"] for uid in guest_ids if uid in online_users],
+        "host_id": room["host_id"],
+        "game_id": room["game_id"],
+        "game_host": LOBBY_HOST,
+        "game_port": room.get("port"),
+        "game_match": room.get("match"),
+        "plugins": room["enabled_plugins"],
+        "all_ready": room["all_ready"]
+    }
+
+def notify_room(rid, event_type, snapshot=None):
+    """
+    把房間事件推給所有訂閱者，事件內附完整的房間狀態。
+    不等待送出完成，慢的連線不會拖住觸發事件的請求。
+    """
+    subs = room_subscribers.get(rid)
+    if not subs:
+        return
+    evt = {
+        "event": "room",
+        "type": event_type,
+        "room_id": rid,
+        "status": snapshot or room_snapshot(rid),
+    }
+    for out in list(subs.values()):
+        task = asyncio.create_task(push_event(out, evt))
+        push_tasks.add(task)
+        task.add_done_callback(push_tasks.discard)
+
+async def push_event(out, evt):
+    try:
+        await out.send(evt)
+    except (ConnectionError, OSError):
+        pass
+
+def close_room_and_notify(rid):
+    """刪除房間、清掉房內玩家的 room_id，並通知訂閱者房間已關閉"""
+    room = rooms.pop(rid, None)
+    if not room:
+        return
+    for uid in [room["host_id"]] + (room.get("guest_id") or []):
+        if uid in online_users:
+            online_users[uid]["room_id"] = None
+    notify_room(rid, "room_closed", {"ok": False, "error": "Room closed."})
+    room_subscribers.pop(rid, None)
+
+def remove_guest(room, uid):
+    """把 guest 移出房間（連同對應的準備狀態）"""
+    if uid not in room["guest_id"]:
+        return
+    idx = room["guest_id"].index(uid)
+    room["guest_id"].remove(uid)
+    ready = room.get("ready_status")
+    if ready and idx < len(ready):
+        ready.pop(idx)
+
 
 # -------------------------------
 # 核心邏輯：處理玩家請求
 # -------------------------------
-async def handle_request(req, writer):
+async def handle_request(req, writer, out=None):
     collection = req.get("collection")
     action = req.get("action")
     data = req.get("data", {})
@@ -172,6 +254,7 @@ async def handle_request(req, writer):
                 "enabled_plugins": ["chat"],
                 "status": "space",
                 "port": None,
+                "match": None,
                 "all_ready": False
             }
 
@@ -240,18 +323,8 @@ async def handle_request(req, writer):
                 if room["host_id"] != host_id:
                     return {"ok": False, "error": "Only the host can close the room."}
                 
-                # 🟩 若房間裡有 guest，通知他房間被關閉
-                
-                for guest_id in room.get("guest_id") or []:
-                    if guest_id and guest_id in online_users:
-                        online_users[guest_id]["room_id"] = None
-
-                # 🟩 更新房主狀態
-                if host_id in online_users:
-                    online_users[host_id]["room_id"] = None
-
-                # 🟩 最後刪除房間
-                rooms.pop(rid)
+                # 🟩 清掉房內玩家狀態、刪除房間，並推播給訂閱中的 guest
+                close_room_and_notify(rid)
                 print(f"🗑️ 房間 {rid} 已由房主 {host_id} 關閉。")
                 return {"ok": True, "msg": f"房間 {rid} 已關閉。"}
             except Exception as e:
@@ -279,50 +352,23 @@ async def handle_request(req, writer):
                 if not room:
                     return {"ok": False, "error": "Room not found."}
 
-                # 從 online_users 查出 guest 名字
+                # 清掉已離線的 guest
                 guest_ids = room.get("guest_id") or []
-                guest_names = []
                 invalid_uids = []
                 
                 host_id = room.get("host_id")
                 if host_id not in online_users:
-                    for uid in guest_ids:
-                        if uid in online_users:
-                            online_users[uid]["room_id"] = None
-                    rooms.pop(rid)
+                    close_room_and_notify(rid)
                     return {"ok": False, "error": "Host user is offline."}
 
                 for uid in guest_ids:
-                    if uid in online_users:
-                        guest_names.append(online_users[uid]["name"])
-                    else:
+                    if uid not in online_users:
                         invalid_uids.append(uid)
                     
                 for uid in invalid_uids:
-                    rooms[rid]["guest_id"].remove(uid)
-                    guest_ids.remove(uid)
-                    
+                    remove_guest(room, uid)
                 
-                host = get_host_ip()
-                game_port = room.get("port")
-                
-                ready = room.get("ready_status", [])
-                if ready and all(ready):
-                    room["all_ready"] = True
-
-                resp = {
-                    "ok": True,
-                    "status": room["status"],
-                    "guest_joined": len(guest_ids) > 0,
-                    "guest_id": guest_ids,
-                    "guest_name": guest_names,
-                    "host_id": room["host_id"],
-                    "game_id": room["game_id"],
-                    "game_host": host,
-                    "game_port": game_port,
-                    "plugins": room["enabled_plugins"],
-                    "all_ready": room["all_ready"]
-                }
+                resp = room_snapshot(rid)
                 
                 #print(f"✅ 房間 {rid} 狀態回應：{resp}")
                 
@@ -335,6 +381,25 @@ async def handle_request(req, writer):
                 print(f"rooms:{rooms}")
                 return {"ok": False, "error": str(e)}
         
+        elif action == "subscribe":
+            # 訂閱房間事件：之後狀態有變化就主動推播，不必再每秒輪詢 status
+            rid = data.get("room_id")
+            uid = data.get("user_id")
+            if rid not in rooms:
+                return {"ok": False, "error": "Room not found."}
+            if out is None:
+                return {"ok": False, "error": "此連線不支援推播。"}
+            room_subscribers.setdefault(rid, {})[uid] = out
+            return room_snapshot(rid)
+
+        elif action == "unsubscribe":
+            rid = data.get("room_id")
+            uid = data.get("user_id")
+            subs = room_subscribers.get(rid)
+            if subs:
+                subs.pop(uid, None)
+            return {"ok": True}
+
         elif action == "ready":
             rid = data.get("room_id")
             room = rooms.get(rid)
@@ -348,6 +413,7 @@ async def handle_request(req, writer):
                 room["all_ready"] = False
                 print(f"✅ 房主 {room['host_id']} 將房間 {rid} 設為準備狀態。")
                 print(f"room:{room}")
+                notify_room(rid, "ready")
                 
                 return {"ok": True, "msg": "房間已設為準備狀態。"}
                 
@@ -369,10 +435,11 @@ async def handle_request(req, writer):
 
             if room["guest_id"] and uid in room["guest_id"]:
                 print(f"👋 玩家 {user_info['name']} 離開房間 {rid}")
-                if uid in room["guest_id"]:
-                    room["guest_id"].remove(uid)
+                remove_guest(room, uid)
                 room["status"] = "space"
                 user_info["room_id"] = None
+                room_subscribers.get(rid, {}).pop(uid, None)
+                notify_room(rid, "guest_left")
                 return {"ok": True, "msg": "你已離開房間。"}
 
             return {"ok": False, "error": "你不在該房間中。"}
@@ -392,6 +459,7 @@ async def handle_request(req, writer):
                     room["ready_status"][index] = True
                     print(f"✅ 玩家 {uid} 在房間 {rid} 標記為準備就緒。")
                     print(f"room:{room}")
+                    notify_room(rid, "all_ready" if all(room["ready_status"]) else "guest_ready")
                     return {"ok": True, "msg": "你已標記為準備就緒。"}
                 else:
                     return {"ok": False, "error": "你不在該房間中。"}
@@ -412,25 +480,44 @@ async def handle_request(req, writer):
                 if room["status"] != "ready":
                     return {"ok": False, "error": "Room is not in ready status."}
 
-                # 分配遊戲伺服器埠號
-                game_port = find_free_port()
-                game_host = get_host_ip()
+                game_host = LOBBY_HOST
+                room["status"] = "starting"
+                notify_room(rid, "game_starting")
+                
+                # 交給預熱好的 worker 開局（port 由 game_pool 租出）；
+                # 遊戲伺服器回報 listening 之後才把房間設為 play 並附上 host/port
+                server_py = GAMES_DIR / f"{game_id}_{game_name}" / "game_server.py"
+                multi = GAME_MULTI_HOST and game_host_mode(server_py) == "multi"
+                t0 = time.perf_counter()
+                try:
+                    game_port = await game_pool.start(server_py, room_id=rid, multi=multi)
+                except Exception:
+                    if rooms.get(rid) is room:
+                        room["status"] = "ready"
+                        notify_room(rid, "game_failed")
+                    raise
+                start_ms = round((time.perf_counter() - t0) * 1000, 2)
+
+                if rooms.get(rid) is not room:
+                    # 開局途中房間被關掉了，遊戲伺服器沒人連會被 Supervisor 當成閒置回收
+                    return {"ok": False, "error": "Room closed."}
+
                 room["port"] = game_port
+                # 多場模式：玩家連線後要先送 HELLO <room_id>，client 端由 GAME_ROOM_ID 帶入
+                room["match"] = str(rid) if multi else None
                 room["status"] = "play"
-                
-                print(f"🚀 房間 {rid} 開始遊戲，分配埠號 {game_port}。")
-                
-                # 啟動遊戲伺服器子程序
-                server_py = Path("games") / f"{game_id}_{game_name}" / "game_server.py"
-                subprocess.Popen([sys.executable, str(server_py), str(game_port)])
+                print(f"🚀 房間 {rid} 開始遊戲，遊戲伺服器埠號 {game_port}（{start_ms} ms 後開始監聽）。")
+                notify_room(rid, "game_started")
                 
                 data = {
                     "room_id": rid,
                     "game_id": room["game_id"],
                     "host": game_host,
                     "port": game_port,
+                    "match": room["match"],
                     "player_num": room["player_num"],
-                    "enabled_plugins": room["enabled_plugins"]
+                    "enabled_plugins": room["enabled_plugins"],
+                    "start_ms": start_ms
                 }
                 
                 return {"ok": True, "data": data}
@@ -466,7 +553,14 @@ async def handle_request(req, writer):
             resp = await db_request(req)
             return resp
         
-
+    # === 4️⃣ 伺服器狀態 ===
+    elif collection == "Stats":
+        if action == "db_pool":
+            return {"ok": True, "stats": db_pool.stats()}
+        elif action == "game_pool":
+            return {"ok": True, "stats": game_pool.stats()}
+        elif action == "matches":
+            return {"ok": True, "stats": supervisor.stats()}
 
     # === 5️⃣ 其他未知請求 ===
     else:
@@ -500,6 +594,7 @@ async def join_room(uid: int, rid: int):
         
 
         print(f"🎮 玩家 {guest_name} (id={uid}) 加入房間 {rid}")
+        notify_room(rid, "guest_joined")
 
         return {"ok": True, "room_id": rid}
     except Exception as e:
@@ -514,14 +609,9 @@ async def handle_client(reader, writer):
     print(f"📡 玩家連線: {addr}")
 
     try:
-        while True:
-            req = await recv_msg(reader)
-            if not req:
-                break
-            #print(f"📥 收到來自 {addr}: {req}")
-
-            resp = await handle_request(req, writer)
-            await send_msg(writer, resp)
+        # 每個請求各自成為 task，回應依 rid 亂序送回；房間事件也走同一個 FrameWriter 推播
+        out = FrameWriter(writer)
+        await serve_requests(reader, writer, lambda req: handle_request(req, writer, out), out)
 
     except asyncio.IncompleteReadError:
         print(f"❌ 玩家斷線: {addr}")
@@ -543,6 +633,7 @@ async def handle_client(reader, writer):
                     print(f"⚠️ 登出通知 DB Server 失敗：{e}")
                 
                 online_users.pop(uid)
+                leave_room_on_disconnect(uid, info.get("room_id"))
                 break
         try:
             writer.close()
@@ -551,6 +642,40 @@ async def handle_client(reader, writer):
             # ✅ 忽略 WinError 64 等常見錯誤
             pass
 
+def leave_room_on_disconnect(uid, rid):
+    """斷線玩家：房主斷線就關房，guest 斷線就移出房間，並推播給其他人"""
+    for subs in room_subscribers.values():
+        subs.pop(uid, None)
+    room = rooms.get(rid)
+    if not room:
+        return
+    if room["host_id"] == uid:
+        close_room_and_notify(rid)
+    elif uid in room["guest_id"]:
+        remove_guest(room, uid)
+        notify_room(rid, "guest_left")
+
+def game_host_mode(server_py):
+    """遊戲 config.json 的 host_mode："multi" = 多場模式（一個行程服務多個房間），其餘為單場"""
+    try:
+        config = json.loads((server_py.parent / "config.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return config.get("host_mode")
+
+def match_ended(match, reason):
+    """遊戲伺服器結束（正常結束或被 Supervisor 回收）：房間回到等待狀態，port 已由 game_pool 歸還"""
+    rid = match.room_id
+    room = rooms.get(rid)
+    if not room or room.get("status") != "play" or room.get("port") != match.worker.port:
+        return
+    room["status"] = "space"
+    room["port"] = None
+    room["match"] = None
+    room["ready_status"] = [False] * len(room.get("guest_id") or [])
+    room["all_ready"] = False
+    notify_room(rid, "game_ended")
+
 async def download_game(data):
     """下載指定遊戲資料"""
     game_id = data.get("game_id")
@@ -587,11 +712,19 @@ async def download_game(data):
 # 主程式入口
 # -------------------------------
 async def main():
-    global db_reader, db_writer
-
-    # 啟動時就連上 DB Server
-    db_reader, db_writer = await asyncio.open_connection(DB_HOST, DB_PORT)
-    print(f"✅ 已連線至 DB Server {DB_HOST}:{DB_PORT}")
+    global db_pool
+
+    # 啟動時就連上 DB Server（embedded 模式則在本行程開好 SQLite 執行緒池）
+    db_pool = make_backend(
+        DB_BACKEND, DB_HOST, DB_PORT, size=DB_POOL_SIZE, max_inflight=DB_MAX_INFLIGHT, readers=DB_READERS,
+        unix_path=DB_UNIX_PATH,
+    )
+    await db_pool.start()
+    if DB_BACKEND == "embedded":
+        print(f"✅ 使用內嵌資料庫（讀取執行緒 {DB_READERS} 條、寫入 1 條）")
+    else:
+        via = "unix" if "unix" in db_pool.transports else "tcp"
+        print(f"✅ 已連線至 DB Server {DB_HOST}:{DB_PORT}（{DB_POOL_SIZE} 條連線，{via}）")
     
     # Lobby 初始化
     resp = await db_request({"collection": "Lobby", "action": "init"})
@@ -600,6 +733,11 @@ async def main():
     else:
         print(f"⚠️ Lobby 初始化失敗：{resp.get('error')}")
 
+    # 每款遊戲先啟動好待命的 game server worker
+    game_pool.prewarm(sorted(GAMES_DIR.glob("*/game_server.py")))
+    supervisor.start()
+    print(f"🔥 已預熱 {game_pool.spawned} 個遊戲伺服器 worker")
+
     # 啟動 Lobby Server
     server = await asyncio.start_server(handle_client, LOBBY_HOST, LOBBY_PORT)
     addr = server.sockets[0].getsockname()
@@ -609,9 +747,10 @@ async def main():
         async with server:
             await server.serve_forever()
     finally:
-        if db_writer:
-            db_writer.close()
-            await db_writer.wait_closed()
+        supervisor.stop()
+        game_pool.shutdown()
+        if db_pool:
+            await db_pool.close()
             print("🛑 已關閉 DB 連線。")
 
 if __name__ == "__main__":
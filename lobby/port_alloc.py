@@ -0,0 +1,65 @@
+from collections import deque
+
+
+class PortAllocator:
+    """
+    遊戲伺服器的 port 租借表（只在 Lobby 的 event loop 中使用，不需要鎖）：
+    - port_range=(start, end)：從這段範圍輪流租出，歸還的 port 排到最後，
+      盡量拉長重用間隔，避開 TIME_WAIT
+    - port_range=None：一律租 0，讓遊戲伺服器 bind 系統分配的 port，
+      實際 port 由 worker 回報後再用 claim() 記下
+    租出的 port 在對戰結束（worker 結束）時 release()。
+    """
+
+    def __init__(self, port_range=None):
+        self.port_range = port_range
+        self.free = deque(range(*port_range)) if port_range else deque()
+        self.leased = set()
+
+        self.leases = 0
+        self.peak_leased = 0
+        self.exhausted = 0
+        self.conflicts = 0
+
+    @property
+    def ephemeral(self):
+        return self.port_range is None
+
+    def lease(self):
+        if self.ephemeral:
+            self.leases += 1
+            return 0
+        if not self.free:
+            self.exhausted += 1
+            raise RuntimeError("❌ 沒有可用的 port")
+        port = self.free.popleft()
+        self.leased.add(port)
+        self.leases += 1
+        self.peak_leased = max(self.peak_leased, len(self.leased))
+        return port
+
+    def claim(self, port):
+        """記下系統分配給遊戲伺服器的實際 port"""
+        self.leased.add(port)
+        self.peak_leased = max(self.peak_leased, len(self.leased))
+
+    def release(self, port, in_use=False):
+        """歸還 port；in_use=True 代表被別的程式佔走了，這次先放到最後面"""
+        if port not in self.leased:
+            return
+        self.leased.remove(port)
+        if in_use:
+            self.conflicts += 1
+        if self.port_range and self.port_range[0] <= port < self.port_range[1]:
+            self.free.append(port)
+
+    def stats(self):
+        return {
+            "range": list(self.port_range) if self.port_range else "ephemeral",
+            "free": len(self.free),
+            "leased": len(self.leased),
+            "peak_leased": self.peak_leased,
+            "leases": self.leases,
+            "exhausted": self.exhausted,
+            "conflicts": self.conflicts,
+        }
@@ -0,0 +1,197 @@
+import asyncio
+import signal
+import time
+from collections import Counter
+
+MEMORY_EXIT_CODE = 3       # game_worker 撞到 RLIMIT_AS（MemoryError）時的結束碼，見 game_worker.EXIT_MEMORY
+
+
+class Match:
+    """一場進行中的對戰（單場模式是一個 busy 的 game worker；多場模式是 host 行程裡的一個房間）"""
+
+    def __init__(self, worker, room_id, hosted=False):
+        self.worker = worker
+        self.room_id = room_id
+        self.hosted = hosted
+        self.key = str(room_id) if hosted else room_id    # host 行程裡的房間 key（協定上一律是字串）
+        self.started_at = time.monotonic()
+        self.idle_since = self.started_at     # 目前沒有任何玩家連線的起始時間；有人連著就是 None
+        self.rss_kb = None
+        self.cpu_sec = 0
+        self.conns = 0
+        self.queues = None                    # game_sdk 遊戲回報的每位玩家送出佇列狀態
+        self.kill_reason = None
+
+    def info(self, now):
+        return {
+            "room_id": self.room_id,
+            "game": self.worker.script.parent.name,
+            "pid": self.worker.proc.pid,
+            "port": self.worker.port,
+            "hosted": self.hosted,
+            "age_sec": round(now - self.started_at, 1),
+            "rss_kb": self.rss_kb,
+            "cpu_sec": self.cpu_sec,
+            "conns": self.conns,
+            "queues": self.queues,
+        }
+
+
+class Supervisor:
+    """
+    管理所有正在跑對戰的遊戲伺服器子程序：
+    - 每場對戰的牆鐘上限 max_seconds，以及 CPU / 記憶體 rlimit（由 worker 開局時自己套用）
+    - 連續 idle_seconds 沒有任何玩家連線就結束（例如 Battleship 對戰完仍卡在 accept()）
+    - 子程序結束時記錄結束原因，並呼叫 on_match_end(match, reason) 讓 Lobby 釋放房間
+    - worker 定期回報 heartbeat（RSS / CPU / 連線數），stats() 彙整目前的子程序狀態
+    - 多場模式的房間共用一個 host 行程：連線數與佇列依 room_id 從 heartbeat 的 queues 取，
+      回收時只關掉那個房間，RSS / CPU 是整個 host 的數字，不算在個別房間上
+    - host 行程不套單場的 cpu_sec / mem_mb：CPU 不設上限，記憶體改用 host_mem_mb
+      （超過時整個 host 連同所有房間一起結束，所以要比 mem_mb 寬鬆得多）
+    """
+
+    def __init__(self, max_seconds=3600, idle_seconds=120, cpu_sec=None, mem_mb=None, host_mem_mb=None,
+                 heartbeat=2.0, check_interval=5.0, on_match_end=None):
+        self.max_seconds = max_seconds
+        self.idle_seconds = idle_seconds
+        self.cpu_sec = cpu_sec
+        self.mem_mb = mem_mb
+        self.host_mem_mb = host_mem_mb
+        self.heartbeat = heartbeat
+        self.check_interval = check_interval
+        self.on_match_end = on_match_end
+
+        self.workers = {}          # worker -> {Match.key: Match}；單場模式每個 worker 只有一場
+        self.exits = Counter()     # 結束原因 -> 次數
+        self.task = None
+
+    def run_options(self, host=False):
+        """附在開局指令裡，交給 worker 套用；host=True 是多場模式的常駐行程"""
+        if host:
+            return {"cpu_sec": None, "mem_mb": self.host_mem_mb, "heartbeat": self.heartbeat}
+        return {"cpu_sec": self.cpu_sec, "mem_mb": self.mem_mb, "heartbeat": self.heartbeat}
+
+    @property
+    def matches(self):
+        return [match for rooms in self.workers.values() for match in rooms.values()]
+
+    def track(self, worker, room_id=None, hosted=False):
+        match = Match(worker, room_id, hosted)
+        self.workers.setdefault(worker, {})[match.key] = match
+        return match
+
+    def on_heartbeat(self, worker, msg):
+        rooms = self.workers.get(worker)
+        if not rooms:
+            return
+        if worker.hosting:
+            queues = {q.get("room_id"): q for q in msg.get("queues") or []}
+            for key, match in rooms.items():
+                q = queues.get(key)
+                match.queues = q
+                self._set_conns(match, len(q["players"]) if q else 0)
+            return
+        for match in rooms.values():
+            match.rss_kb = msg.get("rss_kb")
+            match.cpu_sec = msg.get("cpu_sec", 0)
+            match.queues = msg.get("queues")
+            self._set_conns(match, msg.get("conns", 0))
+
+    @staticmethod
+    def _set_conns(match, conns):
+        match.conns = conns
+        if conns:
+            match.idle_since = None
+        elif match.idle_since is None:
+            match.idle_since = time.monotonic()
+
+    def _ended(self, match, reason):
+        self.exits[reason] += 1
+        if self.on_match_end:
+            self.on_match_end(match, reason)
+
+    def on_exit(self, worker):
+        rooms = self.workers.pop(worker, None)
+        if not rooms:
+            return
+        for match in rooms.values():
+            reason = match.kill_reason or self._exit_reason(worker)
+            print(f"🧹 房間 {match.room_id} 的遊戲伺服器已結束（{reason}，exit code {worker.proc.returncode}）")
+            self._ended(match, reason)
+
+    def on_hosted_end(self, worker, key, reason=None):
+        """多場模式的一個房間結束（host 行程照常運作）"""
+        rooms = self.workers.get(worker, {})
+        match = rooms.pop(key, None)
+        if not rooms:
+            self.workers.pop(worker, None)
+        if not match:
+            return
+        reason = reason or match.kill_reason or "exited"
+        print(f"🧹 房間 {match.room_id} 的對戰已結束（{reason}，host pid {worker.proc.pid}）")
+        self._ended(match, reason)
+
+    def _exit_reason(self, worker):
+        """依 exit code 推斷結束原因；撞到 rlimit 時回報是哪一個上限"""
+        code = worker.proc.returncode
+        mem_mb = self.host_mem_mb if worker.hosting else self.mem_mb
+        if code == 0:
+            return "exited"
+        if code == MEMORY_EXIT_CODE:
+            return "mem_limit"
+        if code is not None and code < 0 and hasattr(signal, "SIGXCPU") and -code == signal.SIGXCPU:
+            return "cpu_limit"
+        # 有 RLIMIT_AS 時，C 層配置記憶體失敗可能直接 SIGSEGV；Supervisor / GamePool 自己砍的都有 kill_reason，
+        # 剩下的 SIGKILL 多半是系統記憶體不足（OOM killer）
+        if mem_mb and code is not None and code < 0 and -code in (signal.SIGSEGV, getattr(signal, "SIGKILL", 9)):
+            return "mem_limit"
+        if code is not None and code > 0:
+            return "crashed"
+        return "killed"
+
+    def kill(self, match, reason):
+        if match.kill_reason:
+            return
+        match.kill_reason = reason
+        print(f"⛔ 結束房間 {match.room_id} 的遊戲伺服器：{reason}")
+        if match.hosted:
+            match.worker.close_match(match.key)
+        else:
+            match.worker.kill()
+
+    def check(self):
+        now = time.monotonic()
+        for match in self.matches:
+            if self.max_seconds and now - match.started_at > self.max_seconds:
+                self.kill(match, "wall_clock_limit")
+            elif self.idle_seconds and match.idle_since is not None and now - match.idle_since > self.idle_seconds:
+                self.kill(match, "idle")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            self.check()
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    def stats(self):
+        now = time.monotonic()
+        matches = [m.info(now) for m in self.matches]
+        return {
+            "live_matches": len(matches),
+            "total_rss_kb": sum(m["rss_kb"] or 0 for m in matches),
+            "limits": {
+                "max_seconds": self.max_seconds,
+                "idle_seconds": self.idle_seconds,
+                "cpu_sec": self.cpu_sec,
+                "mem_mb": self.mem_mb,
+                "host_mem_mb": self.host_mem_mb,
+            },
+            "exits": dict(self.exits),
+            "matches": matches,
+        }